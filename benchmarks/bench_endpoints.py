@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Benchmark ponta a ponta dos endpoints de scraping contra o servidor de
+fixtures local (benchmarks/fixture_server.py), sem tocar os sites reais.
+
+Sobe as fixtures e a API (uvicorn, em processo) apontada para elas, dispara
+N requisições por endpoint em cada nível de concorrência e reporta latência
+p50/p95/p99 e throughput. O resultado vai para um JSON em
+benchmarks/results/ e pode ser comparado com uma execução anterior.
+
+Por padrão o cache fica desligado (TTL 0) e cada requisição usa parâmetros
+distintos, para medir o scraping e não o cache; /topobitcoin não tem
+parâmetros, então chamadas simultâneas são coalescidas pelo single-flight.
+
+Uso:
+  python benchmarks/bench_endpoints.py --requests 20 --concurrency 1,4
+  python benchmarks/bench_endpoints.py --compare benchmarks/results/antes.json
+  python benchmarks/bench_endpoints.py --api http://127.0.0.1:8052  # API já rodando
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import platform
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fixture_server import FixtureServer  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) bench_endpoints"
+GEOS = ["BR", "US", "UK", "IN"]
+ENDPOINTS = ("trends", "infogram", "topobitcoin", "trends_batch")
+
+
+def fetch_categories(api_url: str, timeout: float) -> list:
+    """
+    Códigos de categoria aceitos pela API (list(CATEGORIES), via /categories):
+    códigos fora da lista dão 400 e mediriam o validador, não o scraping
+    """
+    request = urllib.request.Request(api_url + "/categories", headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(request, timeout=timeout) as resp:
+        return list(json.loads(resp.read()))
+
+
+def endpoint_paths(fixtures_url: str, categories: list) -> dict:
+    """Gera o path da i-ésima requisição de cada endpoint"""
+    def category(i):
+        return categories[i % len(categories)]
+
+    return {
+        "trends": lambda i: f"/trends?geo={GEOS[i % len(GEOS)]}&category={category(i)}",
+        "infogram": lambda i: "/infogram?url=" + quote(f"{fixtures_url}/infogram?v={i}", safe=""),
+        "topobitcoin": lambda i: "/topobitcoin",
+        "trends_batch": lambda i: f"/trends/batch?pairs=BR:{category(i)},US:{category(i)}",
+    }
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """Percentil com interpolação linear (mesmo critério do numpy)"""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    low = int(k)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (k - low)
+
+
+def fetch(url: str, timeout: float) -> tuple:
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except Exception:
+        status = 0
+    return time.perf_counter() - start, status
+
+
+def run_case(api_url: str, name: str, make_path, total: int, concurrency: int,
+             offset: int, timeout: float) -> dict:
+    urls = [api_url + make_path(offset + i) for i in range(total)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(lambda u: fetch(u, timeout), urls))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency * 1000 for latency, status in samples if status == 200)
+    errors = {}
+    for _, status in samples:
+        if status != 200:
+            errors[str(status)] = errors.get(str(status), 0) + 1
+    return {
+        "endpoint": name,
+        "concurrency": concurrency,
+        "requests": total,
+        "ok": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "mean_ms": round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+        "max_ms": round(latencies[-1], 1) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        "elapsed_s": round(elapsed, 2),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_api(env: dict, port: int):
+    """Sobe trends_api em uma thread com o ambiente do benchmark"""
+    os.environ.update(env)
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config("trends_api:app", host="127.0.0.1",
+                                           port=port, log_level="warning"))
+    threading.Thread(target=server.run, name="bench-api", daemon=True).start()
+    deadline = time.monotonic() + 120
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("API não subiu em 120s")
+        time.sleep(0.1)
+    return server
+
+
+def api_env(args, fixtures: FixtureServer) -> dict:
+    env = {
+        **fixtures.env(),
+        # Um único cliente (127.0.0.1) faz todas as requisições
+        "RATE_LIMIT_REQUESTS": "1000000",
+        "RATE_LIMIT_ROUTES": "",
+        "SCHEDULER_ENABLED": "false",
+        # Sem gravar snapshots no banco do repositório; o caminho temporário
+        # só vale se alguém religar o histórico
+        "HISTORY_ENABLED": "false",
+        "HISTORY_DB": str(Path(tempfile.mkdtemp(prefix="bench_endpoints_")) / "trends_history.db"),
+        "LOG_LEVEL": "WARNING",
+        "DRIVER_POOL_SIZE": str(args.pool_size),
+        "DRIVER_POOL_WARMUP": str(args.pool_size),
+        "JOB_QUEUE_SIZE": str(max(100, max(args.concurrency) * 4)),
+    }
+    if not args.cache:
+        env.update({"CACHE_TTL_TRENDS": "0", "CACHE_TTL_INFOGRAM": "0",
+                    "CACHE_TTL_TOPOBITCOIN": "0", "CACHE_STALE_WINDOW": "0"})
+    return env
+
+
+def compare(results: list, baseline_path: Path):
+    baseline = json.loads(baseline_path.read_text())
+    previous = {(r["endpoint"], r["concurrency"]): r for r in baseline["results"]}
+    print(f"\n📊 Comparação com {baseline_path.name}")
+    print(f"  {'endpoint':14s} {'conc':>4s} {'p50':>16s} {'p95':>16s} {'req/s':>16s}")
+    for r in results:
+        old = previous.get((r["endpoint"], r["concurrency"]))
+        if old is None:
+            continue
+
+        def delta(key):
+            before, after = old[key], r[key]
+            change = (after - before) / before * 100 if before else 0.0
+            return f"{before:.0f}→{after:.0f} {change:+.0f}%"
+
+        print(f"  {r['endpoint']:14s} {r['concurrency']:4d} {delta('p50_ms'):>16s} "
+              f"{delta('p95_ms'):>16s} {delta('throughput_rps'):>16s}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos endpoints contra fixtures locais")
+    parser.add_argument("--requests", type=int, default=20, help="requisições por endpoint e nível")
+    parser.add_argument("--concurrency", default="1,4",
+                        help="níveis de concorrência separados por vírgula")
+    parser.add_argument("--endpoints", default="trends,infogram,topobitcoin",
+                        help="trends, infogram, topobitcoin, trends_batch")
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="latência dos XHRs das fixtures")
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--pool-size", type=int, default=2, help="DRIVER_POOL_SIZE da API")
+    parser.add_argument("--cache", action="store_true", help="mantém o cache de resultados ligado")
+    parser.add_argument("--timeout", type=float, default=120.0, help="timeout por requisição (s)")
+    parser.add_argument("--api", help="URL de uma API já rodando (configurada com as fixtures)")
+    parser.add_argument("--fixtures-port", type=int, default=0)
+    parser.add_argument("--output", help="arquivo JSON de saída")
+    parser.add_argument("--compare", help="JSON de uma execução anterior")
+    parser.add_argument("--label", default="", help="rótulo livre gravado no resultado")
+    args = parser.parse_args()
+    args.concurrency = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    fixtures = FixtureServer(port=args.fixtures_port, latency_ms=args.latency_ms,
+                             jitter_ms=args.jitter_ms).start()
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = [e for e in endpoints if e not in ENDPOINTS]
+    if unknown:
+        parser.error(f"endpoints desconhecidos: {', '.join(unknown)}")
+
+    env = {}
+    if args.api:
+        api_url = args.api.rstrip("/")
+        print(f"🔗 API externa {api_url}; configure-a com:")
+        for name, value in fixtures.env().items():
+            print(f"  {name}={value}")
+    else:
+        env = api_env(args, fixtures)
+        port = free_port()
+        api_url = f"http://127.0.0.1:{port}"
+        print(f"🚀 Subindo a API em {api_url} (pool {args.pool_size}) com fixtures em {fixtures.url}")
+        server = start_api(env, port)
+    paths = endpoint_paths(fixtures.url, fetch_categories(api_url, args.timeout))
+
+    # Aquecimento: primeira navegação de cada endpoint fora da medição
+    for name in endpoints:
+        latency, status = fetch(api_url + paths[name](0), args.timeout)
+        print(f"  aquecimento {name}: {status} em {latency * 1000:.0f}ms")
+
+    results = []
+    offset = 1
+    print(f"\n📏 {args.requests} requisições por endpoint e nível de concorrência\n")
+    print(f"  {'endpoint':14s} {'conc':>4s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'req/s':>7s} erros")
+    for concurrency in args.concurrency:
+        for name in endpoints:
+            r = run_case(api_url, name, paths[name], args.requests, concurrency,
+                         offset, args.timeout)
+            offset += args.requests
+            results.append(r)
+            print(f"  {name:14s} {concurrency:4d} {r['p50_ms']:7.0f}ms {r['p95_ms']:7.0f}ms "
+                  f"{r['p99_ms']:7.0f}ms {r['throughput_rps']:7.2f} {r['errors'] or '-'}")
+
+    try:
+        with urllib.request.urlopen(urllib.request.Request(
+                api_url + "/stats", headers={"User-Agent": USER_AGENT}), timeout=10) as resp:
+            stats = json.loads(resp.read())
+    except Exception:
+        stats = None
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "label": args.label,
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "endpoints": endpoints,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "pool_size": args.pool_size,
+            "cache": args.cache,
+            "external_api": bool(args.api),
+            "env": env,
+        },
+        "host": {"python": platform.python_version(), "platform": platform.platform(),
+                 "cpus": os.cpu_count()},
+        "results": results,
+        "fixture_hits": fixtures.hits(),
+        "api_stats": stats,
+    }
+    output = Path(args.output) if args.output else \
+        RESULTS_DIR / f"bench_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"\n💾 Resultado salvo em {output}")
+
+    if args.compare:
+        compare(results, Path(args.compare))
+
+    if not args.api:
+        server.should_exit = True
+    fixtures.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: is_ip_suspicious original (varredura linear criando
+ip_network a cada consulta) x índice compilado IPIndex
+
+Uso: python benchmarks/bench_ip_index.py [n_cidrs] [n_consultas]
+"""
+
+import sys
+import time
+import random
+import ipaddress
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from security_config import IPIndex  # noqa: E402
+
+def legacy_is_ip_suspicious(ip: str, ranges) -> bool:
+    """Implementação anterior: uma ip_network nova por entrada, por consulta"""
+    try:
+        ip_obj = ipaddress.ip_address(ip)
+        for range_str in ranges:
+            if ip_obj in ipaddress.ip_network(range_str):
+                return True
+    except ValueError:
+        return True
+    return False
+
+def random_cidrs(n: int, rng: random.Random):
+    cidrs = []
+    for _ in range(n):
+        if rng.random() < 0.9:
+            prefix = rng.randint(16, 32)
+            addr = ipaddress.IPv4Address(rng.getrandbits(32))
+            cidrs.append(str(ipaddress.IPv4Network(f"{addr}/{prefix}", strict=False)))
+        else:
+            prefix = rng.randint(32, 64)
+            addr = ipaddress.IPv6Address(rng.getrandbits(128))
+            cidrs.append(str(ipaddress.IPv6Network(f"{addr}/{prefix}", strict=False)))
+    return cidrs
+
+def bench(label, fn, ips):
+    start = time.perf_counter()
+    hits = sum(1 for ip in ips if fn(ip))
+    elapsed = time.perf_counter() - start
+    print(f"  {label:28s} {len(ips) / elapsed:12,.0f} consultas/s "
+          f"({elapsed / len(ips) * 1e6:8.2f} µs/consulta, {hits} suspeitos)")
+    return hits
+
+def main():
+    n_cidrs = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    rng = random.Random(42)
+    cidrs = random_cidrs(n_cidrs, rng)
+    ips = [str(ipaddress.IPv4Address(rng.getrandbits(32))) for _ in range(n_queries)]
+
+    print(f"📏 {n_cidrs} CIDRs, {n_queries} consultas\n")
+    start = time.perf_counter()
+    index = IPIndex(cidrs)
+    print(f"  compilação do índice: {(time.perf_counter() - start) * 1000:.0f} ms "
+          f"({len(index)} intervalos)\n")
+
+    legacy_ips = ips[:max(1, n_queries // 20)]  # a versão linear é lenta demais
+    legacy_hits = bench("linear (original)", lambda ip: legacy_is_ip_suspicious(ip, cidrs), legacy_ips)
+    index_hits = bench("IPIndex (bisect)", index.contains, legacy_ips)
+    assert legacy_hits == index_hits, "resultados divergentes"
+    bench("IPIndex (bisect), todas", index.contains, ips)
+
+if __name__ == "__main__":
+    main()
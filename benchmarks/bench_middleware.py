@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark de carga do middleware de segurança: requests/s para requisições
+rejeitadas e permitidas, com o middleware HTTP antigo (BaseHTTPMiddleware)
+e com o SecurityMiddleware em ASGI puro.
+
+As requisições são entregues direto à aplicação ASGI (sem rede), para medir
+apenas o custo do middleware e do roteamento. Rate limit e logs ficam
+desligados para não distorcer a comparação.
+
+Uso: python benchmarks/bench_middleware.py [requisições] [concorrência]
+"""
+
+import sys
+import time
+import asyncio
+import logging
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import FastAPI, Request, status  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from security_middleware import SecurityMiddleware  # noqa: E402
+from trends_api import suspicious_reason  # noqa: E402
+
+ALLOWED_METHODS = ["GET", "OPTIONS"]
+
+def allow_all(client_ip: str, path: str = "/") -> bool:
+    return True
+
+def build_app(kind: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/categories")
+    async def categories():
+        return {"0": "Todas as categorias"}
+
+    if kind == "asgi":
+        app.add_middleware(SecurityMiddleware, suspicious_reason=suspicious_reason,
+                           check_rate_limit=allow_all, allowed_methods=ALLOWED_METHODS)
+    else:
+        @app.middleware("http")
+        async def security_middleware(request: Request, call_next):
+            """Implementação anterior, baseada em BaseHTTPMiddleware"""
+            client_ip = request.client.host
+            path = request.url.path
+            user_agent = request.headers.get("user-agent", "")
+            if suspicious_reason(path, user_agent, client_ip):
+                return JSONResponse(status_code=status.HTTP_404_NOT_FOUND,
+                                    content={"detail": "Not found"})
+            if not allow_all(client_ip, path):
+                return JSONResponse(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                                    content={"detail": "Too many requests"})
+            if request.method not in ALLOWED_METHODS:
+                return JSONResponse(status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
+                                    content={"detail": "Method not allowed"})
+            return await call_next(request)
+    return app
+
+def make_scope(method: str, path: str, user_agent: str) -> dict:
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"localhost"), (b"user-agent", user_agent.encode())],
+        "client": ("127.0.0.1", 50000), "server": ("localhost", 8052),
+    }
+
+async def run(app, scope: dict, total: int, concurrency: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    statuses = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    async def worker(n: int):
+        for _ in range(n):
+            await app(dict(scope), receive, send)
+
+    # Aquecimento (monta a pilha de middlewares)
+    await worker(50)
+    statuses.clear()
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(total // concurrency) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return len(statuses) / elapsed, statuses[0]
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    logging.disable(logging.CRITICAL)
+
+    cases = [
+        ("rejeitada: path /wp-admin", make_scope("GET", "/wp-admin/setup.php", "Mozilla/5.0")),
+        ("rejeitada: UA sqlmap", make_scope("GET", "/trends", "sqlmap/1.7")),
+        ("rejeitada: método POST", make_scope("POST", "/categories", "Mozilla/5.0")),
+        ("permitida: GET /categories", make_scope("GET", "/categories", "Mozilla/5.0")),
+    ]
+    print(f"📏 {total} requisições por caso, concorrência {concurrency}\n")
+    print(f"  {'caso':30s} {'antes (http)':>14s} {'depois (asgi)':>14s} {'ganho':>7s}")
+    for label, scope in cases:
+        before, s1 = asyncio.run(run(build_app("http"), scope, total, concurrency))
+        after, s2 = asyncio.run(run(build_app("asgi"), scope, total, concurrency))
+        assert s1 == s2, f"status divergente: {s1} x {s2}"
+        print(f"  {label:30s} {before:11,.0f}/s {after:11,.0f}/s {after / before:6.1f}x")
+
+if __name__ == "__main__":
+    main()
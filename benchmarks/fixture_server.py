@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Servidor HTTP local com réplicas das três páginas raspadas pela API
+(Trends /trending, tabelas do Infogram e o indicador CBBI), para medir
+desempenho sem depender da rede nem dos sites reais.
+
+As páginas são estáticas e buscam os dados em /data/* por XHR; a latência
+desses XHRs (`latency_ms` ± `jitter_ms`) simula o tempo de resposta do site
+de origem.
+
+Uso: python benchmarks/fixture_server.py [--port 8060] [--latency-ms 150]
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+PAGES = {
+    "/trending": "trends.html",
+    "/infogram": "infogram.html",
+    "/cbbi": "cbbi.html",
+}
+
+TREND_ROWS = 25
+
+
+def trends_data(query: dict) -> list:
+    geo = query.get("geo", ["BR"])[0]
+    category = query.get("category", ["0"])[0]
+    return [
+        {
+            "name": f"tendência {geo}-{category} #{i + 1}",
+            "volume": f"{(TREND_ROWS - i) * 10} mil+",
+            "started": f"há {i + 1} h",
+            "breakdown": f"termo relacionado {i + 1}",
+        }
+        for i in range(TREND_ROWS)
+    ]
+
+
+def infogram_data(query: dict) -> dict:
+    ativos = ["BTC", "ETH", "SOL", "ADA", "DOT", "LINK", "AVAX", "MATIC"]
+    return {
+        "carteira": [["Ativo", "Alocação", "Preço médio"]] + [
+            [a, f"{100 // len(ativos)}%", f"US$ {1000 * (i + 1)}"]
+            for i, a in enumerate(ativos)
+        ],
+        "movimentacao": [["Data", "Ativo", "Operação"]] + [
+            [f"2024-01-{i + 1:02d}", a, "Compra" if i % 2 == 0 else "Venda"]
+            for i, a in enumerate(ativos)
+        ],
+    }
+
+
+def cbbi_data(query: dict) -> dict:
+    return {
+        "valor": "76",
+        "data": "Atualizado em 2024-01-15",
+        "descricao": "CONFIANÇA DE ESTAR NO TOPO",
+    }
+
+
+DATA = {
+    "/data/trends": trends_data,
+    "/data/infogram": infogram_data,
+    "/data/cbbi": cbbi_data,
+}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    server_version = "FixtureServer/1.0"
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        path = parsed.path.rstrip("/") or "/"
+        if path in PAGES:
+            body = self.server.pages[path]
+            self._reply(200, "text/html; charset=utf-8", body)
+        elif path in DATA:
+            delay = self.server.latency_ms + random.uniform(-1, 1) * self.server.jitter_ms
+            if delay > 0:
+                time.sleep(delay / 1000)
+            body = json.dumps(DATA[path](parse_qs(parsed.query)), ensure_ascii=False).encode()
+            self._reply(200, "application/json; charset=utf-8", body)
+        else:
+            self._reply(404, "text/plain; charset=utf-8", b"not found")
+        with self.server.lock:
+            self.server.hits[path] = self.server.hits.get(path, 0) + 1
+
+    def _reply(self, status: int, content_type: str, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """Sobe o servidor em uma thread; `url` é a base para as variáveis de ambiente"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 latency_ms: float = 150.0, jitter_ms: float = 50.0):
+        self.httpd = ThreadingHTTPServer((host, port), FixtureHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.pages = {route: (FIXTURES / name).read_bytes()
+                            for route, name in PAGES.items()}
+        self.httpd.latency_ms = latency_ms
+        self.httpd.jitter_ms = min(jitter_ms, latency_ms)
+        self.httpd.hits = {}
+        self.httpd.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> dict:
+        """Variáveis que apontam a API para as fixtures"""
+        return {
+            "TRENDS_BASE_URL": f"{self.url}/trending",
+            "TRENDS_URL": f"{self.url}/trending?geo=BR",
+            "BITCOIN_URL": f"{self.url}/cbbi",
+        }
+
+    def hits(self) -> dict:
+        with self.httpd.lock:
+            return dict(self.httpd.hits)
+
+    def start(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever,
+                                        name="fixture-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8060)
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    server = FixtureServer(args.host, args.port, args.latency_ms, args.jitter_ms)
+    print(f"Fixtures em {server.url}; para a API:")
+    for name, value in server.env().items():
+        print(f"  {name}={value}")
+    print(f"  Infogram: /infogram?url={server.url}/infogram")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Circuit breaker por host de origem e retentativas com backoff exponencial,
+jitter e orçamento global, para não prender navegadores em sites fora do ar
+"""
+
+import time
+import random
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, NamedTuple, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Exception):
+    """Circuito aberto: a origem não é chamada até `retry_after` segundos"""
+
+    def __init__(self, host: str, retry_after: float):
+        super().__init__(f"Origem {host} indisponível (circuito aberto)")
+        self.host = host
+        self.retry_after = retry_after
+
+
+class CallToken(NamedTuple):
+    """
+    Devolvido por before_call: a geração do circuito quando a chamada foi
+    liberada e se ela ocupa uma vaga de teste do meio aberto
+    """
+    generation: int
+    trial: bool
+
+
+class CircuitBreaker:
+    """
+    Janela das últimas `window` chamadas de um host. Com pelo menos
+    `min_calls`, abre quando a fração de falhas chega a `failure_rate` ou a
+    de chamadas mais lentas que `slow_call` segundos chega a `slow_rate`.
+
+    Aberto, rejeita na hora por `open_seconds`; depois deixa passar até
+    `half_open_calls` chamadas de teste (meio aberto). Todas com sucesso
+    fecham o circuito; qualquer falha o reabre.
+
+    Cada mudança de estado abre uma nova geração. Só o resultado de uma
+    chamada da geração atual muda o estado: no meio aberto, só as chamadas
+    que receberam a vaga de teste; respostas atrasadas de antes da abertura
+    entram nos contadores, mas não fecham nem reabrem o circuito.
+    """
+
+    def __init__(self, host: str, window: int = 20, min_calls: int = 5,
+                 failure_rate: float = 0.5, slow_call: float = 15.0,
+                 slow_rate: float = 0.8, open_seconds: float = 30.0,
+                 half_open_calls: int = 1, events=None):
+        self.host = host
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call = slow_call
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = max(1, half_open_calls)
+        self.events = events
+        self.state = CLOSED
+        self._calls = deque(maxlen=window)   # (falhou, lenta)
+        self._opened_at = 0.0
+        self._generation = 0                 # incrementada a cada mudança de estado
+        self._trials = 0                     # chamadas de teste em andamento
+        self._trial_successes = 0
+        self._lock = threading.Lock()
+        self.counters = {"opened": 0, "rejected": 0, "failures": 0, "successes": 0}
+
+    def before_call(self) -> CallToken:
+        """
+        Levanta CircuitOpen se a chamada não deve seguir; o token devolvido
+        vai para record()/release() da mesma chamada
+        """
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self._opened_at + self.open_seconds - time.monotonic()
+                if remaining > 0:
+                    self._reject()
+                    raise CircuitOpen(self.host, remaining)
+                self._transition(HALF_OPEN)
+                self._trials = 0
+                self._trial_successes = 0
+            if self.state == HALF_OPEN:
+                if self._trials >= self.half_open_calls:
+                    self._reject()
+                    raise CircuitOpen(self.host, 1.0)
+                self._trials += 1
+                return CallToken(self._generation, True)
+            return CallToken(self._generation, False)
+
+    def record(self, failed: bool, duration: float = 0.0,
+               token: Optional[CallToken] = None) -> None:
+        """
+        Resultado de uma chamada que chegou à origem. Sem token, vale como
+        chamada da geração atual fora do meio aberto.
+        """
+        with self._lock:
+            self.counters["failures" if failed else "successes"] += 1
+            if token is not None and token.generation != self._generation:
+                return  # liberada antes da última mudança de estado
+            if self.state == HALF_OPEN:
+                if token is None or not token.trial:
+                    return
+                if failed:
+                    self._open()
+                else:
+                    self._trial_successes += 1
+                    if self._trial_successes >= self.half_open_calls:
+                        self._calls.clear()
+                        self._transition(CLOSED)
+                return
+            if self.state == OPEN:
+                return
+            self._calls.append((failed, duration >= self.slow_call))
+            if len(self._calls) < self.min_calls:
+                return
+            failures = sum(1 for f, _ in self._calls if f)
+            slow = sum(1 for _, s in self._calls if s)
+            if (failures / len(self._calls) >= self.failure_rate
+                    or slow / len(self._calls) >= self.slow_rate):
+                self._open()
+
+    def release(self, token: Optional[CallToken] = None) -> None:
+        """Devolve a vaga de teste de uma chamada que não chegou à origem"""
+        with self._lock:
+            if (token is not None and token.trial and token.generation == self._generation
+                    and self._trials > 0):
+                self._trials -= 1
+
+    def reject_if_open(self) -> float:
+        """
+        Para quem responde sem chamar a origem: segundos restantes de
+        circuito aberto (contando a rejeição), ou 0 se a chamada pode seguir
+        """
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            remaining = self._opened_at + self.open_seconds - time.monotonic()
+            if remaining <= 0:
+                return 0.0
+            self._reject()
+            return remaining
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+
+    def _open(self):
+        self._opened_at = time.monotonic()
+        self.counters["opened"] += 1
+        self._transition(OPEN)
+        logging.warning("⚡ Circuito aberto para %s por %gs", self.host, self.open_seconds)
+
+    def _reject(self):
+        self.counters["rejected"] += 1
+        if self.events is not None:
+            self.events.inc(self.host, "rejected")
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        self.state = state
+        self._generation += 1
+        if self.events is not None:
+            self.events.inc(self.host, state)
+        if state == CLOSED:
+            logging.info("Circuito fechado para %s", self.host)
+
+    def stats(self) -> dict:
+        with self._lock:
+            calls = list(self._calls)
+        return {
+            "state": self.state,
+            "window_calls": len(calls),
+            "window_failures": sum(1 for f, _ in calls if f),
+            "window_slow": sum(1 for _, s in calls if s),
+            "retry_after": round(self.retry_after(), 1),
+            **self.counters,
+        }
+
+
+class CircuitBreakers:
+    """Um CircuitBreaker por host, criado sob demanda; no máximo `max_hosts` (LRU)"""
+
+    def __init__(self, max_hosts: int = 100, **options):
+        self.max_hosts = max_hosts
+        self.options = options
+        self._breakers: "OrderedDict[str, CircuitBreaker]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(host, **self.options)
+                while len(self._breakers) > self.max_hosts:
+                    self._breakers.popitem(last=False)
+            else:
+                self._breakers.move_to_end(host)
+            return breaker
+
+    def stats(self) -> dict:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {b.host: b.stats() for b in breakers}
+
+
+class RetryBudget:
+    """
+    Orçamento global de retentativas: cada chamada deposita `ratio` fichas,
+    o tempo repõe `min_per_second` e cada retentativa gasta uma. Sob falha
+    generalizada as retentativas ficam em ~`ratio` do tráfego, em vez de
+    multiplicá-lo.
+    """
+
+    def __init__(self, ratio: float = 0.1, min_per_second: float = 0.1,
+                 max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.counters = {"retries": 0, "exhausted": 0}
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                self.counters["retries"] += 1
+                return True
+            self.counters["exhausted"] += 1
+            return False
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.max_tokens,
+                           self._tokens + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refill()
+            return {"tokens": round(self._tokens, 2), **self.counters}
+
+
+def guarded_call(breaker: CircuitBreaker, fn: Callable[[], Any],
+                 budget: Optional[RetryBudget] = None, retries: int = 1,
+                 base_delay: float = 0.5, max_delay: float = 5.0,
+                 is_failure: Callable[[BaseException], bool] = lambda e: True) -> Any:
+    """
+    Executa fn pelo circuit breaker, com até `retries` retentativas após
+    falhas da origem. A espera é exponencial com jitter completo
+    (uniforme entre 0 e min(max_delay, base_delay * 2^n)) e cada
+    retentativa precisa de uma ficha do orçamento.
+    """
+    if budget is not None:
+        budget.deposit()
+    attempt = 0
+    while True:
+        token = breaker.before_call()
+        start = time.monotonic()
+        try:
+            result = fn()
+        except Exception as e:
+            if not is_failure(e):
+                # Erro do pedido ou local (ex.: parâmetro inválido): não conta
+                breaker.release(token)
+                raise
+            breaker.record(True, time.monotonic() - start, token)
+            if attempt >= retries or (budget is not None and not budget.withdraw()):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            attempt += 1
+            logging.info("Retentativa %d em %s após %.2fs: %s", attempt, breaker.host, delay, e)
+            time.sleep(delay)
+            continue
+        breaker.record(False, time.monotonic() - start, token)
+        return result
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Cookies do Google Trends mantidos em memória e instalados via CDP
+antes da primeira navegação
+"""
+
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+_SAME_SITE = {"strict": "Strict", "lax": "Lax", "none": "None",
+              "no_restriction": "None"}
+
+
+def to_cdp_cookie(cookie: dict, default_url: Optional[str] = None) -> Optional[dict]:
+    """
+    Converte um cookie no formato do Selenium (ou de extensões como
+    EditThisCookie) para o CookieParam do CDP Network.setCookies. Sem
+    `domain`, o cookie fica associado a `default_url`, como o add_cookie
+    faria na página aberta; sem nenhum dos dois, é descartado (None).
+    """
+    if "name" not in cookie or "value" not in cookie:
+        return None
+    param = {
+        "name": cookie["name"],
+        "value": cookie["value"],
+        "path": cookie.get("path", "/"),
+        "secure": bool(cookie.get("secure", False)),
+        "httpOnly": bool(cookie.get("httpOnly", False)),
+    }
+    if cookie.get("domain"):
+        param["domain"] = cookie["domain"]
+    elif default_url:
+        param["url"] = default_url
+    else:
+        return None
+    expires = cookie.get("expiry", cookie.get("expirationDate"))
+    if expires is not None and not cookie.get("session", False):
+        param["expires"] = float(expires)
+    # sameSite null (JSON) é ausência, não a política "None"
+    same_site = _SAME_SITE.get(str(cookie.get("sameSite") or "").lower())
+    if same_site:
+        param["sameSite"] = same_site
+    return param
+
+
+class CookieJar:
+    """
+    Lê o arquivo de cookies uma vez e só o relê quando o mtime muda.
+    Cookies sem domínio valem para `default_url`.
+    """
+
+    def __init__(self, path: Path, default_url: Optional[str] = None):
+        self.path = path
+        self.default_url = default_url
+        self._cookies: List[dict] = []
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def cookies(self) -> List[dict]:
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            mtime = None
+        with self._lock:
+            if mtime != self._mtime:
+                self._cookies = self._load() if mtime is not None else []
+                self._mtime = mtime
+            return self._cookies
+
+    def install(self, driver) -> int:
+        """Instala os cookies no navegador em uma única chamada CDP"""
+        cookies = self.cookies()
+        if cookies:
+            driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+        return len(cookies)
+
+    def _load(self) -> List[dict]:
+        try:
+            raw = json.loads(self.path.read_text())
+        except (OSError, ValueError) as e:
+            logging.warning(f"Não foi possível ler {self.path}: {e}")
+            return []
+        cookies = [c for c in (to_cdp_cookie(r, self.default_url) for r in raw)
+                   if c is not None]
+        logging.info(f"{len(cookies)} cookies carregados de {self.path.name}")
+        if len(cookies) < len(raw):
+            logging.warning(f"{len(raw) - len(cookies)} cookies ignorados em "
+                            f"{self.path.name} (sem name/value ou domínio)")
+        return cookies
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Pool de instâncias do Chrome WebDriver reaproveitadas entre requisições
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+from selenium.common.exceptions import WebDriverException
+
+
+class PoolExhausted(Exception):
+    """Nenhum driver ficou disponível dentro do tempo de espera"""
+
+
+class _Slot:
+    """Driver gerenciado pelo pool e seus contadores de uso"""
+
+    __slots__ = ("driver", "created", "navigations")
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.created = time.monotonic()
+        self.navigations = 0
+
+
+class DriverPool:
+    """
+    Pool limitado de drivers pré-iniciados com checkout/checkin.
+
+    - health check antes de reutilizar um driver ocioso
+    - reset entre usos (abas extras, cookies, storage)
+    - reciclagem após N navegações, idade máxima ou falha
+    """
+
+    def __init__(self, factory: Callable, size: int = 2, warmup: int = 1,
+                 max_navigations: int = 50, max_age: float = 1800.0,
+                 acquire_timeout: float = 60.0):
+        self.factory = factory
+        self.size = max(1, size)
+        self.warmup = max(0, min(warmup, self.size))
+        self.max_navigations = max_navigations
+        self.max_age = max_age
+        self.acquire_timeout = acquire_timeout
+
+        self._idle: List[_Slot] = []
+        self._busy = {}  # id(driver) -> _Slot
+        self._pending = 0  # drivers sendo criados fora do lock
+        self._checking = 0  # drivers em health check/reset fora do lock
+        self._closed = False
+        self._cond = threading.Condition()
+        self.created = 0
+        self.recycled = 0
+
+    # --- ciclo de vida ---
+
+    def start(self):
+        """Pré-inicia `warmup` drivers em background"""
+        if self.warmup:
+            threading.Thread(target=self._warm_up, name="driver-pool-warmup",
+                             daemon=True).start()
+
+    def _warm_up(self):
+        for _ in range(self.warmup):
+            with self._cond:
+                if self._closed or self._total() >= self.size:
+                    return
+                self._pending += 1
+            slot = self._create()
+            with self._cond:
+                self._pending -= 1
+                if slot is not None:
+                    self._idle.append(slot)
+                self._cond.notify()
+        logging.info(f"Pool de drivers aquecido: {len(self._idle)} ocioso(s)")
+
+    def close(self):
+        """Encerra todos os drivers ociosos; os em uso são encerrados no checkin"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for slot in idle:
+            self._quit(slot)
+
+    # --- checkout / checkin ---
+
+    def acquire(self, timeout: Optional[float] = None) -> _Slot:
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolExhausted("Pool de drivers encerrado")
+                    if self._idle:
+                        # Continua contando no limite enquanto é validado
+                        slot = self._idle.pop()
+                        self._checking += 1
+                        create = False
+                        break
+                    if self._total() < self.size:
+                        self._pending += 1
+                        slot = None
+                        create = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolExhausted(
+                            f"Nenhum driver disponível após {timeout:.0f}s "
+                            f"({self.size} em uso)"
+                        )
+                    self._cond.wait(remaining)
+
+            if create:
+                slot = self._create()
+                with self._cond:
+                    self._pending -= 1
+                    if slot is None:
+                        self._cond.notify()
+                        raise PoolExhausted("Falha ao iniciar o Chrome")
+                    self._busy[id(slot.driver)] = slot
+                return slot
+
+            # Driver ocioso: valida antes de entregar
+            if self._expired(slot) or not self._healthy(slot):
+                self._discard(slot, checking=True)
+                continue
+            with self._cond:
+                self._checking -= 1
+                self._busy[id(slot.driver)] = slot
+            return slot
+
+    def release(self, slot: _Slot, broken: bool = False):
+        with self._cond:
+            self._busy.pop(id(slot.driver), None)
+            # Durante o reset o driver segue vivo e ocupando uma vaga
+            self._checking += 1
+        if broken or self._closed or self._expired(slot) or not self._reset(slot):
+            self._discard(slot, checking=True)
+            return
+        with self._cond:
+            self._checking -= 1
+            self._idle.append(slot)
+            self._cond.notify()
+
+    @contextmanager
+    def driver(self, timeout: Optional[float] = None):
+        """Context manager que entrega um driver e o devolve ao pool"""
+        slot = self.acquire(timeout)
+        slot.navigations += 1
+        broken = False
+        try:
+            yield slot.driver
+        except WebDriverException:
+            # Sessão pode ter morrido; o reset no checkin confirma
+            broken = not self._healthy(slot)
+            raise
+        finally:
+            self.release(slot, broken=broken)
+
+    def note_navigations(self, driver, count: int = 1):
+        """Contabiliza navegações extras feitas com um driver em uso"""
+        with self._cond:
+            slot = self._busy.get(id(driver))
+            if slot is not None:
+                slot.navigations += count
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": self.size,
+                "idle": len(self._idle),
+                "busy": len(self._busy),
+                "starting": self._pending,
+                "checking": self._checking,
+                "created": self.created,
+                "recycled": self.recycled,
+            }
+
+    # --- internos ---
+
+    def _total(self) -> int:
+        return len(self._idle) + len(self._busy) + self._pending + self._checking
+
+    def _create(self) -> Optional[_Slot]:
+        try:
+            driver = self.factory()
+        except Exception:
+            logging.exception("Erro ao iniciar driver do pool")
+            return None
+        with self._cond:
+            self.created += 1
+        return _Slot(driver)
+
+    def _expired(self, slot: _Slot) -> bool:
+        return (slot.navigations >= self.max_navigations
+                or time.monotonic() - slot.created >= self.max_age)
+
+    @staticmethod
+    def _healthy(slot: _Slot) -> bool:
+        try:
+            return slot.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    @staticmethod
+    def _reset(slot: _Slot) -> bool:
+        """Fecha abas extras e limpa cookies/storage; False se o driver falhou"""
+        driver = slot.driver
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            origin = driver.execute_script("return window.location.origin")
+            if origin and origin != "null":
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin",
+                                       {"origin": origin, "storageTypes": "all"})
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            logging.warning(f"Falha ao resetar driver do pool: {e}")
+            return False
+
+    def _discard(self, slot: _Slot, checking: bool = False):
+        self._quit(slot)
+        with self._cond:
+            if checking:
+                self._checking -= 1
+            self.recycled += 1
+            self._cond.notify()
+
+    @staticmethod
+    def _quit(slot: _Slot):
+        try:
+            slot.driver.quit()
+        except Exception:
+            pass
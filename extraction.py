@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Extração de dados da página em uma única chamada execute_script,
+em vez de uma chamada WebDriver por linha/célula
+"""
+
+import time
+import logging
+from typing import Dict, List, Optional
+
+# Recebe {nome: seletor da tabela} e devolve {nome: [[célula, ...], ...]}
+# (null quando a tabela não existe)
+_TABLES_JS = """
+const out = {};
+for (const [name, selector] of Object.entries(arguments[0])) {
+  const table = document.querySelector(selector);
+  out[name] = table === null ? null : Array.from(
+    table.querySelectorAll(arguments[1]),
+    row => Array.from(row.querySelectorAll('td'), td => td.innerText.trim())
+  );
+}
+return out;
+"""
+
+# Recebe {nome: seletor} e devolve {nome: texto} (null quando não existe)
+_TEXTS_JS = """
+const out = {};
+for (const [name, selector] of Object.entries(arguments[0])) {
+  const el = document.querySelector(selector);
+  out[name] = el === null ? null : el.innerText.trim();
+}
+return out;
+"""
+
+
+def extract_tables(driver, selectors: Dict[str, str],
+                   row_selector: str = "tbody tr") -> Dict[str, Optional[List[List[str]]]]:
+    """Lê uma ou mais tabelas inteiras como matrizes de texto"""
+    start = time.perf_counter()
+    result = driver.execute_script(_TABLES_JS, selectors, row_selector)
+    elapsed = (time.perf_counter() - start) * 1000
+    rows = sum(len(t) for t in result.values() if t)
+    logging.debug(
+        f"Extração de {len(selectors)} tabela(s), {rows} linha(s): "
+        f"1 chamada WebDriver em {elapsed:.1f} ms"
+    )
+    return result
+
+
+def extract_texts(driver, selectors: Dict[str, str]) -> Dict[str, Optional[str]]:
+    """Lê o texto de vários elementos de uma vez"""
+    start = time.perf_counter()
+    result = driver.execute_script(_TEXTS_JS, selectors)
+    elapsed = (time.perf_counter() - start) * 1000
+    logging.debug(
+        f"Extração de {len(selectors)} texto(s): "
+        f"1 chamada WebDriver em {elapsed:.1f} ms"
+    )
+    return result
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Hedging de scrapings lentos: quando uma tentativa passa do percentil das
+durações recentes, uma segunda começa em outro navegador; a primeira que
+terminar vence e a outra é cancelada
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+
+class HedgeCancelled(Exception):
+    """A tentativa perdeu a corrida e foi interrompida"""
+
+
+_local = threading.local()
+
+
+def check_cancelled() -> None:
+    """
+    Ponto de cancelamento cooperativo: levanta HedgeCancelled se a
+    tentativa em execução nesta thread já perdeu a corrida. Chamado nos
+    laços de espera (readiness), onde um scraping passa quase todo o tempo.
+    """
+    event = getattr(_local, "cancel", None)
+    if event is not None and event.is_set():
+        raise HedgeCancelled("Tentativa cancelada: a outra terminou antes")
+
+
+class _Attempt:
+    __slots__ = ("future", "cancel", "backup")
+
+    def __init__(self, executor, fn, backup: bool):
+        self.cancel = threading.Event()
+        self.backup = backup
+        self.future = executor.submit(self._run, fn, self.cancel)
+
+    @staticmethod
+    def _run(fn, cancel):
+        _local.cancel = cancel
+        start = time.monotonic()
+        try:
+            return fn(), time.monotonic() - start
+        finally:
+            _local.cancel = None
+
+
+class Hedger:
+    """
+    Por endpoint, guarda as últimas `window` durações de sucesso. Com pelo
+    menos `min_samples`, uma tentativa que passa do `percentile` dessas
+    durações (nunca menos que `min_delay`) dispara uma segunda, desde que
+    menos de `budget` das últimas `window` requisições tenham sido
+    duplicadas e `can_hedge()` (ex.: há navegador livre no pool) permita.
+    """
+
+    def __init__(self, percentile: float = 95.0, window: int = 100,
+                 min_samples: int = 20, budget: float = 0.1,
+                 min_delay: float = 1.0, max_workers: int = 32,
+                 can_hedge: Optional[Callable[[], bool]] = None, events=None):
+        self.percentile = percentile
+        self.window = window
+        self.min_samples = max(1, min_samples)
+        self.budget = budget
+        self.min_delay = min_delay
+        self.can_hedge = can_hedge
+        # Counter (endpoint, event) opcional, exposto em /metrics
+        self.events = events
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="hedge")
+        self._durations: Dict[str, deque] = {}
+        self._hedged: Dict[str, deque] = {}   # 1 para requisição duplicada
+        self._counters: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def delay(self, endpoint: str) -> Optional[float]:
+        """Quanto esperar antes de duplicar; None se ainda não há amostras"""
+        with self._lock:
+            durations = self._durations.get(endpoint)
+            if durations is None or len(durations) < self.min_samples:
+                return None
+            ordered = sorted(durations)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return max(self.min_delay, ordered[index])
+
+    def run(self, endpoint: str, fn: Callable[[], Any]) -> Any:
+        """Executa fn com hedging; devolve o resultado da primeira que terminar"""
+        delay = self.delay(endpoint)
+        if delay is None:
+            # Sem histórico: executa direto na thread de quem chamou
+            start = time.monotonic()
+            result = fn()
+            self._finish(endpoint, time.monotonic() - start, hedged=False)
+            return result
+
+        primary = _Attempt(self._executor, fn, backup=False)
+        done, _ = wait([primary.future], timeout=delay)
+        if done:
+            return self._single(endpoint, primary)
+
+        if not self._allow(endpoint):
+            self._count(endpoint, "budget_exhausted")
+            return self._single(endpoint, primary)
+        if self.can_hedge is not None and not self.can_hedge():
+            self._count(endpoint, "no_capacity")
+            return self._single(endpoint, primary)
+
+        logging.info("[%s] tentativa passou de %.1fs (p%g); disparando hedge",
+                     endpoint, delay, self.percentile)
+        self._count(endpoint, "fired")
+        backup = _Attempt(self._executor, fn, backup=True)
+        pending = {primary.future: primary, backup.future: backup}
+        error = None
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                attempt = pending.pop(future)
+                if future.exception() is None:
+                    for other in pending.values():
+                        other.cancel.set()
+                    result, elapsed = future.result()
+                    self._count(endpoint, "won" if attempt.backup else "lost")
+                    self._finish(endpoint, elapsed, hedged=True)
+                    return result
+                if error is None or not attempt.backup:
+                    error = future.exception()
+        self._count(endpoint, "both_failed")
+        self._finish(endpoint, None, hedged=True)
+        raise error
+
+    def _single(self, endpoint: str, attempt: _Attempt) -> Any:
+        try:
+            result, elapsed = attempt.future.result()
+        except Exception:
+            self._finish(endpoint, None, hedged=False)
+            raise
+        self._finish(endpoint, elapsed, hedged=False)
+        return result
+
+    def _allow(self, endpoint: str) -> bool:
+        with self._lock:
+            hedged = self._hedged.get(endpoint, ())
+            return sum(hedged) + 1 <= self.budget * max(len(hedged) + 1, self.min_samples)
+
+    def _finish(self, endpoint: str, elapsed: Optional[float], hedged: bool):
+        with self._lock:
+            if elapsed is not None:
+                self._durations.setdefault(endpoint, deque(maxlen=self.window)).append(elapsed)
+            self._hedged.setdefault(endpoint, deque(maxlen=self.window)).append(int(hedged))
+            counters = self._counter(endpoint)
+            counters["requests"] += 1
+
+    def _counter(self, endpoint: str) -> dict:
+        counters = self._counters.get(endpoint)
+        if counters is None:
+            counters = self._counters[endpoint] = {
+                "requests": 0, "fired": 0, "won": 0, "lost": 0, "both_failed": 0,
+                "budget_exhausted": 0, "no_capacity": 0,
+            }
+        return counters
+
+    def _count(self, endpoint: str, event: str):
+        with self._lock:
+            self._counter(endpoint)[event] += 1
+        if self.events is not None:
+            self.events.inc(endpoint, event)
+
+    def stats(self) -> dict:
+        endpoints = {}
+        with self._lock:
+            names = list(self._counters)
+        for endpoint in names:
+            delay = self.delay(endpoint)
+            with self._lock:
+                counters = dict(self._counters[endpoint])
+            counters["delay"] = round(delay, 2) if delay is not None else None
+            endpoints[endpoint] = counters
+        return endpoints
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Validação condicional HTTP: ETag forte pelo conteúdo (uma por codificação),
+Last-Modified pela hora do scraping e 304 para If-None-Match / If-Modified-Since
+"""
+
+import json
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Mapping, Optional
+
+
+def make_etag(value: Any) -> str:
+    """
+    ETag forte (entre aspas) do conteúdo: dos próprios bytes, se já vier
+    codificado, ou do JSON canônico (mesma estrutura, mesma ETag)
+    """
+    if not isinstance(value, bytes):
+        value = json.dumps(value, ensure_ascii=False, sort_keys=True,
+                           separators=(",", ":"), default=str).encode("utf-8")
+    return '"%s"' % hashlib.sha1(value).hexdigest()[:32]
+
+
+def encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    """
+    ETag da variante na codificação dada (None = a própria ETag):
+    "<hash>-gzip", "<hash>-br"
+    """
+    if encoding is None:
+        return etag
+    return '%s-%s"' % (etag[:-1], encoding)
+
+
+def _opaque_tag(tag: str) -> str:
+    # Comparação fraca ignora só o W/; o sufixo da codificação faz parte da
+    # ETag, e cada variante só casa com a sua
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def http_date(timestamp: float) -> str:
+    return formatdate(timestamp, usegmt=True)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match usa comparação fraca: W/"x" casa com "x", "x-gzip" não
+    etag = _opaque_tag(etag)
+    for tag in header.split(","):
+        if _opaque_tag(tag.strip()) == etag:
+            return True
+    return False
+
+
+def is_not_modified(headers: Mapping[str, str], etag: str,
+                    last_modified: Optional[float] = None) -> bool:
+    """
+    True quando o cliente já tem esta versão. If-None-Match tem precedência;
+    If-Modified-Since só vale sem ele (RFC 9110, 13.2.2).
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return False
+        return int(last_modified) <= since
+    return False
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Fila assíncrona de jobs de scraping com prioridade, prazo (deadline)
+e backpressure
+"""
+
+import time
+import uuid
+import asyncio
+import logging
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+EXPIRED = "expired"
+
+
+class QueueFull(Exception):
+    """Fila cheia; `retry_after` estima quando tentar de novo (segundos)"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Fila de scraping cheia")
+        self.retry_after = retry_after
+
+
+class Job:
+    __slots__ = ("id", "name", "fn", "priority", "created", "deadline",
+                 "status", "result", "error", "finished", "future")
+
+    def __init__(self, name: str, fn: Callable[[], Any], priority: int,
+                 deadline: float, future: asyncio.Future):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.fn = fn
+        self.priority = priority
+        self.created = time.monotonic()
+        self.deadline = deadline
+        self.status = QUEUED
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.finished = None
+        self.future = future
+
+    def info(self) -> dict:
+        return {
+            "job_id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "age": round(time.monotonic() - self.created, 1),
+            "error": str(self.error) if self.error else None,
+        }
+
+
+class JobQueue:
+    """
+    Fila limitada consumida por `workers` tarefas asyncio que executam os
+    scrapings em um executor próprio, sem ocupar o threadpool do Starlette.
+    Jobs cujo prazo já passou são descartados sem rodar.
+    """
+
+    def __init__(self, workers: int = 2, max_size: int = 100,
+                 result_ttl: float = 600.0):
+        self.workers = max(1, workers)
+        self.max_size = max_size
+        self.result_ttl = result_ttl
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tasks = []
+        self._jobs: Dict[str, Job] = {}
+        self._seq = itertools.count()
+        self._avg_duration = 10.0
+        self.counters = {"submitted": 0, "rejected": 0, "expired": 0,
+                         DONE: 0, FAILED: 0}
+
+    async def start(self):
+        self._queue = asyncio.PriorityQueue()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                            thread_name_prefix="scrape-job")
+        self._tasks = [asyncio.create_task(self._worker())
+                       for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, name: str, fn: Callable[[], Any], priority: str = "normal",
+               timeout: float = 60.0) -> Job:
+        """Enfileira um job; lança QueueFull quando não há espaço"""
+        if self._queue is None:
+            raise RuntimeError("Fila de jobs não iniciada")
+        self._purge()
+        if self._queue.qsize() >= self.max_size:
+            self.counters["rejected"] += 1
+            raise QueueFull(self.retry_after())
+        loop = asyncio.get_running_loop()
+        job = Job(name, fn, PRIORITIES.get(priority, PRIORITIES["normal"]),
+                  time.monotonic() + timeout, loop.create_future())
+        self._jobs[job.id] = job
+        self._queue.put_nowait((job.priority, next(self._seq), job))
+        self.counters["submitted"] += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._purge()
+        return self._jobs.get(job_id)
+
+    def retry_after(self) -> int:
+        pending = self._queue.qsize() if self._queue is not None else 0
+        return max(1, int(pending * self._avg_duration / self.workers))
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_size": self.max_size,
+            "running": sum(1 for j in self._jobs.values() if j.status == RUNNING),
+            "avg_duration": round(self._avg_duration, 2),
+            **self.counters,
+        }
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, job = await self._queue.get()
+            try:
+                if time.monotonic() >= job.deadline:
+                    # Ninguém mais espera por este resultado
+                    job.status = EXPIRED
+                    job.error = TimeoutError("Prazo do job expirou na fila")
+                    self.counters["expired"] += 1
+                    self._finish(job)
+                    continue
+                job.status = RUNNING
+                start = time.monotonic()
+                try:
+                    job.result = await loop.run_in_executor(self._executor, job.fn)
+                    job.status = DONE
+                except Exception as e:
+                    job.error = e
+                    job.status = FAILED
+                duration = time.monotonic() - start
+                self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+                self.counters[job.status] += 1
+                self._finish(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.exception("Erro inesperado no worker da fila")
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def _finish(job: Job):
+        job.finished = time.monotonic()
+        if job.future.done():
+            return
+        if job.error is not None:
+            job.future.set_exception(job.error)
+            # Evita o aviso "exception was never retrieved" em jobs sem espera
+            job.future.exception()
+        else:
+            job.future.set_result(job.result)
+
+    def _purge(self):
+        now = time.monotonic()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished is not None and now - job.finished > self.result_ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
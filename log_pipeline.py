@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Pipeline de logs que não bloqueia o event loop: QueueHandler no caminho da
+requisição, QueueListener escrevendo em uma thread própria, saída em JSON
+estruturado e agregação de eventos de bloqueio/rate limit por janela
+"""
+
+import sys
+import json
+import queue
+import atexit
+import logging
+import threading
+from collections import Counter
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+# Campos extras (logging.info(..., extra={...})) copiados para o JSON
+FIELDS = ("ip", "method", "path", "verdict", "rule", "status", "latency_ms",
+          "user_agent", "window_s", "total", "suppressed", "top_ips", "top_paths")
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for field in FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Enfileira o registro intacto. O prepare() padrão formata a mensagem e
+    descarta exc_info na thread que loga (o event loop), então o traceback
+    virava texto em "msg"; aqui toda a formatação fica para o QueueListener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(level: str = "INFO", fmt: str = "json") -> None:
+    """
+    Substitui logging.basicConfig: o logger raiz só enfileira registros e a
+    escrita em stderr acontece na thread do QueueListener
+    """
+    global _listener
+    if _listener is not None:
+        return
+    output = logging.StreamHandler(sys.stderr)
+    if fmt == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers[:] = [_DeferredQueueHandler(log_queue)]
+    root.setLevel(level)
+    _listener = QueueListener(log_queue, output, respect_handler_level=False)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Esvazia a fila e encerra a thread de escrita"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class EventSampler:
+    """
+    Agrega eventos repetitivos (bloqueios, rate limit) por janela.
+
+    Em cada janela de `window` segundos, os primeiros `per_key` eventos de
+    cada (veredito, IP) são registrados por completo; o restante só é
+    contado. No fim da janela sai um registro de resumo por veredito com
+    total, suprimidos e os IPs/paths mais frequentes. `max_keys` limita a
+    memória sob inundação de IPs distintos. A thread que fecha as janelas
+    só roda entre start() e stop().
+    """
+
+    def __init__(self, window: float = 10.0, per_key: int = 1,
+                 max_keys: int = 10_000, logger: Optional[logging.Logger] = None):
+        self.window = window
+        self.per_key = per_key
+        self.max_keys = max_keys
+        self.logger = logger or logging.getLogger("security")
+        self._lock = threading.Lock()
+        self._reset()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _reset(self):
+        self._seen = Counter()       # (veredito, ip) -> eventos na janela
+        self._totals = Counter()     # veredito -> eventos
+        self._suppressed = Counter()
+        self._ips = {}               # veredito -> Counter de IPs
+        self._paths = {}             # veredito -> Counter de paths
+
+    def event(self, verdict: str, message: str, *args, ip: str = "",
+              path: str = "", **fields) -> None:
+        """Registra um evento; a mensagem só é formatada se não for suprimida"""
+        if self.window <= 0:
+            self.logger.warning(message, *args,
+                                extra={"verdict": verdict, "ip": ip, "path": path, **fields})
+            return
+        key = (verdict, ip)
+        with self._lock:
+            self._totals[verdict] += 1
+            ips = self._ips.setdefault(verdict, Counter())
+            paths = self._paths.setdefault(verdict, Counter())
+            if len(ips) < self.max_keys or ip in ips:
+                ips[ip] += 1
+            if len(paths) < self.max_keys or path in paths:
+                paths[path] += 1
+            if key in self._seen or len(self._seen) < self.max_keys:
+                self._seen[key] += 1
+                emit = self._seen[key] <= self.per_key
+            else:
+                emit = False
+            if not emit:
+                self._suppressed[verdict] += 1
+        if emit:
+            self.logger.warning(message, *args,
+                                extra={"verdict": verdict, "ip": ip, "path": path, **fields})
+
+    def flush(self) -> None:
+        with self._lock:
+            totals, suppressed = self._totals, self._suppressed
+            ips, paths = self._ips, self._paths
+            self._reset()
+        for verdict, total in totals.items():
+            if not suppressed[verdict]:
+                continue  # todos os eventos já saíram completos
+            top_ips = [f"{ip}={n}" for ip, n in ips[verdict].most_common(5)]
+            top_paths = [f"{p}={n}" for p, n in paths[verdict].most_common(5)]
+            self.logger.warning(
+                "📊 RESUMO %s: %d eventos em %gs (%d suprimidos)",
+                verdict.upper(), total, self.window, suppressed[verdict],
+                extra={"verdict": verdict, "window_s": self.window, "total": total,
+                       "suppressed": suppressed[verdict], "top_ips": top_ips,
+                       "top_paths": top_paths},
+            )
+
+    def start(self) -> None:
+        """Inicia a thread de resumos; de novo após stop() (ex.: outro lifespan)"""
+        if self.window <= 0 or self._thread is not None:
+            return
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._flush_loop, args=(self._stopped,),
+                                        name="log-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread = None
+        self.flush()
+
+    def _flush_loop(self, stopped: threading.Event):
+        while not stopped.wait(self.window):
+            self.flush()
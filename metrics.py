@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Métricas no formato texto do Prometheus, sem dependências: contadores,
+histogramas de buckets fixos e gauges lidos só na hora da coleta
+"""
+
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Segundos; cobre de um execute_script rápido até um timeout de página
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                   2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+def _labels(names: Tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [
+        '%s="%s"' % (n, str(v).replace("\\", r"\\").replace('"', r'\"').replace("\n", r"\n"))
+        for n, v in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{%s}" % ",".join(pairs) if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Contador monotônico com labels"""
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labels)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    """
+    Histograma de buckets fixos: observe() é um bisect e três somas sob
+    lock, barato o bastante para ficar ligado em produção
+    """
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [contagem por bucket (+Inf no fim), soma, total]
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        """Mede o bloco, inclusive quando ele levanta exceção"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def count(self, *labels) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._series.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        bounds = self.buckets + (float("inf"),)
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(bounds, counts):
+                cumulative += n
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Gauge:
+    """Gauge calculado na coleta a partir de um callable (ex.: stats() do pool)"""
+
+    def __init__(self, name: str, help: str, collect: Callable[[], float]):
+        self.name = name
+        self.help = help
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        try:
+            value = self.collect()
+        except Exception:
+            return []
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge",
+                f"{self.name} {_number(value)}"]
+
+
+class Registry:
+    """Conjunto de métricas expostas juntas em /metrics"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, help: str, labels: Iterable[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name: str, help: str, collect: Callable[[], float]) -> Gauge:
+        return self._add(Gauge(name, help, collect))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+registry = Registry()
+
+scrape_stage_seconds = registry.histogram(
+    "scrape_stage_seconds",
+    "Duração de cada etapa do scraping (acquire, navigate, wait, extract)",
+    labels=("endpoint", "stage"),
+)
+driver_startup_seconds = registry.histogram(
+    "driver_startup_seconds", "Tempo para iniciar um Chrome novo",
+)
+hedge_events = registry.counter(
+    "hedge_events_total",
+    "Hedging: disparos, vitórias/derrotas da segunda tentativa e recusas",
+    labels=("endpoint", "event"),
+)
+circuit_events = registry.counter(
+    "circuit_events_total",
+    "Circuit breaker: transições de estado e chamadas rejeitadas por host",
+    labels=("host", "event"),
+)
+security_rejections = registry.counter(
+    "security_rejections_total",
+    "Requisições rejeitadas pelo middleware de segurança",
+    labels=("verdict", "rule"),
+)
@@ -3,102 +3,542 @@
 Monitor de segurança para acompanhar tentativas de ataque
 """
 
+import os
 import re
+import gzip
+import json
+import mmap
 import time
-from collections import defaultdict, Counter
+import hashlib
+import argparse
+from collections import deque, Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-import subprocess
-import sys
+from typing import List, Optional, Tuple
 
-def monitor_logs():
-    """Monitora logs em tempo real"""
-    print("🔍 Monitorando tentativas de ataque...")
+class SpaceSaving:
+    """
+    Heavy hitters com memória fixa (Space-Saving): guarda no máximo
+    `capacity` chaves. Uma chave nova, com a tabela cheia, toma o lugar da
+    menor e herda sua contagem como erro; toda chave com frequência acima de
+    total/capacity fica garantidamente na tabela.
+    """
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.counts = {}   # chave -> contagem (superestimada em no máximo errors[chave])
+        self.errors = {}
+        self.total = 0
+
+    def add(self, key, n: int = 1) -> None:
+        self.total += n
+        counts = self.counts
+        if key in counts:
+            counts[key] += n
+        elif len(counts) < self.capacity:
+            counts[key] = n
+            self.errors[key] = 0
+        else:
+            victim = min(counts, key=counts.get)
+            floor = counts.pop(victim)
+            del self.errors[victim]
+            counts[key] = floor + n
+            self.errors[key] = floor
+
+    def update(self, counter: Counter) -> None:
+        for key, n in counter.items():
+            self.add(key, n)
+
+    def top(self, k: int = 10) -> List[Tuple[bytes, int]]:
+        return sorted(self.counts.items(), key=lambda item: -item[1])[:k]
+
+
+class RollingTopK:
+    """
+    Top-K em janelas deslizantes (ex.: 1, 5 e 60 minutos): um SpaceSaving
+    por intervalo de `bucket_seconds`, somados na hora de consultar. A
+    memória é limitada pela maior janela: buckets × capacity chaves.
+    """
+
+    def __init__(self, windows=(60, 300, 3600), bucket_seconds: int = 60,
+                 capacity: int = 100):
+        self.windows = tuple(windows)
+        self.bucket_seconds = bucket_seconds
+        self.capacity = capacity
+        self._buckets = deque()   # (índice do intervalo, SpaceSaving)
+
+    def update(self, counter: Counter, now: Optional[float] = None) -> None:
+        if not counter:
+            return
+        index = int((time.time() if now is None else now) // self.bucket_seconds)
+        if not self._buckets or self._buckets[-1][0] != index:
+            self._buckets.append((index, SpaceSaving(self.capacity)))
+        self._buckets[-1][1].update(counter)
+        self._expire(index)
+
+    def top(self, window: int, k: int = 5, now: Optional[float] = None) -> List[Tuple[bytes, int]]:
+        """Maiores contagens aproximadas dos últimos `window` segundos"""
+        index = int((time.time() if now is None else now) // self.bucket_seconds)
+        self._expire(index)
+        first = index - max(1, window // self.bucket_seconds) + 1
+        merged = Counter()
+        for bucket_index, summary in self._buckets:
+            if bucket_index >= first:
+                merged.update(summary.counts)
+        return merged.most_common(k)
+
+    def _expire(self, index: int):
+        oldest = index - max(self.windows) // self.bucket_seconds + 1
+        while self._buckets and self._buckets[0][0] < oldest:
+            self._buckets.popleft()
+
+
+class LogFollower:
+    """
+    Acompanha um arquivo como `tail -F`: lê só os bytes novos, segue a
+    rotação (o caminho passa a apontar para outro inode, e o resto do
+    arquivo antigo é lido antes da troca) e recomeça do início quando o
+    arquivo é truncado. Devolve apenas linhas completas.
+    """
+
+    MAX_PARTIAL = 1024 * 1024   # linha sem fim maior que isso é descartada
+
+    def __init__(self, path: str, from_start: bool = False):
+        self.path = path
+        self._file = None
+        self._carry = b""
+        self.rotations = 0
+        self.truncations = 0
+        self._open(from_start)
+
+    def _open(self, from_start: bool = True) -> bool:
+        try:
+            self._file = open(self.path, "rb")
+        except FileNotFoundError:
+            self._file = None
+            return False
+        if not from_start:
+            self._file.seek(0, os.SEEK_END)
+        self._carry = b""
+        return True
+
+    def read(self) -> bytes:
+        """Linhas completas escritas desde a última chamada (pode ser b"")"""
+        if self._file is None:
+            # O arquivo ainda não existia: quando aparecer, lê desde o início
+            return self._drain() if self._open() else b""
+        data = self._drain()
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            return data   # entre o rename da rotação e a criação do novo
+        opened = os.fstat(self._file.fileno())
+        if (current.st_ino, current.st_dev) != (opened.st_ino, opened.st_dev):
+            self._file.close()
+            self.rotations += 1
+            tail = self._carry + b"\n" if self._carry else b""
+            if self._open():
+                return data + tail + self._drain()
+            return data + tail
+        if opened.st_size < self._file.tell():
+            self.truncations += 1
+            self._file.seek(0)
+            self._carry = b""
+            return data + self._drain()
+        return data
+
+    def _drain(self) -> bytes:
+        return self._complete(self._file.read())
+
+    def _complete(self, block: bytes) -> bytes:
+        data = self._carry + block
+        cut = data.rfind(b"\n") + 1
+        self._carry = data[cut:]
+        if len(self._carry) > self.MAX_PARTIAL:
+            self._carry = b""
+        return data[:cut]
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+WINDOWS = ((60, "1 min"), (300, "5 min"), (3600, "60 min"))
+
+
+def monitor_logs(log_file: str, interval: float = 30.0, poll: float = 1.0,
+                 from_start: bool = False, capacity: int = 100):
+    """
+    Monitora um log em tempo real: a cada `poll` segundos lê o que foi
+    escrito e, a cada `interval`, mostra os tops de 1, 5 e 60 minutos.
+    A memória não cresce com o tempo de execução: só `capacity` chaves por
+    minuto e dimensão, mais os totais.
+    """
+    print(f"🔍 Monitorando tentativas de ataque em {log_file}...")
     print("Pressione Ctrl+C para parar\n")
-    
-    blocked_ips = Counter()
-    attack_patterns = Counter()
-    
+
+    follower = LogFollower(log_file, from_start=from_start)
+    views = {name: RollingTopK(capacity=capacity) for name in ("ips", "paths", "user_agents")}
+    all_time = SpaceSaving(capacity)
+    total = 0
+    next_report = time.monotonic() + interval
+
     try:
-        # Se estiver rodando o servidor, monitore os logs
-        # Aqui você pode adaptar para ler de um arquivo de log se necessário
         while True:
-            # Simula monitoramento - em produção, leia de logs reais
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] Monitorando...")
-            
-            if blocked_ips:
-                print("\n📊 Top IPs bloqueados:")
-                for ip, count in blocked_ips.most_common(5):
-                    print(f"  {ip}: {count} tentativas")
-            
-            if attack_patterns:
-                print("\n🎯 Padrões de ataque mais comuns:")
-                for pattern, count in attack_patterns.most_common(5):
-                    print(f"  {pattern}: {count} vezes")
-            
-            time.sleep(30)  # Atualiza a cada 30 segundos
-            
+            data = follower.read()
+            if data:
+                stats = LogStats().scan(data)
+                attackers = stats.blocked_ips + stats.rate_limited_ips
+                now = time.time()
+                views["ips"].update(attackers, now)
+                views["paths"].update(stats.paths, now)
+                views["user_agents"].update(stats.user_agents, now)
+                all_time.update(attackers)
+                total += sum(attackers.values())
+
+            if time.monotonic() >= next_report:
+                next_report += interval
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] {total} tentativas desde o início")
+                for window, label in WINDOWS:
+                    ips = views["ips"].top(window)
+                    if not ips:
+                        continue
+                    print(f"\n📊 Últimos {label}:")
+                    print("  IPs:   " + ", ".join(f"{_text(ip)} ({n})" for ip, n in ips))
+                    paths = views["paths"].top(window)
+                    if paths:
+                        print("  Paths: " + ", ".join(f"{_text(p)} ({n})" for p, n in paths))
+                    uas = views["user_agents"].top(window, k=3)
+                    if uas:
+                        print("  UAs:   " + ", ".join(f"{_text(ua)[:40]} ({n})" for ua, n in uas))
+                print()
+
+            time.sleep(poll)
+
     except KeyboardInterrupt:
+        follower.close()
         print("\n\n📈 Relatório final:")
-        print(f"Total de IPs únicos bloqueados: {len(blocked_ips)}")
-        print(f"Total de tentativas bloqueadas: {sum(blocked_ips.values())}")
-        
-        if blocked_ips:
-            print("\n🥇 Top 10 atacantes:")
-            for i, (ip, count) in enumerate(blocked_ips.most_common(10), 1):
-                print(f"  {i:2d}. {ip:15s} - {count:3d} tentativas")
-
-def analyze_log_file(log_file: str):
-    """Analisa um arquivo de log específico"""
+        print(f"Total de tentativas bloqueadas: {total}")
+        if follower.rotations or follower.truncations:
+            print(f"Rotações: {follower.rotations}, truncamentos: {follower.truncations}")
+
+        if all_time.counts:
+            print("\n🥇 Top 10 atacantes (aproximado):")
+            for i, (ip, count) in enumerate(all_time.top(10), 1):
+                print(f"  {i:2d}. {_text(ip):15s} - {count:3d} tentativas")
+
+# Uma única regex, compilada uma vez, para todos os eventos de interesse.
+# Roda direto sobre bytes (mmap/blocos), sem decodificar linha a linha, e
+# cobre o log em texto e o JSON (campo "msg"), inclusive IPv6. O resto da
+# linha do BLOCKED (UA e regra) vai inteiro para `tail` e é separado só uma
+# vez por valor distinto: um quantificador preguiçoso com lookahead custava
+# mais que todo o resto da varredura.
+LOG_PATTERN = re.compile(
+    "🚨 BLOCKED: ".encode() +
+    rb"(?P<bip>[0-9A-Fa-f:.]+) - (?P<method>[A-Z]+) (?P<path>[^\s\"]+)(?P<tail>[^\r\n\"]*)"
+    rb"|" + "🚫 RATE LIMITED: ".encode() + rb"(?P<rip>[0-9A-Fa-f:.]+)"
+    rb"|" + "📊 RESUMO ".encode() +
+    rb"(?P<verdict>[A-Z_]+): (?P<total>\d+) eventos em [^(\n]*\((?P<suppressed>\d+) suprimidos\)",
+)
+UA_MARK = b" - UA: "
+RULE_MARK = b" - regra: "
+
+CHUNK_SIZE = 32 * 1024 * 1024
+# Abaixo disso, dividir entre processos custa mais do que ganha
+PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+CHECKPOINT_MAX_FILES = 1000
+
+
+class LogStats:
+    """Contadores agregáveis de uma análise (somáveis entre blocos e execuções)"""
+
+    FIELDS = ("blocked_ips", "rate_limited_ips", "paths", "user_agents", "rules", "suppressed")
+
+    def __init__(self):
+        for field in self.FIELDS:
+            setattr(self, field, Counter())
+        self.bytes = 0
+        self.lines = 0
+
+    def scan(self, data: bytes, start: int = 0, end: Optional[int] = None) -> "LogStats":
+        """Conta os eventos de data[start:end], sem copiar o trecho"""
+        end = len(data) if end is None else end
+        matches = LOG_PATTERN.findall(data, start, end)
+        if matches:
+            # Contagem por coluna: o laço fica no Counter (C), não em Python
+            bips, _, paths, tails, rips, verdicts, _, suppressed = zip(*matches)
+            for counter, column in ((self.blocked_ips, bips), (self.paths, paths),
+                                    (self.rate_limited_ips, rips)):
+                counter.update(column)
+                counter.pop(b"", None)
+            for tail, n in Counter(t for t in tails if t).items():
+                ua, rule = _split_tail(tail)
+                if ua is not None:
+                    self.user_agents[ua] += n
+                if rule is not None:
+                    self.rules[rule] += n
+            for verdict, n in zip(verdicts, suppressed):
+                if verdict:
+                    self.suppressed[verdict] += int(n)
+        self.bytes += end - start
+        self.lines += data.count(b"\n", start, end)
+        return self
+
+    def merge(self, other: "LogStats") -> "LogStats":
+        for field in self.FIELDS:
+            getattr(self, field).update(getattr(other, field))
+        self.bytes += other.bytes
+        self.lines += other.lines
+        return self
+
+    def to_dict(self) -> dict:
+        data = {field: {_text(k): v for k, v in getattr(self, field).items()}
+                for field in self.FIELDS}
+        data.update(bytes=self.bytes, lines=self.lines)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LogStats":
+        stats = cls()
+        for field in cls.FIELDS:
+            getattr(stats, field).update(
+                {k.encode("utf-8", "surrogateescape"): v for k, v in data.get(field, {}).items()})
+        stats.bytes = data.get("bytes", 0)
+        stats.lines = data.get("lines", 0)
+        return stats
+
+
+def _split_tail(tail: bytes) -> Tuple[Optional[bytes], Optional[bytes]]:
+    """Separa " - UA: <ua> - regra: <regra>" (ambos opcionais)"""
+    ua = rule = None
+    head, sep, after = tail.rpartition(RULE_MARK)
+    if sep:
+        rule = after.split(None, 1)[0] if after.strip() else None
+        tail = head
+    if tail.startswith(UA_MARK):
+        ua = tail[len(UA_MARK):]
+    return ua, rule
+
+
+def _text(value) -> str:
+    return value.decode("utf-8", "surrogateescape") if isinstance(value, bytes) else value
+
+
+def _scan_range(path: str, start: int, end: int) -> LogStats:
+    """Analisa os bytes [start, end) de um arquivo comum via mmap (roda em subprocesso)"""
+    stats = LogStats()
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = start
+        while pos < end:
+            # Blocos terminam em fim de linha
+            stop = min(end, pos + CHUNK_SIZE)
+            if stop < end:
+                stop = mm.find(b"\n", stop - 1, end) + 1 or end
+            stats.scan(mm[pos:stop])
+            pos = stop
+    return stats
+
+
+def _scan_gzip(path: str, skip: int) -> Tuple[LogStats, int]:
+    """
+    Analisa um .gz em streaming a partir do byte `skip` do conteúdo
+    descompactado; devolve as estatísticas e o total descompactado
+    """
+    stats = LogStats()
+    position = 0
+    carry = b""
+    with gzip.open(path, "rb") as f:
+        while True:
+            block = f.read(CHUNK_SIZE)
+            if not block:
+                break
+            if position + len(block) <= skip:
+                position += len(block)
+                continue
+            if position < skip:
+                block = block[skip - position:]
+                position = skip
+            data = carry + block
+            cut = data.rfind(b"\n") + 1
+            stats.scan(data, 0, cut)
+            carry = data[cut:]
+            position += len(block)
+    if carry:
+        stats.scan(carry)
+    return stats, position
+
+
+def _fingerprint(path: str) -> Optional[str]:
+    """
+    Identidade do conteúdo: hash da primeira linha (com timestamp). Continua
+    igual quando o arquivo é renomeado ou compactado na rotação, e muda
+    quando um novo arquivo é criado no lugar.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        first = f.readline(4096)
+    if not first.endswith(b"\n"):
+        return None  # nem uma linha completa ainda
+    return hashlib.sha1(first).hexdigest()
+
+
+def _load_checkpoint(path: Optional[str]) -> dict:
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {"version": 1, "files": {}, "stats": {}}
+
+
+def _save_checkpoint(path: str, checkpoint: dict):
+    files = checkpoint["files"]
+    if len(files) > CHECKPOINT_MAX_FILES:
+        for key in sorted(files, key=lambda k: files[k]["updated"])[:len(files) - CHECKPOINT_MAX_FILES]:
+            del files[key]
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)
+
+
+def analyze_logs(paths: List[str], checkpoint_file: Optional[str] = None,
+                 workers: Optional[int] = None) -> Tuple[LogStats, LogStats]:
+    """
+    Analisa arquivos de log (comuns ou .gz). Com checkpoint, cada arquivo
+    retoma do último byte processado (só linhas completas) e as
+    estatísticas acumulam entre execuções.
+
+    Arquivos grandes são divididos em faixas alinhadas em fim de linha e
+    analisados em paralelo por `workers` processos (padrão: núcleos).
+    Devolve (estatísticas acumuladas, estatísticas só desta execução).
+    """
+    checkpoint = _load_checkpoint(checkpoint_file)
+    workers = workers or os.cpu_count() or 1
+    tasks = []     # (função, args)
+    progress = []  # (chave, arquivo, novo offset, índice da tarefa gz ou None)
+
+    for path in paths:
+        path = os.path.abspath(path)
+        key = _fingerprint(path)
+        if key is None:
+            continue
+        done = checkpoint["files"].get(key, {}).get("offset", 0)
+        if path.endswith(".gz"):
+            progress.append((key, path, None, len(tasks)))
+            tasks.append((_scan_gzip, (path, done)))
+            continue
+        size = os.path.getsize(path)
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if done > size:
+                done = 0  # truncado: recomeça
+            end = mm.rfind(b"\n", done, size) + 1
+            if end <= done:
+                continue
+            step = max(CHUNK_SIZE, (end - done) // workers + 1)
+            if workers == 1 or end - done < PARALLEL_MIN_BYTES:
+                step = end - done
+            pos = done
+            while pos < end:
+                stop = min(end, pos + step)
+                if stop < end:
+                    stop = mm.find(b"\n", stop - 1, end) + 1 or end
+                tasks.append((_scan_range, (path, pos, stop)))
+                pos = stop
+        progress.append((key, path, end, None))
+
+    run = LogStats()
+    results = []
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            futures = [executor.submit(fn, *args) for fn, args in tasks]
+            results = [future.result() for future in futures]
+    else:
+        results = [fn(*args) for fn, args in tasks]
+    for result in results:
+        run.merge(result[0] if isinstance(result, tuple) else result)
+
+    total = LogStats.from_dict(checkpoint["stats"]).merge(run)
+    if checkpoint_file:
+        now = time.time()
+        for key, path, offset, gz_task in progress:
+            if gz_task is not None:
+                offset = results[gz_task][1]
+            checkpoint["files"][key] = {"path": path, "offset": offset, "updated": now}
+        checkpoint["stats"] = total.to_dict()
+        _save_checkpoint(checkpoint_file, checkpoint)
+    return total, run
+
+
+def print_report(stats: LogStats, run: Optional[LogStats] = None, elapsed: float = 0.0):
+    attackers = stats.blocked_ips + stats.rate_limited_ips
+    suppressed = sum(n for verdict, n in stats.suppressed.items()
+                     if verdict in (b"BLOCKED", b"RATE_LIMITED", "BLOCKED", "RATE_LIMITED"))
+    print(f"\n📊 Estatísticas:")
+    if run is not None:
+        speed = run.bytes / elapsed / 1e6 if elapsed else 0.0
+        print(f"Processados agora: {run.bytes / 1e6:.1f} MB, {run.lines} linhas "
+              f"em {elapsed:.1f}s ({speed:.0f} MB/s)")
+    print(f"IPs únicos bloqueados: {len(attackers)}")
+    print(f"Total de tentativas: {sum(attackers.values()) + suppressed}")
+    if suppressed:
+        print(f"  (inclui {suppressed} eventos agregados em 📊 RESUMO, sem IP/path)")
+
+    if attackers:
+        print(f"\n🥇 Top 10 atacantes:")
+        for i, (ip, count) in enumerate(attackers.most_common(10), 1):
+            print(f"  {i:2d}. {_text(ip):15s} - {count:3d} tentativas")
+
+    if stats.paths:
+        print(f"\n🎯 Paths mais atacados:")
+        for i, (path, count) in enumerate(stats.paths.most_common(10), 1):
+            print(f"  {i:2d}. {_text(path):30s} - {count:3d} tentativas")
+
+    if stats.user_agents:
+        print(f"\n🕵️ User agents mais frequentes:")
+        for i, (ua, count) in enumerate(stats.user_agents.most_common(10), 1):
+            print(f"  {i:2d}. {_text(ua)[:60]:60s} - {count:3d}")
+
+    if stats.rules:
+        print(f"\n📏 Regras que mais bloquearam:")
+        for i, (rule, count) in enumerate(stats.rules.most_common(10), 1):
+            print(f"  {i:2d}. {_text(rule):30s} - {count:3d}")
+
+def analyze_log_file(log_file: str, checkpoint_file: Optional[str] = None,
+                     workers: Optional[int] = None) -> Optional[LogStats]:
+    """Analisa um arquivo de log específico (comum ou .gz)"""
     print(f"📁 Analisando arquivo: {log_file}")
-    
-    blocked_ips = Counter()
-    paths_attacked = Counter()
-    user_agents = Counter()
-    
     try:
-        with open(log_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                # Procura por logs de bloqueio
-                if "🚨 BLOCKED:" in line:
-                    # Extrai IP
-                    ip_match = re.search(r'BLOCKED: (\d+\.\d+\.\d+\.\d+)', line)
-                    if ip_match:
-                        blocked_ips[ip_match.group(1)] += 1
-                    
-                    # Extrai path
-                    path_match = re.search(r'(GET|POST) ([^\s]+)', line)
-                    if path_match:
-                        paths_attacked[path_match.group(2)] += 1
-                
-                # Procura por rate limiting
-                elif "🚫 RATE LIMITED:" in line:
-                    ip_match = re.search(r'RATE LIMITED: (\d+\.\d+\.\d+\.\d+)', line)
-                    if ip_match:
-                        blocked_ips[ip_match.group(1)] += 1
-        
-        print(f"\n📊 Estatísticas:")
-        print(f"IPs únicos bloqueados: {len(blocked_ips)}")
-        print(f"Total de tentativas: {sum(blocked_ips.values())}")
-        
-        if blocked_ips:
-            print(f"\n🥇 Top 10 atacantes:")
-            for i, (ip, count) in enumerate(blocked_ips.most_common(10), 1):
-                print(f"  {i:2d}. {ip:15s} - {count:3d} tentativas")
-        
-        if paths_attacked:
-            print(f"\n🎯 Paths mais atacados:")
-            for i, (path, count) in enumerate(paths_attacked.most_common(10), 1):
-                print(f"  {i:2d}. {path:30s} - {count:3d} tentativas")
-                
+        start = time.monotonic()
+        stats, run = analyze_logs([log_file], checkpoint_file, workers)
+        print_report(stats, run, time.monotonic() - start)
+        return stats
     except FileNotFoundError:
         print(f"❌ Arquivo não encontrado: {log_file}")
     except Exception as e:
         print(f"❌ Erro ao analisar arquivo: {e}")
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
+    parser = argparse.ArgumentParser(description="Monitor e análise de logs de segurança")
+    parser.add_argument("logs", nargs="*", help="arquivos de log (comuns ou .gz, ex.: api.log*)")
+    parser.add_argument("--checkpoint", help="arquivo de checkpoint para análises incrementais")
+    parser.add_argument("--workers", type=int, help="processos para arquivos grandes (padrão: núcleos)")
+    parser.add_argument("--reset", action="store_true", help="descarta o checkpoint e reanalisa tudo")
+    parser.add_argument("--follow", metavar="LOG", help="acompanha o log em tempo real (segue rotação)")
+    parser.add_argument("--interval", type=float, default=30.0, help="segundos entre relatórios do --follow")
+    parser.add_argument("--from-start", action="store_true", help="no --follow, lê o arquivo desde o início")
+    args = parser.parse_args()
+
+    if args.follow:
+        # Monitora em tempo real
+        monitor_logs(args.follow, interval=args.interval, from_start=args.from_start)
+    elif len(args.logs) == 1 and not args.checkpoint:
         # Analisa arquivo específico
-        analyze_log_file(sys.argv[1])
+        analyze_log_file(args.logs[0], workers=args.workers)
+    elif args.logs:
+        if args.reset and args.checkpoint and os.path.exists(args.checkpoint):
+            os.remove(args.checkpoint)
+        print(f"📁 Analisando {len(args.logs)} arquivo(s)")
+        inicio = time.monotonic()
+        stats, run = analyze_logs(args.logs, args.checkpoint, args.workers)
+        print_report(stats, run, time.monotonic() - inicio)
     else:
-        # Monitora em tempo real
-        monitor_logs()
\ No newline at end of file
+        parser.print_help()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Rate limiting por IP com token bucket, memória O(1) por chave,
+despejo de chaves ociosas e bloqueios que expiram
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+def parse_rules(spec: str) -> Dict[str, Tuple[int, float]]:
+    """
+    Converte "/trends=10/60,/categories=60/60" em
+    {"/trends": (10, 60.0), "/categories": (60, 60.0)}
+    """
+    rules = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        route, _, limit = item.strip().partition("=")
+        requests, _, window = limit.partition("/")
+        rules[route.strip()] = (int(requests), float(window or 60))
+    return rules
+
+
+class RateLimiter:
+    """
+    Um bucket por (IP, rota): capacidade `requests`, reposto à taxa
+    requests/window. Quem esvazia o bucket fica bloqueado por
+    `block_seconds` (0 = apenas rejeita até repor).
+
+    Buckets cheios há mais de uma janela equivalem a buckets novos e são
+    descartados; `max_keys` limita a memória mesmo sob varredura de IPs.
+    """
+
+    def __init__(self, requests: int = 10, window: float = 60.0,
+                 routes: Optional[Dict[str, Tuple[int, float]]] = None,
+                 block_seconds: float = 300.0, max_keys: int = 100_000):
+        self.default = (requests, window)
+        # Prefixo mais longo primeiro
+        self.routes = sorted((routes or {}).items(), key=lambda r: -len(r[0]))
+        self.block_seconds = block_seconds
+        self.max_keys = max_keys
+        # Depois de uma janela inteira sem acesso o bucket está cheio de novo
+        self._idle_after = max([window] + [w for _, (_, w) in self.routes])
+        # chave -> [tokens, último acesso]; ordenado do mais antigo ao mais recente
+        self._buckets: "OrderedDict[tuple, list]" = OrderedDict()
+        self._blocked: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0
+        self.blocks = 0
+        self.rejected = 0
+
+    def rule_for(self, path: str) -> Tuple[str, int, float]:
+        for route, (requests, window) in self.routes:
+            if path == route or path.startswith(route.rstrip("/") + "/"):
+                return route, requests, window
+        return "*", self.default[0], self.default[1]
+
+    def check(self, client_ip: str, path: str = "/") -> bool:
+        """True se a requisição pode seguir"""
+        now = time.monotonic()
+        with self._lock:
+            until = self._blocked.get(client_ip)
+            if until is not None:
+                if now < until:
+                    self.rejected += 1
+                    return False
+                del self._blocked[client_ip]
+
+            route, capacity, window = self.rule_for(path)
+            key = (client_ip, route)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(capacity), now]
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * capacity / window)
+                bucket[1] = now
+
+            self._evict(now)
+
+            if bucket[0] < 1.0:
+                self.rejected += 1
+                if self.block_seconds > 0:
+                    self._blocked[client_ip] = now + self.block_seconds
+                    self.blocks += 1
+                    logging.warning(f"IP {client_ip} bloqueado por excesso de requests "
+                                    f"em {route} ({self.block_seconds:.0f}s)")
+                return False
+            bucket[0] -= 1.0
+            return True
+
+    def retry_after(self, client_ip: str, path: str = "/") -> float:
+        """Segundos até a próxima requisição do IP na rota poder seguir"""
+        now = time.monotonic()
+        with self._lock:
+            until = self._blocked.get(client_ip)
+            if until is not None and now < until:
+                return until - now
+            route, capacity, window = self.rule_for(path)
+            bucket = self._buckets.get((client_ip, route))
+            if bucket is None:
+                return 0.0
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * capacity / window)
+            return max(0.0, (1.0 - tokens) * window / capacity)
+
+    def is_blocked(self, client_ip: str) -> bool:
+        with self._lock:
+            until = self._blocked.get(client_ip)
+            return until is not None and time.monotonic() < until
+
+    def _evict(self, now: float):
+        # Buckets na frente são os acessados há mais tempo
+        while self._buckets:
+            key, (_, last) = next(iter(self._buckets.items()))
+            if now - last < self._idle_after and len(self._buckets) <= self.max_keys:
+                break
+            self._buckets.popitem(last=False)
+            self.evicted += 1
+        while self._blocked:
+            ip, until = next(iter(self._blocked.items()))
+            if until > now and len(self._blocked) <= self.max_keys:
+                break
+            self._blocked.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "active_keys": len(self._buckets),
+                "evicted_keys": self.evicted,
+                "blocked_ips": len(self._blocked),
+                "blocks": self.blocks,
+                "rejected": self.rejected,
+            }
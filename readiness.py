@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Espera de prontidão das páginas baseada em sinais concretos
+(seletor presente, texto preenchido, contagem de linhas estável,
+rede ociosa via CDP), em vez de time.sleep() fixos
+"""
+
+import json
+import time
+import logging
+import threading
+from typing import Dict, Optional, Sequence
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from hedging import check_cancelled
+
+POLL_INTERVAL = 0.1
+
+
+class ReadinessTarget:
+    """
+    Descreve quando uma página está pronta para extração.
+
+    - selectors: elementos que precisam existir (obrigatório)
+    - text: elemento cujo texto precisa estar preenchido (obrigatório)
+    - rows: seletor cuja contagem precisa ficar estável por `stable_ms`
+    - network_idle_ms: tempo sem requisições em andamento (via CDP)
+
+    Estabilidade de linhas e rede ociosa são de melhor esforço: ao estourar
+    o timeout a extração segue com o que já carregou.
+    """
+
+    def __init__(self, name: str, selectors: Sequence[str] = (),
+                 text: Optional[str] = None, rows: Optional[str] = None,
+                 stable_ms: int = 0, network_idle_ms: int = 0,
+                 timeout: float = 20.0):
+        self.name = name
+        self.selectors = tuple(selectors)
+        self.text = text
+        self.rows = rows
+        self.stable_ms = stable_ms
+        self.network_idle_ms = network_idle_ms
+        self.timeout = timeout
+
+
+class NetworkTracker:
+    """
+    Acompanha a atividade de rede de um driver lendo o log de performance
+    do Chrome (eventos CDP Network.*). Requer a capability
+    goog:loggingPrefs {"performance": "ALL"}.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.available = True
+        self.inflight = set()
+        self.requests = 0
+        self.failed = 0
+        self.blocked = 0
+        self.bytes = 0
+        self.last_activity = time.monotonic()
+
+    def reset(self):
+        """Descarta eventos anteriores (ex.: de um uso prévio do driver)"""
+        self._drain()
+        self.inflight.clear()
+        self.requests = self.failed = self.blocked = self.bytes = 0
+        self.last_activity = time.monotonic()
+
+    def poll(self):
+        for message in self._drain():
+            self.handle(message.get("method"), message.get("params", {}))
+
+    def handle(self, method: str, params: dict):
+        request_id = params.get("requestId")
+        if method == "Network.requestWillBeSent":
+            self.inflight.add(request_id)
+            self.requests += 1
+        elif method == "Network.loadingFinished":
+            self.inflight.discard(request_id)
+            self.bytes += int(params.get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed":
+            self.inflight.discard(request_id)
+            self.failed += 1
+            if params.get("blockedReason"):
+                self.blocked += 1
+        else:
+            return
+        self.last_activity = time.monotonic()
+
+    def idle_for(self) -> float:
+        """Segundos desde a última atividade, ou 0 se há requisições pendentes"""
+        if self.inflight:
+            return 0.0
+        return time.monotonic() - self.last_activity
+
+    def _drain(self):
+        if not self.available:
+            return []
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception:
+            self.available = False
+            return []
+        messages = []
+        for entry in entries:
+            try:
+                messages.append(json.loads(entry["message"])["message"])
+            except (KeyError, ValueError):
+                continue
+        return messages
+
+
+class ReadinessStats:
+    """Acumula quanto tempo cada espera realmente levou"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def record(self, target: str, signal: str, seconds: float):
+        with self._lock:
+            d = self._data.setdefault(f"{target}.{signal}",
+                                      {"count": 0, "total": 0.0, "max": 0.0})
+            d["count"] += 1
+            d["total"] += seconds
+            d["max"] = max(d["max"], seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                k: {"count": d["count"],
+                    "avg_ms": round(d["total"] / d["count"] * 1000, 1),
+                    "max_ms": round(d["max"] * 1000, 1)}
+                for k, d in self._data.items()
+            }
+
+
+readiness_stats = ReadinessStats()
+
+
+def wait_ready(driver, target: ReadinessTarget,
+               tracker: Optional[NetworkTracker] = None) -> Dict[str, float]:
+    """Espera os sinais de `target` e devolve a duração de cada um (segundos)"""
+    start = time.monotonic()
+    deadline = start + target.timeout
+    timings = {}
+
+    def remaining() -> float:
+        return max(0.0, deadline - time.monotonic())
+
+    def mark(signal: str, since: float):
+        timings[signal] = time.monotonic() - since
+        readiness_stats.record(target.name, signal, timings[signal])
+
+    t = time.monotonic()
+    for selector in target.selectors:
+        present = EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+        WebDriverWait(driver, remaining(), POLL_INTERVAL).until(
+            lambda d: check_cancelled() or present(d)
+        )
+    if target.selectors:
+        mark("selector", t)
+
+    if target.text:
+        t = time.monotonic()
+        WebDriverWait(driver, remaining(), POLL_INTERVAL).until(
+            lambda d: check_cancelled() or d.execute_script(
+                "const el = document.querySelector(arguments[0]);"
+                "return el !== null && el.innerText.trim().length > 0;",
+                target.text,
+            ),
+            message=f"Texto vazio em {target.text}",
+        )
+        mark("text", t)
+
+    if target.rows and target.stable_ms:
+        t = time.monotonic()
+        if not _wait_rows_stable(driver, target.rows, target.stable_ms / 1000, deadline):
+            logging.warning(f"[{target.name}] contagem de linhas não estabilizou "
+                            f"em {target.timeout}s; seguindo")
+        mark("rows_stable", t)
+
+    if target.network_idle_ms and tracker is not None and tracker.available:
+        t = time.monotonic()
+        if not _wait_network_idle(tracker, target.network_idle_ms / 1000, deadline):
+            logging.warning(f"[{target.name}] rede não ficou ociosa "
+                            f"em {target.timeout}s; seguindo")
+        mark("network_idle", t)
+
+    total = time.monotonic() - start
+    readiness_stats.record(target.name, "total", total)
+    logging.info(f"[{target.name}] página pronta em {total * 1000:.0f} ms "
+                 + " ".join(f"{k}={v * 1000:.0f}ms" for k, v in timings.items()))
+    return timings
+
+
+def _wait_rows_stable(driver, rows_selector: str, stable_for: float,
+                      deadline: float) -> bool:
+    last_count = -1
+    since = time.monotonic()
+    while True:
+        check_cancelled()
+        count = driver.execute_script(
+            "return document.querySelectorAll(arguments[0]).length;", rows_selector
+        )
+        now = time.monotonic()
+        if count != last_count:
+            last_count, since = count, now
+        elif count > 0 and now - since >= stable_for:
+            return True
+        if now >= deadline:
+            return False
+        time.sleep(POLL_INTERVAL)
+
+
+def _wait_network_idle(tracker: NetworkTracker, idle_for: float,
+                       deadline: float) -> bool:
+    while True:
+        check_cancelled()
+        tracker.poll()
+        if tracker.idle_for() >= idle_for:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(POLL_INTERVAL)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Bloqueio de recursos desnecessários (imagens, fontes, mídia e rastreadores)
+durante o scraping, via CDP Network.setBlockedURLs e prefs do Chrome
+"""
+
+import logging
+import threading
+from typing import Dict, Iterable, List
+
+# Padrões de URL por tipo de recurso (sintaxe de curinga do CDP)
+TYPE_PATTERNS: Dict[str, List[str]] = {
+    "image": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif",
+              "*.svg", "*.ico"],
+    "font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+             "*fonts.gstatic.com*"],
+    "media": ["*.mp4", "*.webm", "*.ogg", "*.mp3", "*.m3u8", "*.mpd"],
+    "stylesheet": ["*.css", "*fonts.googleapis.com*"],
+}
+
+# Analytics, anúncios e rastreadores de terceiros
+DEFAULT_BLOCKED_URLS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*googlesyndication.com*",
+    "*googleadservices.com*",
+    "*adservice.google.*",
+    "*connect.facebook.net*",
+    "*hotjar.com*",
+    "*segment.io*",
+    "*sentry.io*",
+    "*clarity.ms*",
+]
+
+
+def blocked_patterns(types: Iterable[str], extra_urls: Iterable[str] = ()) -> List[str]:
+    """Monta a lista de padrões a bloquear para os tipos e URLs informados"""
+    patterns = []
+    for t in types:
+        patterns.extend(TYPE_PATTERNS.get(t, []))
+    patterns.extend(DEFAULT_BLOCKED_URLS)
+    patterns.extend(u for u in extra_urls if u)
+    # Remove duplicados mantendo a ordem
+    return list(dict.fromkeys(patterns))
+
+
+def chrome_prefs(types: Iterable[str]) -> dict:
+    """Prefs do Chrome que complementam o bloqueio por URL"""
+    prefs = {}
+    if "image" in types:
+        # Bloqueia imagens sem extensão na URL (ex.: CDNs com query string)
+        prefs["profile.managed_default_content_settings.images"] = 2
+    return prefs
+
+
+def apply_resource_filter(driver, patterns: List[str]) -> None:
+    """Ativa o bloqueio de URLs na aba atual do driver"""
+    if not patterns:
+        return
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+
+
+class NetworkStats:
+    """Requisições, bloqueios e bytes por endpoint, para medir a economia"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def record(self, endpoint: str, tracker) -> None:
+        tracker.poll()
+        if not tracker.available:
+            return
+        with self._lock:
+            d = self._data.setdefault(endpoint, {"scrapes": 0, "requests": 0,
+                                                 "blocked": 0, "bytes": 0})
+            d["scrapes"] += 1
+            d["requests"] += tracker.requests
+            d["blocked"] += tracker.blocked
+            d["bytes"] += tracker.bytes
+        logging.info(
+            f"[{endpoint}] rede: {tracker.requests} requisições, "
+            f"{tracker.blocked} bloqueadas, {tracker.bytes / 1024:.0f} KB baixados"
+        )
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                k: {**d,
+                    "avg_requests": round(d["requests"] / d["scrapes"], 1),
+                    "avg_blocked": round(d["blocked"] / d["scrapes"], 1),
+                    "avg_kb": round(d["bytes"] / d["scrapes"] / 1024, 1)}
+                for k, d in self._data.items()
+            }
+
+
+network_stats = NetworkStats()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Corpos JSON codificados uma única vez (orjson quando disponível) e
+variantes gzip/brotli calculadas sob demanda e guardadas junto dos bytes
+"""
+
+import json
+import gzip
+import threading
+from typing import Dict, Optional, Tuple
+
+from http_cache import encoded_etag, make_etag
+
+try:
+    import orjson
+except ImportError:   # fica mais lento, mas funciona
+    orjson = None
+
+try:
+    import brotli
+except ImportError:   # sem brotli, só gzip
+    brotli = None
+
+# Abaixo disso, comprimir custa mais do que economiza
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+CONTENT_TYPE = "application/json"
+
+
+def encode_json(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    """Preferência do servidor quando o cliente aceita mais de uma"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: Optional[str], available=None) -> Optional[str]:
+    """Codificação escolhida pelo Accept-Encoding (respeitando q=0), ou None"""
+    if not accept_encoding:
+        return None
+    available = supported_encodings() if available is None else available
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class EncodedBody:
+    """
+    Bytes prontos de uma resposta. Variantes comprimidas são feitas na
+    primeira requisição que as aceita e reaproveitadas nas seguintes.
+    """
+
+    __slots__ = ("raw", "etag", "_variants", "_lock")
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+        self.etag = make_etag(raw)
+        self._variants: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def of(cls, value) -> "EncodedBody":
+        return cls(encode_json(value))
+
+    def encoding_for(self, accept_encoding: Optional[str],
+                     min_size: int = COMPRESS_MIN_BYTES) -> Optional[str]:
+        """Content-Encoding a usar para o Accept-Encoding do cliente, ou None"""
+        if len(self.raw) < min_size:
+            return None
+        return negotiate(accept_encoding)
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """Cada variante é uma representação diferente, com ETag própria"""
+        return encoded_etag(self.etag, encoding)
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        """Bytes na codificação dada (None = sem compressão)"""
+        if encoding is None:
+            return self.raw
+        data = self._variants.get(encoding)
+        if data is None:
+            with self._lock:
+                data = self._variants.get(encoding)
+                if data is None:
+                    if encoding == "br":
+                        data = brotli.compress(self.raw, quality=BROTLI_QUALITY)
+                    else:
+                        data = gzip.compress(self.raw, GZIP_LEVEL, mtime=0)
+                    self._variants[encoding] = data
+        return data
+
+    def variant(self, accept_encoding: Optional[str],
+                min_size: int = COMPRESS_MIN_BYTES) -> Tuple[Optional[str], bytes]:
+        """(Content-Encoding ou None, bytes) para o Accept-Encoding do cliente"""
+        encoding = self.encoding_for(accept_encoding, min_size)
+        return encoding, self.encoded(encoding)
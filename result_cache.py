@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Cache em memória dos resultados de scraping com TTL por endpoint,
+despejo LRU e stale-while-revalidate
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+
+from response_encoding import EncodedBody
+
+HIT = "HIT"
+STALE = "STALE"
+MISS = "MISS"
+# Cópia vencida servida porque a origem está indisponível (circuito aberto)
+FALLBACK = "FALLBACK"
+
+
+class CacheResult(NamedTuple):
+    value: Any
+    status: str   # HIT, STALE, MISS ou FALLBACK
+    age: float    # idade dos dados em segundos
+    stored_at: float = 0.0  # time.time() do scraping que gerou o valor
+    etag: str = ""          # ETag do conteúdo, calculada uma vez no put
+    body: Optional[EncodedBody] = None  # JSON já codificado (e variantes comprimidas)
+
+
+class _Entry:
+    __slots__ = ("value", "stored", "stored_at", "etag", "body")
+
+    def __init__(self, value):
+        self.value = value
+        self.stored = time.monotonic()
+        self.stored_at = time.time()
+        # Codifica uma vez só; a ETag sai dos mesmos bytes servidos
+        self.body = EncodedBody.of(value)
+        self.etag = self.body.etag
+
+
+class ResultCache:
+    """
+    Guarda o último resultado de cada (endpoint, parâmetros).
+
+    - idade < TTL do endpoint: HIT
+    - TTL <= idade < TTL + stale_window: STALE, devolve a cópia e
+      atualiza em background
+    - além disso (ou ausente): MISS, faz o scraping na hora
+    """
+
+    def __init__(self, ttls: Dict[str, float], max_entries: int = 256,
+                 stale_window: float = 3600.0, default_ttl: float = 300.0):
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self.max_entries = max(1, max_entries)
+        self.stale_window = stale_window
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.counters = {HIT: 0, STALE: 0, MISS: 0, "evicted": 0,
+                         "refresh_errors": 0}
+
+    def ttl(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def lookup(self, endpoint: str, params: tuple,
+               fetch: Callable[[], Any]) -> Optional[CacheResult]:
+        """
+        HIT ou STALE (disparando a atualização em background) sem bloquear;
+        None quando é preciso raspar
+        """
+        key = (endpoint, params)
+        ttl = self.ttl(endpoint)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            age = now - entry.stored
+            if age < ttl:
+                self._entries.move_to_end(key)
+                self.counters[HIT] += 1
+                return CacheResult(entry.value, HIT, age, entry.stored_at, entry.etag, entry.body)
+            if age >= ttl + self.stale_window:
+                return None
+            self._entries.move_to_end(key)
+            self.counters[STALE] += 1
+            start_refresh = key not in self._refreshing
+            if start_refresh:
+                self._refreshing.add(key)
+
+        if start_refresh:
+            threading.Thread(target=self._refresh, args=(key, fetch),
+                             name="cache-refresh", daemon=True).start()
+        return CacheResult(entry.value, STALE, age, entry.stored_at, entry.etag, entry.body)
+
+    def get_or_fetch(self, endpoint: str, params: tuple,
+                     fetch: Callable[[], Any]) -> CacheResult:
+        result = self.lookup(endpoint, params, fetch)
+        if result is not None:
+            return result
+
+        with self._lock:
+            self.counters[MISS] += 1
+        value = fetch()
+        entry = self.put(endpoint, params, value)
+        return CacheResult(value, MISS, 0.0, entry.stored_at, entry.etag, entry.body)
+
+    def peek(self, endpoint: str, params: tuple) -> Optional[CacheResult]:
+        """Devolve o valor guardado, mesmo vencido, sem disparar scraping"""
+        with self._lock:
+            entry = self._entries.get((endpoint, params))
+            if entry is None:
+                return None
+            age = time.monotonic() - entry.stored
+            status = HIT if age < self.ttl(endpoint) else STALE
+            return CacheResult(entry.value, status, age, entry.stored_at, entry.etag, entry.body)
+
+    def put(self, endpoint: str, params: tuple, value: Any) -> _Entry:
+        key = (endpoint, params)
+        entry = _Entry(value)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters["evicted"] += 1
+        return entry
+
+    def _refresh(self, key, fetch):
+        endpoint, params = key
+        try:
+            self.put(endpoint, params, fetch())
+        except Exception as e:
+            with self._lock:
+                self.counters["refresh_errors"] += 1
+            logging.warning(f"Falha ao atualizar cache {endpoint} {params}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), **self.counters}
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Agendador de atualização em background: mantém as combinações mais
+pedidas já raspadas no cache, com intervalos que se adaptam à
+popularidade de cada chave e à frequência com que o conteúdo muda
+"""
+
+import json
+import math
+import time
+import random
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+def content_hash(value: Any) -> str:
+    return hashlib.sha1(
+        json.dumps(value, sort_keys=True, ensure_ascii=False).encode()
+    ).hexdigest()
+
+
+class _Key:
+    __slots__ = ("endpoint", "params", "fetch", "interval", "rate",
+                 "rate_updated", "last_request", "last_refresh", "next_refresh",
+                 "last_change", "refreshes", "changes", "failures",
+                 "consecutive_failures", "last_error", "hash", "running",
+                 "pinned")
+
+    def __init__(self, endpoint, params, fetch, interval):
+        now = time.time()
+        self.endpoint = endpoint
+        self.params = params
+        self.fetch = fetch
+        self.interval = interval
+        self.rate = 0.0            # contagem de requisições com decaimento exponencial
+        self.rate_updated = now
+        self.last_request = now
+        self.last_refresh = None
+        self.next_refresh = now
+        self.last_change = None
+        self.refreshes = 0
+        self.changes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.hash = None
+        self.running = False
+        self.pinned = False        # chaves semeadas nunca saem da agenda
+
+
+class RefreshScheduler:
+    """
+    Atualiza periodicamente as chaves (endpoint, parâmetros) pedidas pelos
+    clientes e grava o resultado via `store(endpoint, params, value)`.
+
+    - o intervalo de cada chave cresce quando o conteúdo não muda e cai
+      quando muda, dividido pela popularidade (req/min), entre
+      min_interval e max_interval
+    - chaves sem requisições há `idle_after` segundos saem da agenda
+    - no máximo `max_concurrent` sessões de navegador ao mesmo tempo
+    - jitter de ±`jitter` no próximo horário para não gerar rajadas
+    - falhas aplicam backoff exponencial
+    """
+
+    def __init__(self, store: Callable[[str, tuple, Any], None],
+                 base_interval: float = 300.0, min_interval: float = 60.0,
+                 max_interval: float = 3600.0, max_concurrent: int = 1,
+                 jitter: float = 0.1, idle_after: float = 3600.0,
+                 max_keys: int = 100):
+        self.store = store
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.idle_after = idle_after
+        self.max_keys = max_keys
+        self._sessions = threading.BoundedSemaphore(max(1, max_concurrent))
+        self._keys: Dict[Hashable, _Key] = {}
+        self._cond = threading.Condition()
+        self._stopped = True
+
+    # --- ciclo de vida ---
+
+    def start(self):
+        with self._cond:
+            if not self._stopped:
+                return
+            self._stopped = False
+        threading.Thread(target=self._run, name="refresh-scheduler",
+                         daemon=True).start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    # --- registro ---
+
+    def note_request(self, endpoint: str, params: tuple,
+                     fetch: Callable[[], Any]) -> None:
+        """
+        Registra uma requisição de cliente para a chave. Chamar uma vez por
+        requisição e só depois de um scraping bem-sucedido dela.
+        """
+        now = time.time()
+        key = (endpoint, params)
+        with self._cond:
+            entry = self._keys.get(key)
+            if entry is None:
+                if len(self._keys) >= self.max_keys and not self._evict_idle(now):
+                    return
+                # A requisição que registrou a chave acabou de raspar
+                entry = self._keys[key] = _Key(endpoint, params, fetch,
+                                               self.base_interval)
+                entry.next_refresh = now + self._jittered(entry.interval)
+                self._cond.notify()
+            self._decay(entry, now)
+            entry.rate += 1.0
+            entry.last_request = now
+
+    def seed(self, endpoint: str, params: tuple, fetch: Callable[[], Any]) -> None:
+        """Agenda uma chave para raspagem imediata, antes de qualquer cliente"""
+        with self._cond:
+            key = (endpoint, params)
+            if key not in self._keys and len(self._keys) < self.max_keys:
+                entry = self._keys[key] = _Key(endpoint, params, fetch,
+                                               self.base_interval)
+                entry.pinned = True
+                self._cond.notify()
+
+    # --- laço principal ---
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                now = time.time()
+                due = self._next_due(now)
+                if due is None or due.next_refresh > now:
+                    timeout = 30.0 if due is None else due.next_refresh - now
+                    self._cond.wait(min(timeout, 30.0))
+                    continue
+                if self._is_idle(due, now) and due.last_refresh:
+                    del self._keys[(due.endpoint, due.params)]
+                    continue
+                due.running = True
+            # Respeita o limite global de sessões fora do lock
+            self._sessions.acquire()
+            threading.Thread(target=self._refresh, args=(due,),
+                             name="refresh-worker", daemon=True).start()
+
+    def _refresh(self, entry: _Key):
+        try:
+            start = time.time()
+            try:
+                value = entry.fetch()
+            except Exception as e:
+                self._on_failure(entry, e)
+                return
+            self.store(entry.endpoint, entry.params, value)
+            self._on_success(entry, value, time.time() - start)
+        finally:
+            self._sessions.release()
+
+    def _on_success(self, entry: _Key, value: Any, elapsed: float):
+        digest = content_hash(value)
+        now = time.time()
+        with self._cond:
+            changed = entry.hash is not None and digest != entry.hash
+            if entry.hash is not None:
+                # Conteúdo mudou: atualiza mais cedo; não mudou: espaça
+                entry.interval *= 0.5 if changed else 1.5
+            if changed:
+                entry.changes += 1
+                entry.last_change = now
+            entry.hash = digest
+            entry.refreshes += 1
+            entry.consecutive_failures = 0
+            entry.last_refresh = now
+            entry.next_refresh = now + self._jittered(self._effective_interval(entry, now))
+            entry.running = False
+        logging.info(f"Agendador: {entry.endpoint} {entry.params} atualizado em "
+                     f"{elapsed:.1f}s ({'mudou' if changed else 'sem mudança'})")
+
+    def _on_failure(self, entry: _Key, error: Exception):
+        now = time.time()
+        with self._cond:
+            entry.failures += 1
+            entry.consecutive_failures += 1
+            entry.last_error = str(error)[:200]
+            backoff = self.min_interval * 2 ** min(entry.consecutive_failures, 10)
+            entry.next_refresh = now + self._jittered(min(backoff, self.max_interval))
+            entry.running = False
+        logging.warning(f"Agendador: falha ao atualizar {entry.endpoint} "
+                        f"{entry.params}: {error}")
+
+    # --- auxiliares (chamados com o lock) ---
+
+    def _next_due(self, now: float) -> Optional[_Key]:
+        candidates = [k for k in self._keys.values() if not k.running]
+        return min(candidates, key=lambda k: k.next_refresh, default=None)
+
+    def _is_idle(self, entry: _Key, now: float) -> bool:
+        return not entry.pinned and now - entry.last_request > self.idle_after
+
+    def _decay(self, entry: _Key, now: float):
+        # Meia-vida de 10 minutos para a taxa de requisições
+        elapsed = now - entry.rate_updated
+        entry.rate *= 0.5 ** (elapsed / 600.0)
+        entry.rate_updated = now
+
+    def _effective_interval(self, entry: _Key, now: float) -> float:
+        entry.interval = min(max(entry.interval, self.min_interval), self.max_interval)
+        self._decay(entry, now)
+        rate_per_min = entry.rate / 10.0  # contagem decaída ~ últimos 10 min
+        interval = entry.interval / max(1.0, math.log2(1.0 + rate_per_min))
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def _jittered(self, interval: float) -> float:
+        return interval * (1.0 + random.uniform(-self.jitter, self.jitter))
+
+    def _evict_idle(self, now: float) -> bool:
+        idle = [k for k in self._keys.values()
+                if not k.running and self._is_idle(k, now)]
+        if not idle:
+            return False
+        oldest = min(idle, key=lambda k: k.last_request)
+        del self._keys[(oldest.endpoint, oldest.params)]
+        return True
+
+    # --- status ---
+
+    def status(self) -> dict:
+        now = time.time()
+        with self._cond:
+            keys = []
+            for k in sorted(self._keys.values(), key=lambda k: k.next_refresh):
+                self._decay(k, now)
+                keys.append({
+                    "endpoint": k.endpoint,
+                    "params": list(k.params),
+                    "requests_per_min": round(k.rate / 10.0, 2),
+                    "interval": round(self._effective_interval(k, now)),
+                    "last_refresh": _iso(k.last_refresh),
+                    "next_refresh": _iso(k.next_refresh),
+                    "last_change": _iso(k.last_change),
+                    "refreshes": k.refreshes,
+                    "changes": k.changes,
+                    "failures": k.failures,
+                    "consecutive_failures": k.consecutive_failures,
+                    "last_error": k.last_error,
+                    "running": k.running,
+                    "pinned": k.pinned,
+                })
+            return {"running": not self._stopped, "keys": keys}
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    if ts is None:
+        return None
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts))
@@ -3,8 +3,14 @@
 Configurações de segurança para a API
 """
 
+import re
+import json
+import bisect
+import logging
 import ipaddress
-from typing import Set, List
+import threading
+from pathlib import Path
+from typing import Iterable, Optional, Set, List, Tuple
 
 # IPs conhecidos de scanners/atacantes (exemplos dos seus logs)
 KNOWN_MALICIOUS_IPS = {
@@ -55,40 +61,259 @@ BLOCKED_USER_AGENTS = {
     "nuclei", "httpx", "subfinder", "amass", "shodan"
 }
 
+class IPIndex:
+    """
+    Índice de redes IPv4/IPv6 compilado em intervalos inteiros ordenados e
+    mesclados: cada consulta é uma busca binária, O(log n) no número de CIDRs.
+    """
+
+    def __init__(self, networks: Iterable[str] = ()):
+        ranges = {4: [], 6: []}
+        for net in networks:
+            try:
+                n = ipaddress.ip_network(net.strip(), strict=False)
+            except ValueError:
+                logging.warning(f"CIDR inválido ignorado: {net!r}")
+                continue
+            ranges[n.version].append((int(n.network_address), int(n.broadcast_address)))
+        self._starts = {}
+        self._ends = {}
+        for version, items in ranges.items():
+            self._starts[version], self._ends[version] = self._merge(items)
+
+    @staticmethod
+    def _merge(items: List[Tuple[int, int]]) -> Tuple[List[int], List[int]]:
+        starts, ends = [], []
+        for start, end in sorted(items):
+            if ends and start <= ends[-1] + 1:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        return starts, ends
+
+    def contains(self, ip) -> bool:
+        """`ip` pode ser string ou objeto ipaddress; string inválida lança ValueError"""
+        if isinstance(ip, str):
+            ip = ipaddress.ip_address(ip)
+        if ip.version == 6 and ip.ipv4_mapped is not None:
+            ip = ip.ipv4_mapped
+        value = int(ip)
+        starts = self._starts[ip.version]
+        i = bisect.bisect_right(starts, value) - 1
+        return i >= 0 and value <= self._ends[ip.version][i]
+
+    __contains__ = contains
+
+    def __len__(self) -> int:
+        return len(self._starts[4]) + len(self._starts[6])
+
+
+class _FileWatcher:
+    """
+    Recarga em background: uma thread chama `reload()` a cada
+    `check_interval` segundos, fora do event loop. A recarga monta as
+    estruturas novas e só então troca a referência; as consultas só leem a
+    referência atual, sem stat() nem I/O no caminho da requisição.
+    """
+
+    check_interval: float
+    _thread: Optional[threading.Thread] = None
+
+    def watching(self) -> bool:
+        """Há arquivos a acompanhar"""
+        raise NotImplementedError
+
+    def reload(self, force: bool = False) -> bool:
+        raise NotImplementedError
+
+    def start(self):
+        """Inicia a verificação periódica, se houver arquivos configurados"""
+        if self._thread is not None or not self.watching() or self.check_interval <= 0:
+            return
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._watch_loop,
+                                        name=f"{type(self).__name__}-reload", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def _watch_loop(self):
+        while not self._stopped.wait(self.check_interval):
+            try:
+                self.reload()
+            except Exception:
+                logging.exception(f"Falha ao recarregar {type(self).__name__}")
+
+
+def read_blocklist(path: Path) -> List[str]:
+    """
+    Lê um arquivo de blocklist: um IP ou CIDR por linha, aceitando
+    comentários com '#' ou ';' (formato de listas como a Spamhaus DROP)
+    """
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            entry = line.split("#", 1)[0].split(";", 1)[0].strip()
+            if entry:
+                entries.append(entry.split()[0])
+    return entries
+
+
+class IPBlocklist(_FileWatcher):
+    """
+    Índice compilado das redes suspeitas, montado a partir de
+    SUSPICIOUS_IP_RANGES mais arquivos de blocklist. Depois de `start()`,
+    os arquivos são verificados a cada `check_interval` segundos em
+    background e recarregados quando o mtime muda; o índice novo substitui
+    o antigo de forma atômica.
+    """
+
+    def __init__(self, files: Iterable[str] = (), check_interval: float = 30.0):
+        self.files = [Path(f) for f in files]
+        self.check_interval = check_interval
+        self._mtimes = {}
+        self.index = IPIndex(SUSPICIOUS_IP_RANGES)
+        if self.files:
+            self.reload(force=True)
+
+    def set_files(self, files: Iterable[str]):
+        self.files = [Path(f) for f in files]
+        self.reload(force=True)
+
+    def watching(self) -> bool:
+        return bool(self.files)
+
+    def reload(self, force: bool = False) -> bool:
+        """Recompila o índice se algum arquivo mudou; True se recompilou"""
+        mtimes = {}
+        for path in self.files:
+            try:
+                mtimes[path] = path.stat().st_mtime
+            except OSError:
+                mtimes[path] = None
+        if not force and mtimes == self._mtimes:
+            return False
+        networks = list(SUSPICIOUS_IP_RANGES)
+        for path, mtime in mtimes.items():
+            if mtime is None:
+                logging.warning(f"Blocklist não encontrada: {path}")
+                continue
+            networks.extend(read_blocklist(path))
+        self.index = IPIndex(networks)
+        self._mtimes = mtimes
+        logging.info(f"Índice de IPs suspeitos: {len(networks)} entradas, "
+                     f"{len(self.index)} intervalos")
+        return True
+
+
+ip_blocklist = IPBlocklist()
+
 def is_ip_suspicious(ip: str) -> bool:
     """Verifica se um IP é suspeito"""
     if ip in KNOWN_MALICIOUS_IPS:
         return True
-    
+
     try:
-        ip_obj = ipaddress.ip_address(ip)
-        for range_str in SUSPICIOUS_IP_RANGES:
-            if ip_obj in ipaddress.ip_network(range_str):
-                return True
+        return ip_blocklist.index.contains(ip)
     except ValueError:
         return True  # IP inválido é suspeito
-    
-    return False
+
+class PatternMatcher:
+    """
+    Conjunto de assinaturas (substrings, sem diferenciar maiúsculas)
+    compilado em uma única regex: uma varredura por texto, em vez de um
+    teste `in` por assinatura. Informa qual assinatura casou.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = sorted({p.lower() for p in patterns if p}, key=len, reverse=True)
+        # Mais longas primeiro, para reportar a regra mais específica
+        self._regex = re.compile("|".join(map(re.escape, self.patterns))) if self.patterns else None
+
+    def match(self, text: str) -> Optional[str]:
+        if self._regex is None:
+            return None
+        m = self._regex.search(text.lower())
+        return m.group(0) if m else None
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+
+class SecurityRules(_FileWatcher):
+    """
+    Matchers de paths e user agents bloqueados: as listas deste módulo mais
+    as de um arquivo JSON opcional ({"blocked_paths": [...],
+    "blocked_user_agents": [...]}), recarregado em background (após
+    `start()`) quando o mtime muda.
+    """
+
+    def __init__(self, rules_file: Optional[str] = None, check_interval: float = 30.0):
+        self.rules_file = Path(rules_file) if rules_file else None
+        self.check_interval = check_interval
+        self._mtime = None
+        self.paths = PatternMatcher(BLOCKED_PATHS)
+        self.user_agents = PatternMatcher(BLOCKED_USER_AGENTS)
+        if self.rules_file:
+            self.reload(force=True)
+
+    def set_file(self, rules_file: Optional[str]):
+        self.rules_file = Path(rules_file) if rules_file else None
+        self.reload(force=True)
+
+    def watching(self) -> bool:
+        return self.rules_file is not None
+
+    def reload(self, force: bool = False) -> bool:
+        """Recompila os matchers se o arquivo mudou; True se recompilou"""
+        try:
+            mtime = self.rules_file.stat().st_mtime if self.rules_file else None
+        except OSError:
+            mtime = None
+        if not force and mtime == self._mtime:
+            return False
+        extra = {}
+        if mtime is not None:
+            try:
+                extra = json.loads(self.rules_file.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                # Mantém as regras atuais se o arquivo estiver inválido
+                logging.warning(f"Não foi possível ler {self.rules_file}: {e}")
+                return False
+        elif self.rules_file:
+            logging.warning(f"Arquivo de regras não encontrado: {self.rules_file}")
+        # Compila os dois antes de trocar: consultas veem o conjunto antigo ou o novo
+        paths = PatternMatcher(BLOCKED_PATHS | set(extra.get("blocked_paths", [])))
+        user_agents = PatternMatcher(BLOCKED_USER_AGENTS | set(extra.get("blocked_user_agents", [])))
+        self.paths, self.user_agents = paths, user_agents
+        self._mtime = mtime
+        logging.info(f"Regras de segurança: {len(self.paths)} paths, "
+                     f"{len(self.user_agents)} user agents")
+        return True
+
+
+security_rules = SecurityRules()
+
+def match_blocked_path(path: str) -> Optional[str]:
+    """Retorna a regra de path que casou, ou None"""
+    return security_rules.paths.match(path)
+
+def match_blocked_user_agent(user_agent: str) -> Optional[str]:
+    """Retorna a regra de user agent que casou, ou None"""
+    if not user_agent:
+        return "(vazio)"  # User agent vazio é suspeito
+    return security_rules.user_agents.match(user_agent)
 
 def is_path_blocked(path: str) -> bool:
     """Verifica se um path deve ser bloqueado"""
-    path_lower = path.lower()
-    
-    # Verifica paths exatos
-    if path_lower in BLOCKED_PATHS:
-        return True
-    
-    # Verifica se contém algum path suspeito
-    for blocked in BLOCKED_PATHS:
-        if blocked in path_lower:
-            return True
-    
-    return False
+    return match_blocked_path(path) is not None
 
 def is_user_agent_blocked(user_agent: str) -> bool:
     """Verifica se um user agent deve ser bloqueado"""
-    if not user_agent:
-        return True  # User agent vazio é suspeito
-    
-    ua_lower = user_agent.lower()
-    return any(blocked in ua_lower for blocked in BLOCKED_USER_AGENTS)
\ No newline at end of file
+    return match_blocked_user_agent(user_agent) is not None
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Middleware de segurança em ASGI puro: rejeita a partir do `scope`, sem
+montar um Request nem passar pelo BaseHTTPMiddleware, com as respostas de
+rejeição já serializadas
+"""
+
+import json
+import time
+import logging
+from typing import Callable, Iterable, Optional
+
+
+def _prebuilt(status_code: int, detail: str) -> tuple:
+    body = json.dumps({"detail": detail}, separators=(",", ":")).encode()
+    start = {
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    }
+    return start, {"type": "http.response.body", "body": body}
+
+
+NOT_FOUND = _prebuilt(404, "Not found")
+TOO_MANY_REQUESTS = _prebuilt(429, "Too many requests")
+METHOD_NOT_ALLOWED = _prebuilt(405, "Method not allowed")
+
+
+def _with_retry_after(response: tuple, seconds: float) -> tuple:
+    """Cópia da resposta pronta com Retry-After (segundos inteiros, mínimo 1)"""
+    start, body = response
+    value = str(max(1, int(seconds + 0.999))).encode()
+    return {**start, "headers": start["headers"] + [(b"retry-after", value)]}, body
+
+# Métodos fora desta lista viram "other" no label, limitando a cardinalidade
+KNOWN_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE",
+                           "OPTIONS", "TRACE", "CONNECT"))
+
+
+class SecurityMiddleware:
+    """
+    Mesmas verificações do middleware HTTP anterior, na mesma ordem:
+    requisição suspeita (404), rate limit (429) e método não permitido (405).
+    """
+
+    def __init__(self, app, suspicious_reason: Callable[[str, str, str], Optional[str]],
+                 check_rate_limit: Callable[[str, str], bool],
+                 allowed_methods: Iterable[str] = ("GET", "OPTIONS"),
+                 log_paths: Iterable[str] = (), sampler=None, rejections=None,
+                 rate_limit_rule: Optional[Callable[[str], str]] = None,
+                 retry_after: Optional[Callable[[str, str], float]] = None,
+                 exempt_paths: Iterable[str] = ()):
+        self.app = app
+        # EventSampler que agrega bloqueios/rate limit; sem ele, log direto
+        self.sampler = sampler
+        # Counter (verdict, rule) das rejeições e a regra de rate limit da rota
+        self.rejections = rejections
+        self.rate_limit_rule = rate_limit_rule
+        # Segundos até o IP poder voltar à rota, enviados no Retry-After do 429
+        self.retry_after = retry_after
+        # Paths que não passam pelas verificações (ex.: /metrics)
+        self.exempt_paths = frozenset(exempt_paths)
+        self.suspicious_reason = suspicious_reason
+        self.check_rate_limit = check_rate_limit
+        self.allowed_methods = frozenset(allowed_methods)
+        self.log_paths = frozenset(log_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        client_ip = client[0] if client else ""
+        path = scope["path"]
+        if path in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        user_agent = ""
+        for name, value in scope["headers"]:
+            if name == b"user-agent":
+                user_agent = value.decode("latin-1")
+                break
+
+        # Log de tentativas suspeitas
+        reason = self.suspicious_reason(path, user_agent, client_ip)
+        if reason:
+            self._event("blocked", "🚨 BLOCKED: %s - %s %s - UA: %s - regra: %s",
+                        client_ip, method, path, user_agent[:100], reason,
+                        ip=client_ip, method=method, path=path, rule=reason,
+                        user_agent=user_agent[:100], status=404)
+            self._count("blocked", reason)
+            await self._reject(send, NOT_FOUND)
+            return
+
+        # Rate limiting
+        if not self.check_rate_limit(client_ip, path):
+            self._event("rate_limited", "🚫 RATE LIMITED: %s", client_ip,
+                        ip=client_ip, method=method, path=path, status=429)
+            self._count("rate_limited",
+                        self.rate_limit_rule(path) if self.rate_limit_rule else "")
+            response = TOO_MANY_REQUESTS
+            if self.retry_after is not None:
+                response = _with_retry_after(response, self.retry_after(client_ip, path))
+            await self._reject(send, response)
+            return
+
+        # Bloqueia métodos não permitidos
+        if method not in self.allowed_methods:
+            self._event("method_not_allowed", "🚫 METHOD NOT ALLOWED: %s - %s %s",
+                        client_ip, method, path,
+                        ip=client_ip, method=method, path=path, status=405)
+            self._count("method_not_allowed",
+                        method if method in KNOWN_METHODS else "other")
+            await self._reject(send, METHOD_NOT_ALLOWED)
+            return
+
+        if path not in self.log_paths:
+            await self.app(scope, receive, send)
+            return
+
+        # Log de requests legítimos, com status e latência ao fim da resposta
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            latency_ms = round((time.perf_counter() - start) * 1000, 1)
+            logging.info("✅ ALLOWED: %s - %s %s - %s em %sms",
+                         client_ip, method, path, status_code, latency_ms,
+                         extra={"verdict": "allowed", "ip": client_ip, "method": method,
+                                "path": path, "status": status_code,
+                                "latency_ms": latency_ms})
+
+    def _count(self, verdict: str, rule: str):
+        if self.rejections is not None:
+            self.rejections.inc(verdict, rule)
+
+    def _event(self, verdict: str, message: str, *args, **fields):
+        if self.sampler is not None:
+            self.sampler.event(verdict, message, *args, **fields)
+        else:
+            logging.warning(message, *args, extra={"verdict": verdict, **fields})
+
+    @staticmethod
+    async def _reject(send, response: tuple):
+        start, body = response
+        await send(start)
+        await send(body)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Teste do circuit breaker (fechado, aberto, meio aberto) e das retentativas
+com orçamento global
+"""
+
+import time
+import pytest
+from circuit_breaker import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen, RetryBudget, guarded_call
+)
+
+def test_circuit_breaker():
+    """Falhas abrem o circuito, que rejeita na hora e se recupera após o teste"""
+    print("🧪 Testando circuit breaker...\n")
+
+    def falha():
+        raise TimeoutError("página não carregou")
+
+    breaker = CircuitBreaker("trends.google.com", window=10, min_calls=4,
+                             failure_rate=0.5, open_seconds=0.1)
+    for _ in range(2):
+        guarded_call(breaker, lambda: "ok", retries=0)
+    for _ in range(2):
+        try:
+            guarded_call(breaker, falha, retries=0)
+        except TimeoutError:
+            pass
+    # 50% de falhas abre o circuito
+    assert breaker.state == OPEN
+
+    chamadas = []
+    # circuito aberto rejeita sem chamar a origem
+    with pytest.raises(CircuitOpen) as e:
+        guarded_call(breaker, lambda: chamadas.append(1), retries=0)
+    assert not chamadas and 0 < e.value.retry_after <= 0.1
+
+    time.sleep(0.12)
+    try:
+        guarded_call(breaker, falha, retries=0)
+    except TimeoutError:
+        pass
+    # falha no teste meio aberto reabre
+    assert breaker.state == OPEN
+
+    time.sleep(0.12)
+    # sucesso no teste fecha
+    assert (guarded_call(breaker, lambda: "ok") == "ok"
+            and breaker.state == CLOSED)
+
+    lento = CircuitBreaker("manus.space", min_calls=2, slow_call=0.02, slow_rate=1.0)
+    for _ in range(2):
+        guarded_call(lento, lambda: time.sleep(0.03), retries=0)
+    # chamadas lentas abrem o circuito
+    assert lento.state == OPEN
+
+    meio = CircuitBreaker("infogram.com", min_calls=1, open_seconds=0.01)
+    meio.record(True)
+    time.sleep(0.02)
+    try:
+        guarded_call(meio, lambda: 1 / 0, is_failure=lambda e: False)
+    except ZeroDivisionError:
+        pass
+    # erro local não conta e libera a vaga de teste
+    assert meio.state == HALF_OPEN and guarded_call(meio, lambda: "ok") == "ok"
+
+    tentativas = []
+
+    def instavel():
+        tentativas.append(1)
+        if len(tentativas) < 3:
+            raise ConnectionError("reset")
+        return "ok"
+
+    breaker = CircuitBreaker("trends.google.com", min_calls=100)
+    resultado = guarded_call(breaker, instavel, RetryBudget(), retries=3,
+                             base_delay=0.01, max_delay=0.02)
+    # retentativas com backoff até o sucesso
+    assert resultado == "ok" and len(tentativas) == 3
+
+    orcamento = RetryBudget(ratio=0.0, min_per_second=0.0, max_tokens=1)
+    tentativas.clear()
+    try:
+        guarded_call(breaker, falha, orcamento, retries=5, base_delay=0.001)
+    except TimeoutError:
+        pass
+    # orçamento esgotado interrompe as retentativas
+    assert orcamento.stats()["retries"] == 1 and orcamento.stats()["exhausted"] == 1
+
+    print("\n🎉 Testes do circuit breaker concluídos!")
+
+def test_half_open_trial():
+    """No meio aberto, só a chamada que recebeu a vaga de teste fecha ou reabre"""
+    print("🧪 Testando vaga de teste do meio aberto...\n")
+    breaker = CircuitBreaker("trends.google.com", min_calls=1, open_seconds=0.01)
+    # chamadas liberadas com o circuito fechado, ainda em andamento
+    antiga_ok = breaker.before_call()
+    antiga_falha = breaker.before_call()
+    antiga_local = breaker.before_call()
+    assert not antiga_ok.trial
+    breaker.record(True, token=breaker.before_call())
+    assert breaker.state == OPEN
+
+    time.sleep(0.02)
+    teste = breaker.before_call()
+    assert teste.trial and breaker.state == HALF_OPEN
+    # resposta atrasada de antes da abertura não fecha
+    breaker.record(False, token=antiga_ok)
+    assert breaker.state == HALF_OPEN
+    # nem reabre
+    breaker.record(True, token=antiga_falha)
+    assert breaker.state == HALF_OPEN
+    # nem devolve a vaga de teste, que continua ocupada
+    breaker.release(antiga_local)
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+    # contadores seguem contando as atrasadas
+    assert breaker.counters["successes"] == 1 and breaker.counters["failures"] == 2
+
+    breaker.record(False, token=teste)
+    # a chamada de teste fecha
+    assert breaker.state == CLOSED
+    # o teste que já decidiu não volta a contar
+    breaker.record(True, token=teste)
+    assert breaker.state == CLOSED and list(breaker._calls) == []
+
+    # Falha da vaga de teste reabre; a vaga de uma geração anterior não decide mais
+    breaker.record(True, token=breaker.before_call())
+    time.sleep(0.02)
+    teste = breaker.before_call()
+    breaker.record(True, token=teste)
+    assert breaker.state == OPEN
+    time.sleep(0.02)
+    novo = breaker.before_call()
+    breaker.record(False, token=teste)
+    breaker.release(teste)
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+    breaker.release(novo)
+    # vaga devolvida pelo próprio teste
+    assert breaker.before_call().trial
+
+if __name__ == "__main__":
+    test_circuit_breaker()
+    test_half_open_trial()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Teste da conversão de cookies para o CDP e da recarga do arquivo de cookies
+"""
+
+import os
+import json
+import tempfile
+from pathlib import Path
+from cookie_jar import CookieJar, to_cdp_cookie
+
+URL = "https://trends.google.com/trending"
+
+class FakeDriver:
+    def __init__(self):
+        self.comandos = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.comandos.append((cmd, params))
+
+def test_to_cdp_cookie():
+    """Domínio ou url, sameSite, expiração e cookies descartados"""
+    print("🧪 Testando conversão de cookies...\n")
+
+    # Formato do Selenium, com domínio: vale para o domínio, não para a url padrão
+    cookie = to_cdp_cookie({"name": "NID", "value": "abc", "domain": ".google.com",
+                            "path": "/trends", "secure": True, "httpOnly": 1,
+                            "expiry": 1893456000, "sameSite": "Lax"}, URL)
+    print(f"  {cookie}")
+    assert cookie == {"name": "NID", "value": "abc", "domain": ".google.com",
+                      "path": "/trends", "secure": True, "httpOnly": True,
+                      "expires": 1893456000.0, "sameSite": "Lax"}
+
+    # Sem domínio: associado à url padrão, como o add_cookie na página aberta
+    cookie = to_cdp_cookie({"name": "a", "value": "1"}, URL)
+    assert cookie == {"name": "a", "value": "1", "url": URL, "path": "/",
+                      "secure": False, "httpOnly": False}
+    # domínio vazio também cai na url padrão
+    assert to_cdp_cookie({"name": "a", "value": "1", "domain": ""}, URL)["url"] == URL
+    # sem domínio nem url padrão, descartado
+    assert to_cdp_cookie({"name": "a", "value": "1"}) is None
+    # sem name ou value, descartado
+    assert to_cdp_cookie({"value": "1", "domain": ".google.com"}, URL) is None
+    assert to_cdp_cookie({"name": "a", "domain": ".google.com"}, URL) is None
+
+    # sameSite nos formatos do Selenium e do EditThisCookie
+    for valor, esperado in (("Strict", "Strict"), ("lax", "Lax"), ("None", "None"),
+                            ("no_restriction", "None"), ("unspecified", None), (None, None)):
+        cookie = to_cdp_cookie({"name": "a", "value": "1", "sameSite": valor}, URL)
+        assert cookie.get("sameSite") == esperado, valor
+
+    # Expiração: expiry (Selenium) ou expirationDate (extensões), em segundos
+    cookie = to_cdp_cookie({"name": "a", "value": "1", "expirationDate": 1893456000.75}, URL)
+    assert cookie["expires"] == 1893456000.75
+    cookie = to_cdp_cookie({"name": "a", "value": "1", "expiry": "1893456000"}, URL)
+    assert cookie["expires"] == 1893456000.0
+    # cookie de sessão não leva expires, mesmo com data
+    cookie = to_cdp_cookie({"name": "a", "value": "1", "session": True,
+                            "expirationDate": 1893456000}, URL)
+    assert "expires" not in cookie
+    # expiry tem precedência sobre expirationDate
+    cookie = to_cdp_cookie({"name": "a", "value": "1", "expiry": 1,
+                            "expirationDate": 2}, URL)
+    assert cookie["expires"] == 1.0
+
+def test_cookie_jar_reload():
+    """Arquivo lido uma vez e relido só quando o mtime muda"""
+    print("🧪 Testando recarga do arquivo de cookies...\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cookies.json"
+        jar = CookieJar(path, default_url=URL)
+        # arquivo ausente: nenhum cookie
+        assert jar.cookies() == []
+
+        path.write_text(json.dumps([{"name": "a", "value": "1"},
+                                    {"name": "b", "value": "2", "domain": ".google.com"},
+                                    {"value": "sem nome"}]))
+        os.utime(path, (1_000, 1_000))
+        primeira = jar.cookies()
+        assert [c["name"] for c in primeira] == ["a", "b"]
+        # mesmo mtime: mesma lista, sem reler
+        assert jar.cookies() is primeira
+
+        # conteúdo novo com o mesmo mtime não é relido
+        path.write_text(json.dumps([{"name": "c", "value": "3"}]))
+        os.utime(path, (1_000, 1_000))
+        assert jar.cookies() is primeira
+        # mtime mudou: relê
+        os.utime(path, (2_000, 2_000))
+        assert [c["name"] for c in jar.cookies()] == ["c"]
+
+        driver = FakeDriver()
+        # instalação em uma chamada CDP
+        assert jar.install(driver) == 1
+        assert driver.comandos == [("Network.setCookies", {"cookies": jar.cookies()})]
+
+        # JSON inválido: nenhum cookie, sem exceção
+        path.write_text("{quebrado")
+        os.utime(path, (3_000, 3_000))
+        assert jar.cookies() == []
+        # arquivo removido: lista vazia e nada instalado
+        path.unlink()
+        driver = FakeDriver()
+        assert jar.cookies() == [] and jar.install(driver) == 0 and driver.comandos == []
+
+if __name__ == "__main__":
+    test_to_cdp_cookie()
+    test_cookie_jar_reload()
+    print("\n🎉 Testes dos cookies concluídos!")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Teste do pool de drivers usando um driver falso (sem abrir o Chrome)
+"""
+
+import time
+import threading
+import pytest
+from driver_pool import DriverPool, PoolExhausted
+
+class SlowDriver:
+    """Driver falso com health check e reset lentos, contando os vivos"""
+
+    lock = threading.Lock()
+    live = 0
+    peak = 0
+
+    def __init__(self):
+        self.window_handles = ["main"]
+        self.switch_to = self
+        with SlowDriver.lock:
+            SlowDriver.live += 1
+            SlowDriver.peak = max(SlowDriver.peak, SlowDriver.live)
+
+    def window(self, handle):
+        pass
+
+    def execute_script(self, script):
+        time.sleep(0.002)
+        return "null" if "origin" in script else 1
+
+    def execute_cdp_cmd(self, cmd, params):
+        return {}
+
+    def get(self, url):
+        time.sleep(0.002)
+
+    def quit(self):
+        with SlowDriver.lock:
+            SlowDriver.live -= 1
+
+class FakeDriver:
+    """Imita a parte da API do WebDriver usada pelo pool"""
+
+    def __init__(self):
+        self.window_handles = ["main"]
+        self.alive = True
+        self.quit_called = False
+        self.switch_to = self
+
+    def window(self, handle):
+        pass
+
+    def close(self):
+        self.window_handles.pop()
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError("sessão encerrada")
+        return "null" if "origin" in script else 1
+
+    def execute_cdp_cmd(self, cmd, params):
+        return {}
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+def test_driver_pool():
+    """Testa checkout/checkin, reciclagem e limite do pool"""
+    print("🧪 Testando pool de drivers...\n")
+
+    pool = DriverPool(FakeDriver, size=1, warmup=0, max_navigations=2,
+                      acquire_timeout=0.1)
+
+    with pool.driver() as d1:
+        d1.window_handles.append("aba-extra")
+    with pool.driver() as d2:
+        pass
+    # driver reaproveitado entre usos
+    assert d1 is d2
+    # abas extras fechadas no reset
+    assert d1.window_handles == ["main"]
+
+    with pool.driver() as d3:
+        pass
+    # driver reciclado após max_navigations
+    assert d3 is not d1 and d1.quit_called
+
+    slot = pool.acquire()
+    # pool cheio lança PoolExhausted
+    with pytest.raises(PoolExhausted):
+        pool.acquire(timeout=0.05)
+    slot.driver.alive = False
+    pool.release(slot)
+    # driver morto descartado no checkin
+    assert pool.stats()["idle"] == 0
+
+    pool.close()
+    print("\n🎉 Testes do pool concluídos!")
+
+def test_driver_pool_limit():
+    """Com checkouts e checkins simultâneos, nunca há mais drivers vivos que `size`"""
+    print("🧪 Testando limite do pool sob concorrência...\n")
+    pool = DriverPool(SlowDriver, size=2, warmup=0, max_navigations=5,
+                      acquire_timeout=5)
+
+    def worker():
+        for _ in range(20):
+            with pool.driver():
+                time.sleep(0.001)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    pool.close()
+    print(f"  pico de drivers vivos: {SlowDriver.peak} | criados: {pool.created}")
+    assert SlowDriver.peak <= 2
+    assert pool.created > 2, "reciclagem deveria ter criado drivers novos"
+    assert SlowDriver.live == 0
+
+if __name__ == "__main__":
+    test_driver_pool()
+    test_driver_pool_limit()
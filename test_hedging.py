@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Teste do hedging: segunda tentativa após o percentil recente, cancelamento
+da perdedora e orçamento de tentativas extras
+"""
+
+import time
+import threading
+import pytest
+from hedging import Hedger, HedgeCancelled, check_cancelled
+
+def test_hedging():
+    """A tentativa presa perde para a segunda, que é disparada dentro do orçamento"""
+    print("🧪 Testando hedging...\n")
+
+    hedger = Hedger(percentile=95, window=20, min_samples=10, budget=0.1, min_delay=0.05)
+    for _ in range(10):
+        hedger.run("trends", lambda: time.sleep(0.01) or "ok")
+    # sem hedge antes de ter amostras
+    assert hedger.stats()["trends"]["fired"] == 0
+    # atraso respeita o mínimo
+    assert hedger.delay("trends") == 0.05
+
+    chamadas = []
+    canceladas = []
+    lock = threading.Lock()
+
+    def scrape():
+        with lock:
+            chamadas.append(1)
+            primeira = len(chamadas) == 1
+        if not primeira:
+            time.sleep(0.02)
+            return "segunda"
+        # Página "presa": só termina se for cancelada
+        try:
+            for _ in range(200):
+                check_cancelled()
+                time.sleep(0.01)
+        except HedgeCancelled:
+            canceladas.append(1)
+            raise
+        return "primeira"
+
+    inicio = time.monotonic()
+    resultado = hedger.run("trends", scrape)
+    duracao = time.monotonic() - inicio
+    stats = hedger.stats()["trends"]
+    # segunda tentativa vence
+    assert resultado == "segunda" and stats["won"] == 1
+    # latência bem abaixo da tentativa presa
+    assert duracao < 0.5
+    time.sleep(0.05)
+    # tentativa perdedora é cancelada
+    assert canceladas == [1]
+
+    lenta = lambda: time.sleep(0.1) or "lenta"
+    hedger.run("trends", lenta)
+    stats = hedger.stats()["trends"]
+    # orçamento de 10% limita hedges
+    assert stats["fired"] == 1 and stats["budget_exhausted"] == 1
+
+    sem_capacidade = Hedger(min_samples=1, min_delay=0.01, budget=1.0, can_hedge=lambda: False)
+    sem_capacidade.run("infogram", lambda: "ok")
+    sem_capacidade.run("infogram", lambda: time.sleep(0.05) or "ok")
+    # sem navegador livre não dispara
+    assert sem_capacidade.stats()["infogram"]["no_capacity"] == 1
+
+    erro = Hedger(min_samples=1, min_delay=0.01)
+    erro.run("topo", lambda: "ok")
+    # erro da tentativa é propagado
+    with pytest.raises(ZeroDivisionError):
+        erro.run("topo", lambda: 1 / 0)
+
+    print("\n🎉 Testes de hedging concluídos!")
+
+if __name__ == "__main__":
+    test_hedging()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Teste da validação condicional (ETag, Last-Modified e 304)
+"""
+
+import os
+import time
+
+os.environ.setdefault("DRIVER_POOL_WARMUP", "0")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+os.environ.setdefault("HISTORY_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from fastapi.testclient import TestClient
+from http_cache import encoded_etag, http_date, is_not_modified, make_etag
+from result_cache import ResultCache
+import trends_api
+
+def test_http_cache():
+    """ETag estável pelo conteúdo; If-None-Match tem precedência sobre If-Modified-Since"""
+    print("🧪 Testando validação condicional...\n")
+
+    etag = make_etag({"valor": "76", "data": "hoje"})
+    # ETag forte entre aspas
+    assert etag.startswith('"') and etag.endswith('"') and not etag.startswith("W/")
+    # mesmo conteúdo, mesma ETag (ordem das chaves não importa)
+    assert make_etag({"data": "hoje", "valor": "76"}) == etag
+    # conteúdo diferente, ETag diferente
+    assert make_etag({"valor": "77", "data": "hoje"}) != etag
+
+    # If-None-Match igual
+    assert is_not_modified({"if-none-match": etag}, etag)
+    # If-None-Match em lista e fraco
+    assert is_not_modified({"if-none-match": f'"x", W/{etag}'}, etag)
+    # If-None-Match: *
+    assert is_not_modified({"if-none-match": "*"}, etag)
+    # If-None-Match diferente
+    assert not is_not_modified({"if-none-match": '"x"'}, etag)
+
+    gzip_etag = encoded_etag(etag, "gzip")
+    # variante comprimida tem ETag própria
+    assert (gzip_etag == etag[:-1] + '-gzip"'
+            and encoded_etag(etag, None) == etag)
+    # ETag da variante gzip só casa com a própria variante
+    assert is_not_modified({"if-none-match": f"W/{gzip_etag}"}, gzip_etag)
+    assert not is_not_modified({"if-none-match": gzip_etag}, etag)
+    assert not is_not_modified({"if-none-match": etag}, encoded_etag(etag, "br"))
+    assert not is_not_modified({"if-none-match": gzip_etag}, encoded_etag(etag, "br"))
+    # sufixo não torna outra ETag igual
+    assert not is_not_modified({"if-none-match": '"x-gzip"'}, etag)
+
+    agora = time.time()
+    # If-Modified-Since igual à hora do scraping
+    assert is_not_modified({"if-modified-since": http_date(agora)}, etag, agora)
+    # If-Modified-Since anterior
+    assert not is_not_modified({"if-modified-since": http_date(agora - 60)}, etag, agora)
+    # If-None-Match tem precedência
+    assert not is_not_modified({"if-none-match": '"x"', "if-modified-since": http_date(agora)}, etag, agora)
+    # data inválida é ignorada
+    assert not is_not_modified({"if-modified-since": "ontem"}, etag, agora)
+    # sem cabeçalhos condicionais
+    assert not is_not_modified({}, etag, agora)
+
+    cache = ResultCache({"trends": 10})
+    r = cache.get_or_fetch("trends", ("BR", None), lambda: ["a", "b"])
+    # cache calcula a ETag uma vez no put
+    assert r.etag == make_etag(r.body.raw) and cache.peek("trends", ("BR", None)).etag == r.etag
+
+    print("\n🎉 Testes de validação condicional concluídos!")
+
+def test_api_variant_etag():
+    """304 só quando a ETag enviada é a da variante negociada nesta requisição"""
+    print("🧪 Testando ETag por codificação na API...\n")
+    minimo, trends_api.COMPRESS_MIN_BYTES = trends_api.COMPRESS_MIN_BYTES, 100
+    try:
+        with TestClient(trends_api.app, client=("127.0.2.1", 5000)) as client:
+            gzip = client.get("/categories", headers={"User-Agent": "Mozilla",
+                                                      "Accept-Encoding": "gzip"})
+            etag = gzip.headers["etag"]
+            assert gzip.headers["content-encoding"] == "gzip" and etag.endswith('-gzip"')
+
+            r = client.get("/categories", headers={"User-Agent": "Mozilla",
+                                                   "Accept-Encoding": "gzip",
+                                                   "If-None-Match": etag})
+            # mesma variante: 304
+            assert r.status_code == 304 and r.headers["etag"] == etag
+
+            r = client.get("/categories", headers={"User-Agent": "Mozilla",
+                                                   "Accept-Encoding": "identity",
+                                                   "If-None-Match": etag})
+            print(f"  gzip → identity: {r.status_code} {r.headers['etag']}")
+            # ETag gzip com identity: corpo completo, sem compressão
+            assert r.status_code == 200 and "content-encoding" not in r.headers
+            assert r.headers["etag"] == trends_api.CATEGORIES_ETAG
+            assert r.json() == trends_api.CATEGORIES
+    finally:
+        trends_api.COMPRESS_MIN_BYTES = minimo
+
+if __name__ == "__main__":
+    test_http_cache()
+    test_api_variant_etag()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Teste da fila de jobs de scraping: prioridade, prazo, backpressure e
+consulta de jobs assíncronos
+"""
+
+import os
+import time
+import asyncio
+import threading
+
+os.environ.setdefault("DRIVER_POOL_WARMUP", "0")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+os.environ.setdefault("HISTORY_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from fastapi.testclient import TestClient
+from jobs import DONE, EXPIRED, JobQueue, QueueFull
+import trends_api
+
+async def ocupar(queue):
+    """Prende o único worker até o evento devolvido ser liberado"""
+    liberar = threading.Event()
+    queue.submit("bloqueio", lambda: liberar.wait(5))
+    await asyncio.sleep(0.05)
+    return liberar
+
+def test_priority_order():
+    """Com o worker ocupado, high sai antes de normal, que sai antes de low (FIFO no empate)"""
+    print("🧪 Testando ordem de prioridade...\n")
+
+    async def cenario():
+        queue = JobQueue(workers=1)
+        await queue.start()
+        liberar = await ocupar(queue)
+        ordem = []
+        jobs = [queue.submit(nome, lambda nome=nome: ordem.append(nome), prioridade)
+                for nome, prioridade in (("low1", "low"), ("normal", "normal"),
+                                         ("high", "high"), ("low2", "low"))]
+        liberar.set()
+        await asyncio.gather(*(job.future for job in jobs))
+        await queue.stop()
+        return ordem
+
+    ordem = asyncio.run(cenario())
+    print(f"  ordem: {ordem}")
+    assert ordem == ["high", "normal", "low1", "low2"]
+
+def test_expired_deadline():
+    """Job cujo prazo vence na fila é descartado sem rodar"""
+    print("🧪 Testando descarte por prazo...\n")
+
+    async def cenario():
+        queue = JobQueue(workers=1)
+        await queue.start()
+        liberar = await ocupar(queue)
+        executou = []
+        job = queue.submit("atrasado", lambda: executou.append(1), timeout=0.05)
+        await asyncio.sleep(0.1)
+        liberar.set()
+        try:
+            await job.future
+            erro = None
+        except TimeoutError as e:
+            erro = e
+        await queue.stop()
+        return job, executou, erro, queue.stats()
+
+    job, executou, erro, stats = asyncio.run(cenario())
+    print(f"  status: {job.status} | erro: {erro}")
+    assert job.status == EXPIRED and erro is not None
+    assert executou == []
+    assert stats["expired"] == 1
+
+def test_queue_full():
+    """Fila cheia rejeita com QueueFull e uma estimativa de Retry-After"""
+    print("🧪 Testando backpressure...\n")
+
+    async def cenario():
+        queue = JobQueue(workers=1, max_size=1)
+        await queue.start()
+        liberar = await ocupar(queue)
+        queue.submit("na fila", lambda: None)
+        try:
+            queue.submit("excedente", lambda: None)
+            rejeicao = None
+        except QueueFull as e:
+            rejeicao = e
+        liberar.set()
+        await queue.stop()
+        return rejeicao, queue.stats()
+
+    rejeicao, stats = asyncio.run(cenario())
+    print(f"  retry_after: {rejeicao and rejeicao.retry_after}s")
+    assert rejeicao is not None and rejeicao.retry_after >= 1
+    assert stats["rejected"] == 1 and stats["submitted"] == 2
+
+def test_result_ttl():
+    """Resultado fica consultável até result_ttl depois de concluído"""
+    print("🧪 Testando validade dos resultados...\n")
+
+    async def cenario():
+        queue = JobQueue(workers=1, result_ttl=0.05)
+        await queue.start()
+        job = queue.submit("rapido", lambda: ["tendência"])
+        await job.future
+        antes = queue.get(job.id)
+        await asyncio.sleep(0.1)
+        depois = queue.get(job.id)
+        await queue.stop()
+        return job, antes, depois
+
+    job, antes, depois = asyncio.run(cenario())
+    assert antes is job and job.status == DONE and job.result == ["tendência"]
+    assert depois is None
+
+def test_api_jobs():
+    """503 com Retry-After, 504 no prazo e /jobs/{id} até result_ttl, pela API"""
+    print("🧪 Testando jobs pela API...\n")
+    assert asyncio.iscoroutinefunction(trends_api.job_options)
+    headers = {"User-Agent": "Mozilla"}
+    liberar = threading.Event()
+    original = trends_api.scrape_trends
+
+    def scrape(geo, category):
+        if geo == "US":
+            liberar.wait(5)
+        return [f"tendência {geo}"]
+
+    trends_api.scrape_trends = scrape
+    try:
+        with TestClient(trends_api.app, client=("127.0.0.1", 5000)) as client:
+            queue = trends_api.job_queue
+            max_size, queue.max_size = queue.max_size, 0
+            r = client.get("/trends?geo=UK", headers=headers)
+            queue.max_size = max_size
+            print(f"  fila cheia: {r.status_code} Retry-After={r.headers.get('retry-after')}")
+            assert r.status_code == 503 and int(r.headers["retry-after"]) >= 1
+
+            inicio = time.monotonic()
+            r = client.get("/trends?geo=US&deadline=1", headers=headers)
+            print(f"  prazo: {r.status_code} em {time.monotonic() - inicio:.1f}s")
+            assert r.status_code == 504
+            liberar.set()
+
+            ttl, queue.result_ttl = queue.result_ttl, 0.2
+            r = client.get("/trends?geo=BR&mode=async", headers=headers)
+            assert r.status_code == 202
+            poll = r.json()["poll"]
+            for _ in range(50):
+                body = client.get(poll, headers=headers).json()
+                if body["status"] == DONE:
+                    break
+                time.sleep(0.02)
+            print(f"  job: {body['status']} {body.get('result')}")
+            assert body["result"] == {"trends": ["tendência BR"]}
+            time.sleep(0.3)
+            r = client.get(poll, headers=headers)
+            queue.result_ttl = ttl
+            print(f"  após result_ttl: {r.status_code}")
+            assert r.status_code == 404
+    finally:
+        liberar.set()
+        trends_api.scrape_trends = original
+
+if __name__ == "__main__":
+    test_priority_order()
+    test_expired_deadline()
+    test_queue_full()
+    test_result_ttl()
+    test_api_jobs()
+    print("\n🎉 Testes da fila de jobs concluídos!")
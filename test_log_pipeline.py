@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Teste do pipeline de logs: JSON com exc_info formatado na thread de escrita,
+amostragem/resumo do EventSampler e encerramento do QueueListener
+"""
+
+import io
+import sys
+import json
+import time
+import logging
+import threading
+import log_pipeline
+from log_pipeline import EventSampler, setup_logging, stop_logging
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+def sampler_logger(nome):
+    logger = logging.getLogger(f"teste.{nome}")
+    logger.propagate = False
+    handler = ListHandler()
+    logger.handlers[:] = [handler]
+    return logger, handler
+
+def test_json_pipeline():
+    """Registros saem em JSON pela thread do listener, com traceback e campos extras"""
+    print("🧪 Testando pipeline JSON...\n")
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    ativo = log_pipeline._listener is not None
+    stop_logging()
+    stderr, sys.stderr = sys.stderr, io.StringIO()
+    try:
+        setup_logging("INFO", "json")
+        # O logger raiz só enfileira; a escrita é na thread do listener
+        assert [type(h).__name__ for h in root.handlers] == ["_DeferredQueueHandler"]
+        escritor = log_pipeline._listener._thread
+        assert escritor.is_alive() and escritor is not threading.current_thread()
+
+        try:
+            raise ValueError("falhou")
+        except ValueError:
+            logging.exception("Erro no scraping de %s", "BR",
+                              extra={"ip": "1.2.3.4", "status": 500})
+        for i in range(200):
+            logging.info("linha %d", i, extra={"path": "/trends"})
+        logging.debug("abaixo do nível")
+        stop_logging()
+        encerrado = log_pipeline._listener is None
+        saida = sys.stderr.getvalue()
+    finally:
+        sys.stderr = stderr
+        stop_logging()
+        root.handlers[:] = handlers
+        root.setLevel(level)
+        if ativo:
+            setup_logging(logging.getLevelName(level), "json")
+
+    # encerrado: a thread de escrita terminou depois de esvaziar a fila
+    assert encerrado and not escritor.is_alive()
+    linhas = [json.loads(linha) for linha in saida.splitlines()]
+    print(f"  {len(linhas)} linhas; primeira: {linhas[0]['msg']}")
+    assert len(linhas) == 201
+
+    erro = linhas[0]
+    assert erro["level"] == "ERROR" and erro["msg"] == "Erro no scraping de BR"
+    assert erro["ip"] == "1.2.3.4" and erro["status"] == 500
+    # traceback formatado pelo listener, fora de "msg"
+    assert erro["exc"].startswith("Traceback") and "ValueError: falhou" in erro["exc"]
+    assert "Traceback" not in erro["msg"]
+
+    assert [l["msg"] for l in linhas[1:]] == [f"linha {i}" for i in range(200)]
+    assert all(l["path"] == "/trends" and "exc" not in l for l in linhas[1:])
+
+def test_sampler_counts():
+    """per_key eventos completos por (veredito, IP); o resto vira contagem no resumo"""
+    print("🧪 Testando amostragem de eventos...\n")
+    logger, handler = sampler_logger("contagem")
+    sampler = EventSampler(window=60, per_key=2, logger=logger)
+    for _ in range(5):
+        sampler.event("blocked", "🚨 BLOCKED: %s", "1.1.1.1", ip="1.1.1.1", path="/.env")
+    sampler.event("blocked", "🚨 BLOCKED: %s", "2.2.2.2", ip="2.2.2.2", path="/admin")
+    sampler.event("rate_limited", "🚫 RATE LIMITED: %s", "3.3.3.3", ip="3.3.3.3", path="/trends")
+
+    completos = [r.getMessage() for r in handler.records]
+    assert completos == ["🚨 BLOCKED: 1.1.1.1"] * 2 + ["🚨 BLOCKED: 2.2.2.2", "🚫 RATE LIMITED: 3.3.3.3"]
+    assert handler.records[0].verdict == "blocked" and handler.records[0].path == "/.env"
+
+    handler.records.clear()
+    sampler.flush()
+    # só quem teve eventos suprimidos ganha resumo
+    assert len(handler.records) == 1
+    resumo = handler.records[0]
+    print(f"  {resumo.getMessage()}")
+    assert resumo.getMessage() == "📊 RESUMO BLOCKED: 6 eventos em 60s (3 suprimidos)"
+    assert resumo.total == 6 and resumo.suppressed == 3 and resumo.window_s == 60
+    assert resumo.top_ips == ["1.1.1.1=5", "2.2.2.2=1"]
+    assert resumo.top_paths == ["/.env=5", "/admin=1"]
+
+    # janela nova: contagens zeradas
+    handler.records.clear()
+    sampler.event("blocked", "🚨 BLOCKED: %s", "1.1.1.1", ip="1.1.1.1")
+    sampler.flush()
+    assert [r.getMessage() for r in handler.records] == ["🚨 BLOCKED: 1.1.1.1"]
+
+    # max_keys: IPs além do limite só são contados
+    logger, handler = sampler_logger("limite")
+    sampler = EventSampler(window=60, per_key=1, max_keys=2, logger=logger)
+    for i in range(5):
+        sampler.event("blocked", "ip %s", i, ip=f"10.0.0.{i}")
+    sampler.flush()
+    assert [r.getMessage() for r in handler.records[:2]] == ["ip 0", "ip 1"]
+    assert handler.records[2].total == 5 and handler.records[2].suppressed == 3
+    assert len(handler.records[2].top_ips) == 2
+
+    # window=0 desliga a amostragem
+    logger, handler = sampler_logger("direto")
+    sampler = EventSampler(window=0, logger=logger)
+    for _ in range(3):
+        sampler.event("blocked", "evento", ip="1.1.1.1")
+    assert len(handler.records) == 3
+
+def test_sampler_thread():
+    """A thread de resumos só existe entre start() e stop(), e pode recomeçar"""
+    print("🧪 Testando thread do EventSampler...\n")
+    logger, handler = sampler_logger("thread")
+    sampler = EventSampler(window=0.02, per_key=0, logger=logger)
+    # criar o sampler não inicia thread
+    assert sampler._thread is None
+
+    for _ in range(2):
+        sampler.start()
+        thread = sampler._thread
+        assert thread.is_alive() and thread.name == "log-sampler"
+        handler.records.clear()
+        sampler.event("blocked", "evento", ip="1.1.1.1")
+        prazo = time.monotonic() + 2
+        while not handler.records and time.monotonic() < prazo:
+            time.sleep(0.01)
+        # a própria thread fechou a janela
+        assert handler.records and handler.records[0].total == 1
+        sampler.stop()
+        thread.join(1)
+        assert not thread.is_alive() and sampler._thread is None
+
+    # stop() publica o resumo da janela em andamento
+    handler.records.clear()
+    sampler.event("blocked", "evento", ip="1.1.1.1")
+    sampler.stop()
+    assert [r.suppressed for r in handler.records] == [1]
+
+if __name__ == "__main__":
+    test_json_pipeline()
+    test_sampler_counts()
+    test_sampler_thread()
+    print("\n🎉 Testes do pipeline de logs concluídos!")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Teste das métricas no formato texto do Prometheus
+"""
+
+from metrics import Registry
+
+def test_metrics():
+    """Contadores, histogramas cumulativos e gauges lidos na coleta"""
+    print("🧪 Testando métricas...\n")
+
+    registry = Registry()
+    rejeicoes = registry.counter("rejections_total", "Rejeições", labels=("verdict", "rule"))
+    etapas = registry.histogram("stage_seconds", "Etapas", labels=("stage",),
+                                buckets=(0.1, 1.0))
+    fila = [3]
+    registry.gauge("queued", "Jobs na fila", lambda: fila[0])
+    registry.gauge("quebrado", "Coleta que falha", lambda: 1 / 0)
+
+    rejeicoes.inc("blocked", "path:/admin")
+    rejeicoes.inc("blocked", "path:/admin")
+    rejeicoes.inc("blocked", 'ua:"x"')
+    etapas.observe(0.05, "wait")
+    etapas.observe(0.5, "wait")
+    etapas.observe(5.0, "wait")
+    try:
+        with etapas.time("extract"):
+            raise RuntimeError("falha")
+    except RuntimeError:
+        pass
+    fila[0] = 7
+
+    texto = registry.render()
+    linhas = texto.splitlines()
+    # contador por labels
+    assert 'rejections_total{verdict="blocked",rule="path:/admin"} 2' in linhas
+    # aspas escapadas no label
+    assert 'rejections_total{verdict="blocked",rule="ua:\\"x\\""} 1' in linhas
+    # buckets cumulativos
+    assert ('stage_seconds_bucket{stage="wait",le="0.1"} 1' in linhas
+            and 'stage_seconds_bucket{stage="wait",le="1.0"} 2' in linhas
+            and 'stage_seconds_bucket{stage="wait",le="+Inf"} 3' in linhas)
+    # soma e contagem
+    assert ('stage_seconds_count{stage="wait"} 3' in linhas
+            and 'stage_seconds_sum{stage="wait"} 5.55' in linhas)
+    # time() mede mesmo com exceção
+    assert etapas.count("extract") == 1
+    # gauge lido na coleta
+    assert "queued 7" in linhas
+    # gauge com erro é omitido
+    assert "quebrado" not in texto
+    # TYPE declarado
+    assert "# TYPE stage_seconds histogram" in linhas
+
+    print("\n🎉 Testes de métricas concluídos!")
+
+if __name__ == "__main__":
+    test_metrics()
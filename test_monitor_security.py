@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Teste do analisador de logs em streaming (texto, JSON, gzip e checkpoint)
+"""
+
+import os
+import gzip
+import json
+import tempfile
+from monitor_security import LogFollower, RollingTopK, SpaceSaving, analyze_logs
+
+TEXTO = [
+    "2025-10-28 11:30:15,123 WARNING 🚨 BLOCKED: 95.214.55.246 - POST /admin - UA: Mozilla/5.0...\n",
+    "2025-10-28 11:30:16,456 WARNING 🚫 RATE LIMITED: 35.203.210.168\n",
+    "2025-10-28 11:30:17,789 INFO ✅ ALLOWED: 172.19.0.1 - GET /topobitcoin\n",
+    "2025-10-28 11:30:18,000 WARNING 🚨 BLOCKED: 2001:db8::1 - GET /.env - UA: sqlmap/1.7 - regra: path:/.env\n",
+]
+
+def linha_json(msg: str, **campos) -> str:
+    return json.dumps({"ts": "2025-10-28T11:31:00.000", "level": "WARNING",
+                       "msg": msg, **campos}, ensure_ascii=False) + "\n"
+
+def test_monitor_security():
+    """Conta bloqueios, UAs e resumos; execuções seguintes só leem dados novos"""
+    print("🧪 Testando análise de logs...\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = os.path.join(tmp, "api.log")
+        checkpoint = os.path.join(tmp, "api.checkpoint")
+        with open(log, "w", encoding="utf-8") as f:
+            f.writelines(TEXTO)
+            f.write(linha_json("🚨 BLOCKED: 95.214.55.246 - GET /wp-admin - UA: curl/8 - regra: path:/wp-admin",
+                               ip="95.214.55.246", path="/wp-admin"))
+            f.write(linha_json("📊 RESUMO BLOCKED: 10 eventos em 10s (7 suprimidos)", total=10, suppressed=7))
+            f.write("2025-10-28 11:32:00,000 WARNING 🚨 BLOCKED: 1.2.3.4 - GET /ad")  # linha incompleta
+
+        total, run = analyze_logs([log], checkpoint, workers=1)
+        # IPs bloqueados (IPv4 e IPv6)
+        assert total.blocked_ips[b"95.214.55.246"] == 2 and total.blocked_ips[b"2001:db8::1"] == 1
+        # rate limit contado
+        assert total.rate_limited_ips[b"35.203.210.168"] == 1
+        # user agents guardados
+        assert total.user_agents[b"sqlmap/1.7"] == 1 and total.user_agents[b"curl/8"] == 1
+        # regra do log JSON
+        assert total.rules[b"path:/wp-admin"] == 1
+        # eventos suprimidos do resumo
+        assert total.suppressed[b"BLOCKED"] == 7
+        # linha incompleta fica para depois
+        assert b"1.2.3.4" not in total.blocked_ips
+
+        with open(log, "a", encoding="utf-8") as f:
+            f.write("min\n")
+            f.write("2025-10-28 11:33:00,000 WARNING 🚫 RATE LIMITED: 35.203.210.168\n")
+        total, run = analyze_logs([log], checkpoint, workers=1)
+        # segunda execução lê só o final
+        assert (run.lines == 2
+                and run.blocked_ips[b"1.2.3.4"] == 1 and run.paths[b"/admin"] == 1)
+        # totais acumulam entre execuções
+        assert total.rate_limited_ips[b"35.203.210.168"] == 2 and total.blocked_ips[b"95.214.55.246"] == 2
+
+        # Rotação: o arquivo vira .gz com o mesmo conteúdo e um novo começa
+        with open(log, "rb") as f, gzip.open(log + ".1.gz", "wb") as gz:
+            gz.write(f.read())
+            gz.write("2025-10-28 11:34:00,000 WARNING 🚫 RATE LIMITED: 9.9.9.9\n".encode())
+        with open(log, "w", encoding="utf-8") as f:
+            f.write("2025-10-28 12:00:00,000 WARNING 🚫 RATE LIMITED: 8.8.8.8\n")
+        total, run = analyze_logs([log + ".1.gz", log], checkpoint, workers=2)
+        # gzip rotacionado retoma do offset e arquivo novo começa do zero
+        assert (run.lines == 2 and run.rate_limited_ips[b"9.9.9.9"] == 1
+                and run.rate_limited_ips[b"8.8.8.8"] == 1)
+
+        total, run = analyze_logs([log + ".1.gz", log], checkpoint, workers=2)
+        # nada novo, nada processado
+        assert run.lines == 0 and run.bytes == 0
+
+    print("\n🎉 Testes da análise de logs concluídos!")
+
+def test_follow_logs():
+    """Tail segue rotação e truncamento; tops por janela com memória limitada"""
+    print("🧪 Testando monitoramento em tempo real...\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = os.path.join(tmp, "api.log")
+        with open(log, "w", encoding="utf-8") as f:
+            f.write("linha antiga\n")
+        follower = LogFollower(log)
+        # começa no fim do arquivo
+        assert follower.read() == b""
+
+        with open(log, "a", encoding="utf-8") as f:
+            f.write("nova 1\nnova")
+        # só linhas completas
+        assert follower.read() == b"nova 1\n"
+
+        with open(log, "a", encoding="utf-8") as f:
+            f.write(" 2\nfim do antigo\n")
+        os.rename(log, log + ".1")
+        # rotação em andamento não perde dados
+        assert follower.read() == b"nova 2\nfim do antigo\n"
+        with open(log, "w", encoding="utf-8") as f:
+            f.write("arquivo novo\n")
+        # rotação: novo arquivo lido desde o início
+        assert follower.read() == b"arquivo novo\n" and follower.rotations == 1
+
+        with open(log, "a", encoding="utf-8") as f:
+            f.write("mais uma linha comprida\n")
+        follower.read()
+        with open(log, "w", encoding="utf-8") as f:
+            f.write("truncado\n")
+        # truncamento recomeça do zero
+        assert follower.read() == b"truncado\n" and follower.truncations == 1
+        follower.close()
+
+    summary = SpaceSaving(capacity=3)
+    for key, n in [(b"a", 50), (b"b", 30), (b"c", 1), (b"d", 1), (b"e", 1), (b"a", 10)]:
+        summary.add(key, n)
+    # Space-Saving mantém os pesados com memória fixa
+    assert len(summary.counts) == 3 and summary.top(2) == [(b"a", 60), (b"b", 30)]
+
+    rolling = RollingTopK(windows=(60, 300), bucket_seconds=60, capacity=10)
+    base = 1_000_000 * 60
+    rolling.update({b"1.1.1.1": 5}, now=base)
+    rolling.update({b"2.2.2.2": 3}, now=base + 120)
+    rolling.update({b"1.1.1.1": 1}, now=base + 130)
+    # janela de 1 min só vê o minuto atual
+    assert rolling.top(60, now=base + 130) == [(b"2.2.2.2", 3), (b"1.1.1.1", 1)]
+    # janela de 5 min soma os minutos
+    assert rolling.top(300, now=base + 130)[0] == (b"1.1.1.1", 6)
+    # minutos fora da maior janela são descartados
+    assert rolling.top(300, now=base + 600) == [] and len(rolling._buckets) == 0
+
+    print("\n🎉 Testes do monitoramento em tempo real concluídos!")
+
+if __name__ == "__main__":
+    test_monitor_security()
+    test_follow_logs()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Teste do rate limiter (token bucket, limites por rota, bloqueio que expira)
+"""
+
+import time
+from rate_limiter import RateLimiter, parse_rules
+
+def test_rate_limiter():
+    """Testa limites por rota, expiração do bloqueio e despejo de chaves"""
+    print("🧪 Testando rate limiter...\n")
+
+    # parse_rules
+    assert (parse_rules("/trends=10/60, /categories=60/30") ==
+            {"/trends": (10, 60.0), "/categories": (60, 30.0)})
+
+    limiter = RateLimiter(requests=3, window=60,
+                          routes={"/categories": (5, 60)}, block_seconds=0.1)
+    resultados = [limiter.check("1.1.1.1", "/trends") for _ in range(4)]
+    # limite padrão de 3 por janela
+    assert resultados == [True, True, True, False]
+    # IP bloqueado após exceder
+    assert limiter.is_blocked("1.1.1.1")
+    # outro IP não é afetado
+    assert limiter.check("2.2.2.2", "/trends")
+    # Retry-After: resto do bloqueio; sem bloqueio, o tempo de repor um token
+    assert 0 < limiter.retry_after("1.1.1.1", "/trends") <= 0.1
+    assert limiter.retry_after("2.2.2.2", "/trends") == 0
+    sem_bloqueio = RateLimiter(requests=2, window=60, block_seconds=0)
+    sem_bloqueio.check("4.4.4.4", "/trends")
+    sem_bloqueio.check("4.4.4.4", "/trends")
+    assert 29 < sem_bloqueio.retry_after("4.4.4.4", "/trends") <= 30
+
+    permitidas = sum(limiter.check("3.3.3.3", "/categories") for _ in range(6))
+    # limite próprio da rota /categories
+    assert permitidas == 5
+
+    time.sleep(0.15)
+    # bloqueio expira
+    assert not limiter.is_blocked("1.1.1.1")
+
+    curto = RateLimiter(requests=1, window=0.05, max_keys=2)
+    for i in range(5):
+        curto.check(f"10.0.0.{i}", "/")
+    stats = curto.stats()
+    # max_keys limita a memória
+    assert stats["active_keys"] <= 2
+    time.sleep(0.06)
+    curto.check("10.0.0.99", "/")
+    # chaves ociosas são despejadas
+    assert curto.stats()["active_keys"] == 1
+
+    print("\n🎉 Testes do rate limiter concluídos!")
+
+if __name__ == "__main__":
+    test_rate_limiter()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Teste dos corpos pré-codificados e da negociação gzip/brotli
+"""
+
+import gzip
+import json
+from response_encoding import EncodedBody, negotiate
+
+def test_response_encoding():
+    """Codifica uma vez, negocia pelo Accept-Encoding e guarda as variantes"""
+    print("🧪 Testando corpos pré-codificados...\n")
+
+    # sem Accept-Encoding, sem compressão
+    assert negotiate(None, ("gzip",)) is None
+    # gzip aceito
+    assert negotiate("gzip, deflate", ("gzip",)) == "gzip"
+    # q=0 recusa
+    assert negotiate("gzip;q=0, identity", ("gzip",)) is None
+    # preferência do servidor em empate
+    assert negotiate("gzip, br", ("br", "gzip")) == "br"
+    # maior q do cliente vence
+    assert negotiate("br;q=0.5, gzip", ("br", "gzip")) == "gzip"
+    # curinga
+    assert negotiate("*", ("gzip",)) == "gzip"
+
+    tabela = {"carteira": [["Ativo", "Alocação", "Preço médio"]] * 200, "movimentacao": []}
+    body = EncodedBody.of(tabela)
+    # JSON em UTF-8, igual ao original
+    assert json.loads(body.raw) == tabela and "Alocação".encode() in body.raw
+
+    encoding, data = body.variant("gzip")
+    # tabela grande vai comprimida
+    assert (encoding == "gzip" and len(data) < len(body.raw)
+            and gzip.decompress(data) == body.raw)
+    # variante comprimida é reaproveitada
+    assert body.variant("gzip")[1] is data
+    # ETag por codificação
+    assert (body.etag_for("gzip") == body.etag[:-1] + '-gzip"'
+            and body.etag_for(None) == body.etag)
+
+    pequeno = EncodedBody.of({"valor": "76"})
+    # corpo pequeno não é comprimido
+    assert pequeno.variant("gzip") == (None, pequeno.raw)
+    # ETag calculada uma vez, dos bytes
+    assert (body.etag == EncodedBody(body.raw).etag
+            and body.etag != pequeno.etag)
+
+    print("\n🎉 Testes de corpos pré-codificados concluídos!")
+
+if __name__ == "__main__":
+    test_response_encoding()
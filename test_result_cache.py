@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Teste do cache de resultados (TTL, LRU e stale-while-revalidate)
+"""
+
+import time
+from result_cache import ResultCache, HIT, STALE, MISS
+
+def test_result_cache():
+    """Testa os estados HIT/STALE/MISS e o despejo LRU"""
+    print("🧪 Testando cache de resultados...\n")
+
+    chamadas = []
+
+    def fetch():
+        chamadas.append(1)
+        return len(chamadas)
+
+    cache = ResultCache({"trends": 0.05}, max_entries=2, stale_window=10)
+
+    r = cache.get_or_fetch("trends", ("BR", None), fetch)
+    # primeira chamada é MISS
+    assert r.status == MISS and r.value == 1
+
+    r = cache.get_or_fetch("trends", ("BR", None), fetch)
+    # segunda chamada é HIT
+    assert r.status == HIT and r.value == 1
+
+    time.sleep(0.06)
+    r = cache.get_or_fetch("trends", ("BR", None), fetch)
+    # após o TTL serve a cópia antiga (STALE)
+    assert r.status == STALE and r.value == 1
+
+    time.sleep(0.05)
+    r = cache.peek("trends", ("BR", None))
+    # atualização em background grava o novo valor
+    assert r.value == 2
+
+    cache.get_or_fetch("trends", ("US", None), fetch)
+    cache.get_or_fetch("trends", ("UK", None), fetch)
+    # LRU despeja a entrada mais antiga
+    assert cache.peek("trends", ("BR", None)) is None
+
+    print("\n🎉 Testes do cache concluídos!")
+
+if __name__ == "__main__":
+    test_result_cache()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Teste do agendador de atualização em background
+"""
+
+import threading
+import time
+from scheduler import RefreshScheduler
+
+def refresh(scheduler, endpoint, params):
+    """Executa uma atualização da chave como o laço principal faria"""
+    entry = scheduler._keys[(endpoint, params)]
+    scheduler._sessions.acquire()
+    scheduler._refresh(entry)
+    return entry
+
+def test_adaptive_interval():
+    """Conteúdo parado espaça as atualizações; conteúdo que muda e popularidade aproximam"""
+    print("🧪 Testando intervalo adaptativo...\n")
+    guardados = []
+    valores = iter([["a"], ["a"], ["b"]])
+    scheduler = RefreshScheduler(lambda *args: guardados.append(args), base_interval=100,
+                                 min_interval=10, max_interval=1000, jitter=0)
+    scheduler.note_request("trends", ("BR", None), lambda: next(valores))
+    entry = scheduler._keys[("trends", ("BR", None))]
+    assert 95 < entry.next_refresh - time.time() <= 100
+
+    refresh(scheduler, "trends", ("BR", None))
+    assert entry.interval == 100 and entry.refreshes == 1
+    refresh(scheduler, "trends", ("BR", None))
+    print(f"  sem mudança: {entry.interval:.0f}s")
+    assert entry.interval == 150 and entry.changes == 0
+    refresh(scheduler, "trends", ("BR", None))
+    print(f"  mudou: {entry.interval:.0f}s")
+    assert entry.interval == 75 and entry.changes == 1
+    assert guardados == [("trends", ("BR", None), v) for v in (["a"], ["a"], ["b"])]
+
+    # ~10 req/min dividem o intervalo por log2(11)
+    for _ in range(99):
+        scheduler.note_request("trends", ("BR", None), lambda: ["b"])
+    status = scheduler.status()["keys"][0]
+    print(f"  {status['requests_per_min']} req/min: {status['interval']}s")
+    assert status["requests_per_min"] == 10.0
+    assert status["interval"] == round(75 / 3.4594316186372973)
+
+def test_failure_backoff():
+    """Falhas seguidas dobram a espera a partir de min_interval, até max_interval"""
+    print("🧪 Testando backoff em falhas...\n")
+    scheduler = RefreshScheduler(lambda *args: None, min_interval=10,
+                                 max_interval=100, jitter=0)
+
+    def falha():
+        raise RuntimeError("timeout")
+
+    scheduler.note_request("infogram", ("https://infogram.com/x",), falha)
+    esperas = []
+    for _ in range(4):
+        entry = refresh(scheduler, "infogram", ("https://infogram.com/x",))
+        esperas.append(round(entry.next_refresh - time.time()))
+    print(f"  esperas: {esperas}")
+    assert esperas == [20, 40, 80, 100]
+    assert entry.failures == 4 and entry.consecutive_failures == 4
+    assert entry.last_error == "timeout" and not entry.running
+
+    scheduler._keys[("infogram", ("https://infogram.com/x",))].fetch = lambda: {"ok": 1}
+    entry = refresh(scheduler, "infogram", ("https://infogram.com/x",))
+    assert entry.consecutive_failures == 0 and entry.failures == 4
+
+def test_idle_eviction():
+    """Chave sem requisições há idle_after cede lugar quando a agenda está cheia"""
+    print("🧪 Testando remoção de chaves ociosas...\n")
+    scheduler = RefreshScheduler(lambda *args: None, idle_after=0.05, max_keys=2)
+    scheduler.note_request("trends", ("BR", None), lambda: [])
+    scheduler.note_request("trends", ("US", None), lambda: [])
+    scheduler.seed("topobitcoin", (), lambda: {})
+    assert len(scheduler._keys) == 2, "seed não passa de max_keys"
+
+    scheduler.note_request("trends", ("UK", None), lambda: [])
+    assert ("trends", ("UK", None)) not in scheduler._keys, "agenda cheia sem ociosas"
+
+    time.sleep(0.1)
+    scheduler.note_request("trends", ("US", None), lambda: [])
+    scheduler.note_request("trends", ("UK", None), lambda: [])
+    chaves = {params for _, params in scheduler._keys}
+    print(f"  chaves: {sorted(p[0] for p in chaves)}")
+    assert chaves == {("US", None), ("UK", None)}
+
+    # Semeadas nunca ficam ociosas
+    scheduler = RefreshScheduler(lambda *args: None, idle_after=0.05, max_keys=1)
+    scheduler.seed("topobitcoin", (), lambda: {})
+    time.sleep(0.1)
+    scheduler.note_request("trends", ("BR", None), lambda: [])
+    assert list(scheduler._keys) == [("topobitcoin", ())]
+
+def test_concurrency_limit():
+    """Chaves vencidas ao mesmo tempo não passam de max_concurrent sessões"""
+    print("🧪 Testando limite de sessões simultâneas...\n")
+    lock = threading.Lock()
+    ativos = [0]
+    pico = [0]
+    feitos = []
+
+    def fetch(nome):
+        def run():
+            with lock:
+                ativos[0] += 1
+                pico[0] = max(pico[0], ativos[0])
+            time.sleep(0.05)
+            with lock:
+                ativos[0] -= 1
+            feitos.append(nome)
+            return [nome]
+        return run
+
+    scheduler = RefreshScheduler(lambda *args: None, max_concurrent=2)
+    for geo in ("BR", "US", "UK", "IN", "CA"):
+        scheduler.seed("trends", (geo, None), fetch(geo))
+    scheduler.start()
+    prazo = time.time() + 2
+    while len(feitos) < 5 and time.time() < prazo:
+        time.sleep(0.02)
+    scheduler.stop()
+    print(f"  atualizadas: {len(feitos)} | pico de sessões: {pico[0]}")
+    assert sorted(feitos) == ["BR", "CA", "IN", "UK", "US"]
+    assert pico[0] == 2
+
+if __name__ == "__main__":
+    test_adaptive_interval()
+    test_failure_backoff()
+    test_idle_eviction()
+    test_concurrency_limit()
+    print("\n🎉 Testes do agendador concluídos!")
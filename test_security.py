@@ -3,7 +3,13 @@
 Teste das proteções de segurança implementadas
 """
 
-from security_config import is_ip_suspicious, is_path_blocked, is_user_agent_blocked
+import os
+import json
+import time
+import tempfile
+from security_config import (
+    IPBlocklist, SecurityRules, is_ip_suspicious, is_path_blocked, is_user_agent_blocked, match_blocked_path
+)
 
 def test_security_functions():
     """Testa as funções de segurança"""
@@ -16,12 +22,15 @@ def test_security_functions():
         ("127.0.0.1", False),     # Localhost
         ("192.168.1.1", False),   # IP privado
         ("35.203.210.168", True), # IP dos logs de ataque
+        ("::ffff:147.185.1.1", True), # IPv4 mapeado em IPv6
+        ("2001:db8::1", False),   # IPv6 fora das listas
+        ("não-é-ip", True),       # IP inválido
     ]
     
     for ip, expected in test_ips:
         result = is_ip_suspicious(ip)
         status = "✅" if result == expected else "❌"
-        print(f"  {status} {ip:15s} -> {'Suspeito' if result else 'OK'}")
+        print(f"  {status} {ip:20s} -> {'Suspeito' if result else 'OK'}")
     
     # Teste de paths bloqueados
     print("\n2. Teste de paths bloqueados:")
@@ -56,7 +65,64 @@ def test_security_functions():
         agent_display = agent if agent else "(vazio)"
         print(f"  {status} {agent_display:40s} -> {'Bloqueado' if result else 'Permitido'}")
     
+    # Teste do matcher (regra que casou e recarga do arquivo)
+    print("\n4. Teste de regras e recarga:")
+    rule = match_blocked_path("/WP-Admin/setup.php")
+    status = "✅" if rule == "/wp-admin" else "❌"
+    print(f"  {status} regra reportada: {rule}")
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump({"blocked_paths": ["/actuator"]}, f)
+    rules = SecurityRules(f.name)
+    loaded = rules.paths.match("/actuator/env") == "/actuator"
+    print(f"  {'✅' if loaded else '❌'} regra extra carregada do arquivo")
+    assert rule == "/wp-admin" and loaded
+
     print("\n🎉 Testes de segurança concluídos!")
 
+def test_background_reload():
+    """Blocklist e regras mudam no disco e são trocadas pela thread de recarga"""
+    print("🧪 Testando recarga em background...\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        lista = os.path.join(tmp, "drop.txt")
+        regras = os.path.join(tmp, "regras.json")
+        with open(lista, "w") as f:
+            f.write("203.0.113.0/24 ; exemplo\n")
+        with open(regras, "w") as f:
+            json.dump({"blocked_paths": ["/actuator"]}, f)
+        blocklist = IPBlocklist([lista], check_interval=0.02)
+        rules = SecurityRules(regras, check_interval=0.02)
+        assert blocklist.index.contains("203.0.113.7") and not blocklist.index.contains("198.51.100.7")
+        blocklist.start()
+        rules.start()
+        try:
+            index = blocklist.index
+            with open(lista, "a") as f:
+                f.write("198.51.100.0/24\n")
+            with open(regras, "w") as f:
+                json.dump({"blocked_paths": ["/actuator", "/server-status"]}, f)
+            for arquivo in (lista, regras):
+                os.utime(arquivo, (time.time() + 5, time.time() + 5))
+            prazo = time.monotonic() + 2
+            while time.monotonic() < prazo and (blocklist.index is index
+                                                or not rules.paths.match("/server-status")):
+                time.sleep(0.01)
+        finally:
+            blocklist.stop()
+            rules.stop()
+        print(f"  índice: {len(blocklist.index)} intervalos | regras: {len(rules.paths)} paths")
+        # índice novo trocado inteiro; o antigo segue válido para quem já o leu
+        assert blocklist.index is not index and blocklist.index.contains("198.51.100.7")
+        assert not index.contains("198.51.100.7")
+        assert rules.paths.match("/server-status") == "/server-status"
+        # parada encerra a thread
+        assert blocklist._thread is None and rules._thread is None
+
+    # Sem arquivos, não há thread
+    vazio = IPBlocklist()
+    vazio.start()
+    assert vazio._thread is None
+
 if __name__ == "__main__":
-    test_security_functions()
\ No newline at end of file
+    test_security_functions()
+    test_background_reload()
\ No newline at end of file
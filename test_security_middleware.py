@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Teste do SecurityMiddleware em ASGI puro, com uma aplicação falsa no lugar
+da API: rejeições (404/429/405), paths isentos, repasse da requisição e do
+corpo em streaming, contadores e logs
+"""
+
+import asyncio
+import logging
+from metrics import Counter
+from security_middleware import SecurityMiddleware
+
+class StubApp:
+    """Aplicação ASGI que lê o corpo inteiro e responde em dois pedaços"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, scope, receive, send):
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        self.calls.append((scope, body))
+        await send({"type": "http.response.start", "status": 201,
+                    "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": b"ok ", "more_body": True})
+        await send({"type": "http.response.body", "body": body})
+
+class FakeSampler:
+    """Registra os eventos no lugar do EventSampler"""
+
+    def __init__(self):
+        self.events = []
+
+    def event(self, verdict, message, *args, **fields):
+        self.events.append((verdict, fields))
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+def suspicious(path, user_agent, client_ip):
+    if path.startswith("/.env"):
+        return "path:/.env"
+    if "sqlmap" in user_agent:
+        return "ua:sqlmap"
+    if client_ip == "6.6.6.6":
+        return "ip:blocklist"
+    return None
+
+def build(limited=(), **kwargs):
+    app = StubApp()
+    sampler = FakeSampler()
+    rejections = Counter("rejections", "teste", labels=("verdict", "rule"))
+    middleware = SecurityMiddleware(
+        app, suspicious_reason=suspicious,
+        check_rate_limit=lambda ip, path: ip not in limited,
+        allowed_methods=("GET", "POST", "OPTIONS"), log_paths=["/trends"],
+        sampler=sampler, rejections=rejections,
+        rate_limit_rule=lambda path: "/trends", retry_after=lambda ip, path: 12.3,
+        **kwargs)
+    return middleware, app, sampler, rejections
+
+def request(middleware, path="/trends", method="GET", ip="1.1.1.1",
+            user_agent="Mozilla/5.0", chunks=(b"",)):
+    """Executa uma requisição HTTP e devolve (status, headers, corpo)"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"geo=BR",
+        "headers": [(b"host", b"localhost"), (b"user-agent", user_agent.encode())],
+        "client": (ip, 50000), "server": ("localhost", 8052),
+    }
+    pending = [{"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+               for i, chunk in enumerate(chunks)]
+    sent = []
+
+    async def receive():
+        return pending.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    start = sent[0]
+    body = b"".join(m.get("body", b"") for m in sent[1:])
+    return start["status"], dict(start["headers"]), body
+
+def test_rejections():
+    """Path, UA e IP suspeitos dão 404; rate limit 429 com Retry-After; método 405"""
+    print("🧪 Testando rejeições do middleware...\n")
+    middleware, app, sampler, rejections = build(limited={"2.2.2.2"})
+
+    casos = [
+        (dict(path="/.env"), 404, "blocked", "path:/.env"),
+        (dict(user_agent="sqlmap/1.7"), 404, "blocked", "ua:sqlmap"),
+        (dict(ip="6.6.6.6"), 404, "blocked", "ip:blocklist"),
+        (dict(ip="2.2.2.2"), 429, "rate_limited", "/trends"),
+        (dict(method="DELETE"), 405, "method_not_allowed", "DELETE"),
+        (dict(method="BREW"), 405, "method_not_allowed", "other"),
+    ]
+    for kwargs, esperado, verdict, rule in casos:
+        status, headers, body = request(middleware, **kwargs)
+        print(f"  {kwargs}: {status} {body.decode()}")
+        assert status == esperado
+        assert headers[b"content-length"] == str(len(body)).encode()
+        assert rejections.value(verdict, rule) == 1
+        if status == 429:
+            # Retry-After arredondado para cima
+            assert headers[b"retry-after"] == b"13"
+        else:
+            assert b"retry-after" not in headers
+    # nenhuma rejeição chega à aplicação
+    assert app.calls == []
+
+    verdicts = [verdict for verdict, _ in sampler.events]
+    assert verdicts == ["blocked"] * 3 + ["rate_limited"] + ["method_not_allowed"] * 2
+    assert sampler.events[0][1]["rule"] == "path:/.env" and sampler.events[0][1]["status"] == 404
+    assert sampler.events[3][1]["ip"] == "2.2.2.2"
+
+    # Sem sampler, o evento vai direto para o logging
+    middleware, _, _, _ = build(limited={"2.2.2.2"})
+    middleware.sampler = None
+    handler = ListHandler()
+    logging.getLogger().addHandler(handler)
+    try:
+        request(middleware, ip="2.2.2.2")
+    finally:
+        logging.getLogger().removeHandler(handler)
+    assert [r.verdict for r in handler.records] == ["rate_limited"]
+    assert handler.records[0].levelno == logging.WARNING
+
+def test_passthrough():
+    """Requisição permitida chega intacta à aplicação, com o corpo em streaming"""
+    print("🧪 Testando repasse de requisições permitidas...\n")
+    middleware, app, sampler, rejections = build()
+    handler = ListHandler()
+    root = logging.getLogger()
+    level = root.level
+    root.setLevel(logging.INFO)
+    root.addHandler(handler)
+    try:
+        status, headers, body = request(middleware, method="POST",
+                                        chunks=(b"parte 1, ", b"parte 2"))
+        request(middleware, path="/categories")
+    finally:
+        root.removeHandler(handler)
+        root.setLevel(level)
+
+    print(f"  {status} {body.decode()}")
+    assert status == 201 and body == b"ok parte 1, parte 2"
+    scope, recebido = app.calls[0]
+    assert scope["path"] == "/trends" and scope["method"] == "POST"
+    assert scope["query_string"] == b"geo=BR" and scope["client"] == ("1.1.1.1", 50000)
+    assert recebido == b"parte 1, parte 2"
+    assert len(app.calls) == 2
+    assert sampler.events == [] and rejections.render()[2:] == []
+
+    # Só os paths de log_paths geram o registro ALLOWED, com status e latência
+    allowed = [r for r in handler.records if getattr(r, "verdict", None) == "allowed"]
+    assert len(allowed) == 1
+    assert allowed[0].path == "/trends" and allowed[0].status == 201
+    assert allowed[0].latency_ms >= 0
+
+def test_exempt_paths():
+    """Paths isentos (ex.: /metrics) não passam por nenhuma verificação"""
+    print("🧪 Testando paths isentos...\n")
+    middleware, app, sampler, rejections = build(limited={"6.6.6.6"},
+                                                 exempt_paths=["/metrics"])
+    status, _, _ = request(middleware, path="/metrics", method="DELETE",
+                           ip="6.6.6.6", user_agent="sqlmap/1.7")
+    assert status == 201 and len(app.calls) == 1
+    assert sampler.events == [] and rejections.render()[2:] == []
+
+    status, _, _ = request(middleware, path="/metrics/extra", ip="6.6.6.6")
+    # a isenção é por path exato
+    assert status == 404
+
+    # Escopos que não são HTTP passam direto
+    chamadas = []
+
+    async def app_lifespan(scope, receive, send):
+        chamadas.append(scope["type"])
+
+    asyncio.run(SecurityMiddleware(app_lifespan, suspicious_reason=suspicious,
+                                   check_rate_limit=lambda ip, path: False)(
+        {"type": "lifespan"}, None, None))
+    assert chamadas == ["lifespan"]
+
+if __name__ == "__main__":
+    test_rejections()
+    test_passthrough()
+    test_exempt_paths()
+    print("\n🎉 Testes do middleware de segurança concluídos!")
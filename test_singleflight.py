@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Teste da coalescência de scrapings idênticos simultâneos
+"""
+
+import threading
+import time
+from singleflight import SingleFlight
+
+def test_singleflight():
+    """N chamadas simultâneas com a mesma chave executam a função uma vez"""
+    print("🧪 Testando single-flight...\n")
+    flight = SingleFlight()
+    execucoes = []
+    resultados = []
+
+    def scrape():
+        execucoes.append(1)
+        time.sleep(0.1)
+        return ["tendência"]
+
+    threads = [
+        threading.Thread(target=lambda: resultados.append(flight.do("BR", scrape)))
+        for _ in range(10)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = flight.stats()
+    print(f"  execuções: {len(execucoes)} | coalescidas: {stats['coalesced']}")
+    assert len(execucoes) == 1
+    assert stats["coalesced"] == 9
+    assert all(r == ["tendência"] for r in resultados) and len(resultados) == 10
+
+    erros = []
+
+    def falha():
+        time.sleep(0.05)
+        raise RuntimeError("timeout")
+
+    def chama():
+        try:
+            flight.do("US", falha)
+        except RuntimeError as e:
+            erros.append(str(e))
+
+    threads = [threading.Thread(target=chama) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(f"  erros propagados: {len(erros)}")
+    assert erros == ["timeout"] * 3
+
+    print("\n🎉 Testes de single-flight concluídos!")
+
+if __name__ == "__main__":
+    test_singleflight()
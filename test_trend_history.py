@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Teste do histórico de tendências (SQLite): compactação, consultas e retenção
+"""
+
+import os
+import time
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+
+os.environ.setdefault("DRIVER_POOL_WARMUP", "0")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+os.environ.setdefault("HISTORY_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from fastapi.testclient import TestClient
+from trend_history import TrendHistory
+import trends_api
+
+def test_trend_history():
+    """Grava snapshots, consulta por intervalo e por termo, pagina e aplica retenção"""
+    print("🧪 Testando histórico de tendências...\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        history = TrendHistory(os.path.join(tmp, "history", "trends.db"), retention_days=1)
+        base = time.time() - 3600
+        history.record("BR", None, ["Flamengo", "Eleições"], ts=base)
+        history.record("BR", None, ["Flamengo", "Eleições"], ts=base + 300)
+        history.record("BR", None, ["Eleições", "Copa"], ts=base + 600)
+        history.record("US", "20", ["NBA", "flamengo"], ts=base + 900)
+
+        stats = history.stats()
+        # lista repetida só estende o snapshot anterior
+        assert stats["snapshots"] == 3 and stats["compacted"] == 1
+
+        page = history.snapshots("BR", None)
+        # snapshots do mais novo ao mais antigo
+        assert [i["trends"] for i in page["items"]] == [["Eleições", "Copa"], ["Flamengo", "Eleições"]]
+        # snapshot compactado guarda primeira e última vez
+        assert (page["items"][1]["first_seen"] == base and page["items"][1]["last_seen"] == base + 300
+                and page["items"][1]["scrapes"] == 2)
+
+        page = history.snapshots("BR", None, limit=1)
+        resto = history.snapshots("BR", None, limit=1, cursor=page["next"])
+        # paginação por cursor
+        assert (page["items"][0]["trends"][1] == "Copa" and resto["items"][0]["trends"][0] == "Flamengo"
+                and resto["next"] is None)
+
+        # intervalo de tempo
+        assert len(history.snapshots("BR", None, start=base + 500)["items"]) == 1
+
+        found = history.term("FLAMENGO")
+        # termo sem diferenciar maiúsculas, em todos os países
+        assert found["snapshots"] == 2 and found["first_seen"] == base
+        found = history.term("Flamengo", geo="BR")
+        # primeira vez do termo no BR, com posição
+        assert (found["snapshots"] == 1 and found["items"][0]["rank"] == 1
+                and found["last_seen"] == base + 300)
+        # termo desconhecido
+        assert history.term("inexistente")["snapshots"] == 0
+
+        history.record("BR", None, ["Copa"], ts=base - 3 * 86400)
+        pruned = history.compact()
+        # retenção apaga snapshots antigos
+        assert pruned == 1 and history.stats()["snapshots"] == 3
+
+        leitura = threading.Thread(target=history.stats)
+        leitura.start()
+        leitura.join()
+        conexoes = list(history._conns)
+        history.close()
+
+        def fechada(conn):
+            try:
+                conn.execute("SELECT 1")
+            except sqlite3.ProgrammingError:
+                return True
+            return False
+        # close fecha as conexões de todas as threads
+        assert len(conexoes) == 2 and all(map(fechada, conexoes))
+        # uso depois do close reabre
+        assert history.stats()["snapshots"] == 3
+        history.close()
+
+    print("\n🎉 Testes do histórico concluídos!")
+
+def test_snapshot_pages():
+    """Cursor (ts, id) não pula snapshots no mesmo instante; termos em uma consulta por página"""
+    print("🧪 Testando paginação do histórico...\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        history = TrendHistory(os.path.join(tmp, "trends.db"))
+        base = 1_700_000_000.5
+        # Cinco listas diferentes, três delas no mesmo first_ts
+        for i, ts in enumerate([base, base + 10, base + 10, base + 10, base + 20]):
+            history.record("BR", None, [f"termo {i}", "comum"], ts=ts)
+        history.record("BR", None, [], ts=base + 30)
+
+        consultas = []
+        history._conn().set_trace_callback(consultas.append)
+        vistos, cursor, paginas = [], None, 0
+        while True:
+            page = history.snapshots("BR", None, limit=2, cursor=cursor)
+            vistos += [i["trends"][0] if i["trends"] else None for i in page["items"]]
+            paginas += 1
+            cursor = page["next"]
+            if cursor is None:
+                break
+        history._conn().set_trace_callback(None)
+        print(f"  {paginas} páginas, {len(consultas)} consultas: {vistos}")
+        # todos os snapshots, do mais novo ao mais antigo, sem repetir nem pular
+        assert vistos == [None, "termo 4", "termo 3", "termo 2", "termo 1", "termo 0"]
+        # uma consulta por página, não uma por snapshot
+        assert len(consultas) == paginas == 3
+
+        page = history.snapshots("BR", None, limit=10)
+        assert page["items"][1]["trends"] == ["termo 4", "comum"] and page["next"] is None
+        # snapshot de lista vazia continua na página
+        assert page["items"][0]["trends"] == []
+        # intervalo fechado em 0 não tem nada
+        assert history.snapshots("BR", None, end=0.0)["items"] == []
+        history.close()
+
+def test_api_history_bounds():
+    """start/end explícitos em 0 são limites, não ausência; cursor inválido dá 400"""
+    print("🧪 Testando limites do histórico na API...\n")
+    originais = trends_api.HISTORY_ENABLED, trends_api.HISTORY_DB
+    with tempfile.TemporaryDirectory() as tmp:
+        trends_api.HISTORY_ENABLED = True
+        trends_api.HISTORY_DB = Path(tmp) / "trends.db"
+        try:
+            with TestClient(trends_api.app, client=("127.0.3.1", 5000)) as client:
+                trends_api.trend_history.record("BR", None, ["Flamengo"], ts=1_700_000_000)
+
+                def historico(query):
+                    return client.get("/trends/history?geo=BR&" + query,
+                                      headers={"User-Agent": "Mozilla"})
+
+                assert len(historico("").json()["items"]) == 1
+                # end=0: nada termina antes de 1970
+                assert historico("end=0").json()["items"] == []
+                assert historico("end=1970-01-01T00:00:00Z").json()["items"] == []
+                assert len(historico("start=0").json()["items"]) == 1
+                assert historico("term=Flamengo&end=0").json()["snapshots"] == 0
+                r = historico("cursor=abc")
+                assert r.status_code == 400
+        finally:
+            trends_api.HISTORY_ENABLED, trends_api.HISTORY_DB = originais
+
+if __name__ == "__main__":
+    test_trend_history()
+    test_snapshot_pages()
+    test_api_history_bounds()
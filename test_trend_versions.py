@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Teste das versões de tendências e dos deltas (/trends?since=)
+"""
+
+from trend_versions import TrendVersions
+
+def test_trend_versions():
+    """Versão só muda com o conteúdo; deltas a partir do anel; versão antiga pede lista completa"""
+    print("🧪 Testando versões e deltas de tendências...\n")
+
+    versions = TrendVersions(ring_size=2)
+    key = ("BR", None)
+    v1 = versions.update(key, ["a", "b", "c"]).version
+    # mesma lista mantém a versão
+    assert versions.update(key, ["a", "b", "c"]).version == v1
+    # sem mudanças: delta vazio
+    assert versions.delta(key, v1) == {}
+
+    v2 = versions.update(key, ["c", "a", "d"]).version
+    # versão cresce quando a lista muda
+    assert v2 > v1
+    delta = versions.delta(key, v1)
+    # adicionados com posição
+    assert delta["added"] == [{"term": "d", "rank": 3}]
+    # removidos
+    assert delta["removed"] == ["b"]
+    # reordenados
+    assert delta["moved"] == [{"term": "c", "from": 3, "to": 1},
+                              {"term": "a", "from": 1, "to": 2}]
+    # delta repetido vem do cache
+    assert versions.delta(key, v1) is delta
+
+    versions.update(key, ["x"])
+    # versão que saiu do anel pede a lista completa
+    assert versions.delta(key, v1) is None
+    # versão desconhecida pede a lista completa
+    assert versions.delta(key, 123) is None
+    # chave sem histórico pede a lista completa
+    assert versions.delta(("US", None), v1) is None
+    # delta a partir da penúltima versão
+    assert versions.delta(key, v2)["added"] == [{"term": "x", "rank": 1}]
+
+    print("\n🎉 Testes de versões concluídos!")
+
+if __name__ == "__main__":
+    test_trend_versions()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Teste do endpoint /trends/batch com um scrape_trends_batch falso (sem abrir
+o Chrome): erros por item, cache, circuito aberto e validação dos pares
+"""
+
+import os
+
+os.environ.setdefault("DRIVER_POOL_WARMUP", "0")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+os.environ.setdefault("HISTORY_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from fastapi.testclient import TestClient
+from circuit_breaker import CLOSED, OPEN, CircuitBreakers
+from driver_pool import PoolExhausted
+from result_cache import ResultCache
+import trends_api
+
+HEADERS = {"User-Agent": "Mozilla"}
+# Um IP por chamada, para o rate limit de /trends/batch não interferir
+CLIENTES = iter(range(1, 255))
+
+class FakeBatch:
+    """Responde cada par conforme `respostas`: lista de tendências ou exceção"""
+
+    def __init__(self, respostas):
+        self.respostas = respostas
+        self.pedidos = []
+
+    def __call__(self, pairs):
+        self.pedidos.append(list(pairs))
+        results = {}
+        for pair in pairs:
+            resposta = self.respostas[pair]
+            if isinstance(resposta, Exception):
+                results[pair] = ({"error": str(resposta)}, resposta)
+            else:
+                results[pair] = ({"trends": resposta}, None)
+        return results
+
+def batch(respostas, query, preparar=None, **breaker_options):
+    """Chama /trends/batch com cache e circuitos novos; devolve (resposta, fake, cache, circuito)"""
+    fake = FakeBatch(respostas)
+    cache = ResultCache(ttls={"trends": 60})
+    circuits = CircuitBreakers(**{"min_calls": 100, **breaker_options})
+    originais = (trends_api.scrape_trends_batch, trends_api.result_cache, trends_api.circuits)
+    trends_api.scrape_trends_batch = fake
+    trends_api.result_cache = cache
+    trends_api.circuits = circuits
+    breaker = circuits.get(trends_api.upstream_host("trends", ("BR", None)))
+    try:
+        if preparar:
+            preparar(cache, breaker)
+        with TestClient(trends_api.app, client=(f"127.0.1.{next(CLIENTES)}", 5000)) as client:
+            r = client.get("/trends/batch?" + query, headers=HEADERS)
+    finally:
+        (trends_api.scrape_trends_batch, trends_api.result_cache,
+         trends_api.circuits) = originais
+    return r, fake, cache, breaker
+
+def test_batch_items():
+    """Cada item traz tendências ou erro; HIT do cache não abre aba"""
+    print("🧪 Testando itens do lote...\n")
+
+    def preparar(cache, breaker):
+        cache.put("trends", ("BR", "3"), ["do cache"])
+
+    r, fake, cache, breaker = batch(
+        {("US", None): ["us"], ("UK", "7"): RuntimeError("página não carregou")},
+        "pairs=br:3,US&pairs=UK:7,ZZ,BR:999,br:3", preparar)
+    print(f"  {r.status_code} {r.json()}")
+    assert r.status_code == 200
+    itens = r.json()["items"]
+    # pares repetidos (após normalizar) aparecem uma vez, na ordem pedida
+    assert [(i["geo"], i["category"]) for i in itens] == [
+        ("BR", "3"), ("US", None), ("UK", "7"), ("ZZ", None), ("BR", "999")]
+    assert itens[0]["trends"] == ["do cache"] and itens[0]["cache"] == "HIT"
+    assert itens[1]["trends"] == ["us"] and itens[1]["cache"] == "MISS"
+    assert itens[2]["error"] == "página não carregou" and itens[2]["trends"] is None
+    assert "ZZ" in itens[3]["error"] and "999" in itens[4]["error"]
+    # só os pares válidos e fora do cache chegam ao navegador
+    assert fake.pedidos == [[("US", None), ("UK", "7")]]
+    assert cache.peek("trends", ("US", None)).value == ["us"]
+    assert cache.peek("trends", ("UK", "7")) is None
+    # um sucesso e uma falha da origem, contados por item
+    assert breaker.counters["successes"] == 1 and breaker.counters["failures"] == 1
+
+def test_batch_circuit_bookkeeping():
+    """Sucessos e falhas contam um por item; erros locais só devolvem a vaga"""
+    print("🧪 Testando contagem do circuito no lote...\n")
+    queda = RuntimeError("navegador caiu")
+    respostas = {("BR", None): queda, ("US", None): queda, ("UK", None): queda,
+                 ("IN", None): PoolExhausted("sem driver")}
+    r, _, _, breaker = batch(respostas, "pairs=BR,US,UK,IN",
+                             min_calls=3, failure_rate=0.5)
+    print(f"  estado: {breaker.state} {breaker.counters}")
+    assert r.status_code == 200
+    assert [i["error"] for i in r.json()["items"]] == ["navegador caiu"] * 3 + ["sem driver"]
+    # a mesma exceção em três itens conta três falhas, como três sucessos contariam três
+    assert breaker.counters["failures"] == 3 and breaker.counters["successes"] == 0
+    assert breaker.state == OPEN
+
+    # Meio aberto: o item de teste fecha o circuito; o excedente é recusado sem navegador
+    def meio_aberto(cache, breaker):
+        breaker.state = OPEN
+        breaker._opened_at = -breaker.open_seconds
+
+    r, fake, _, breaker = batch({("BR", None): ["br"], ("US", None): ["us"]},
+                                "pairs=BR,US", meio_aberto)
+    itens = r.json()["items"]
+    assert itens[0]["trends"] == ["br"] and "circuito aberto" in itens[1]["error"]
+    assert fake.pedidos == [[("BR", None)]]
+    assert breaker.state == CLOSED and breaker.counters["rejected"] == 1
+
+def test_batch_circuit_open():
+    """Circuito aberto: cópia vencida como FALLBACK ou erro, sem abrir o navegador"""
+    print("🧪 Testando lote com circuito aberto...\n")
+
+    def preparar(cache, breaker):
+        cache.put("trends", ("BR", None), ["antiga"])
+        cache._entries[("trends", ("BR", None))].stored -= 120
+        breaker._open()
+
+    r, fake, _, breaker = batch({}, "pairs=BR,US", preparar)
+    itens = r.json()["items"]
+    print(f"  {itens}")
+    assert itens[0]["trends"] == ["antiga"] and itens[0]["cache"] == "FALLBACK"
+    assert itens[1]["trends"] is None and "circuito aberto" in itens[1]["error"]
+    assert not any(fake.pedidos)
+    assert breaker.counters["rejected"] == 2
+
+def test_batch_invalid_pairs():
+    """Sem pares ou acima de BATCH_MAX_ITEMS responde 400"""
+    print("🧪 Testando validação dos pares...\n")
+    for query in ("pairs=", "pairs=,&pairs= ,"):
+        r, fake, _, _ = batch({}, query)
+        assert r.status_code == 400 and fake.pedidos == []
+
+    geos = list(trends_api.SUPPORTED_GEO_CODES)
+    categorias = list(trends_api.CATEGORIES)
+    pares = [f"{g}:{c}" for g in geos for c in categorias][:trends_api.BATCH_MAX_ITEMS + 1]
+    r, fake, _, _ = batch({}, "pairs=" + ",".join(pares))
+    print(f"  {len(pares)} pares: {r.status_code} {r.json()['detail']}")
+    assert r.status_code == 400 and fake.pedidos == []
+
+    r, _, _, _ = batch({}, "")
+    # parâmetro obrigatório
+    assert r.status_code == 422
+
+if __name__ == "__main__":
+    test_batch_items()
+    test_batch_circuit_bookkeeping()
+    test_batch_circuit_open()
+    test_batch_invalid_pairs()
+    print("\n🎉 Testes do lote de tendências concluídos!")
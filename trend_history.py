@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Histórico persistente dos scrapings de tendências em SQLite (modo WAL),
+indexado por (geo, categoria, tempo) e por termo, com compactação de
+snapshots repetidos e retenção
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id        INTEGER PRIMARY KEY,
+    geo       TEXT NOT NULL,
+    category  TEXT NOT NULL,
+    first_ts  REAL NOT NULL,     -- primeiro scraping com esta lista
+    last_ts   REAL NOT NULL,     -- último scraping com a mesma lista
+    seen      INTEGER NOT NULL,  -- scrapings compactados neste snapshot
+    digest    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_key_ts ON snapshots (geo, category, first_ts);
+CREATE INDEX IF NOT EXISTS snapshots_last_ts ON snapshots (last_ts);
+
+CREATE TABLE IF NOT EXISTS terms (
+    id    INTEGER PRIMARY KEY,
+    term  TEXT NOT NULL UNIQUE COLLATE NOCASE
+);
+
+CREATE TABLE IF NOT EXISTS entries (
+    snapshot_id  INTEGER NOT NULL,
+    rank         INTEGER NOT NULL,
+    term_id      INTEGER NOT NULL,
+    PRIMARY KEY (snapshot_id, rank)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_term ON entries (term_id, snapshot_id);
+"""
+
+
+def _digest(trends: List[str]) -> str:
+    return hashlib.sha1("\n".join(trends).encode("utf-8")).hexdigest()
+
+
+class TrendHistory:
+    """
+    Cada scraping vira um snapshot (geo, categoria, lista de termos). Um
+    scraping igual ao último snapshot da mesma chave só estende `last_ts`
+    (compactação), então o agendador raspando a cada poucos minutos não
+    multiplica linhas enquanto a lista não muda.
+
+    Snapshots com `last_ts` mais antigo que `retention_days` são apagados a
+    cada `compact_interval` segundos, junto com termos órfãos. Escritas são
+    serializadas; leituras usam uma conexão por thread e não esperam as
+    escritas (WAL).
+    """
+
+    def __init__(self, path: str, retention_days: float = 90.0,
+                 compact_interval: float = 3600.0):
+        self.path = path
+        self.retention = retention_days * 86400
+        self.compact_interval = compact_interval
+        self._local = threading.local()
+        self._conns: List[sqlite3.Connection] = []   # de todas as threads, para o close()
+        self._conns_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._last_compact = time.monotonic()
+        self.counters = {"recorded": 0, "compacted": 0, "pruned": 0}
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        # auto_vacuum só vale antes da primeira tabela
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def record(self, geo: Optional[str], category: Optional[str], trends: List[str],
+               ts: Optional[float] = None) -> None:
+        """Guarda o resultado de um scraping (geo/categoria None = padrão)"""
+        ts = time.time() if ts is None else ts
+        geo, category = geo or "", category or ""
+        digest = _digest(trends)
+        conn = self._conn()
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                last = conn.execute(
+                    "SELECT id, digest FROM snapshots WHERE geo = ? AND category = ? "
+                    "ORDER BY first_ts DESC LIMIT 1", (geo, category)).fetchone()
+                if last is not None and last[1] == digest:
+                    conn.execute("UPDATE snapshots SET last_ts = MAX(last_ts, ?), seen = seen + 1 "
+                                 "WHERE id = ?", (ts, last[0]))
+                    self.counters["compacted"] += 1
+                else:
+                    snapshot = conn.execute(
+                        "INSERT INTO snapshots (geo, category, first_ts, last_ts, seen, digest) "
+                        "VALUES (?, ?, ?, ?, 1, ?)", (geo, category, ts, ts, digest)).lastrowid
+                    conn.executemany("INSERT OR IGNORE INTO terms (term) VALUES (?)",
+                                     [(t,) for t in trends])
+                    conn.executemany(
+                        "INSERT INTO entries (snapshot_id, rank, term_id) "
+                        "SELECT ?, ?, id FROM terms WHERE term = ?",
+                        [(snapshot, rank, t) for rank, t in enumerate(trends, 1)])
+                    self.counters["recorded"] += 1
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        if time.monotonic() - self._last_compact >= self.compact_interval:
+            self.compact()
+
+    def compact(self, now: Optional[float] = None) -> int:
+        """Aplica a retenção e devolve o espaço ao arquivo; retorna snapshots apagados"""
+        self._last_compact = time.monotonic()
+        cutoff = (time.time() if now is None else now) - self.retention
+        conn = self._conn()
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                old = "SELECT id FROM snapshots WHERE last_ts < ?"
+                conn.execute(f"DELETE FROM entries WHERE snapshot_id IN ({old})", (cutoff,))
+                pruned = conn.execute("DELETE FROM snapshots WHERE last_ts < ?", (cutoff,)).rowcount
+                if pruned:
+                    conn.execute("DELETE FROM terms WHERE id NOT IN (SELECT term_id FROM entries)")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            if pruned:
+                conn.execute("PRAGMA incremental_vacuum")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.counters["pruned"] += pruned
+        if pruned:
+            logging.info("Histórico: %d snapshots além da retenção apagados", pruned)
+        return pruned
+
+    def snapshots(self, geo: Optional[str], category: Optional[str],
+                  start: float = 0.0, end: float = float("inf"),
+                  limit: int = 50, cursor: Optional[str] = None) -> dict:
+        """
+        Snapshots de (geo, categoria) que começaram em [start, end), do mais
+        recente para o mais antigo. `cursor` é o `next` da página anterior
+        ("<first_ts>:<id>", para não pular snapshots com o mesmo first_ts);
+        cursor malformado lança ValueError.
+        """
+        conn = self._conn()
+        geo, category = geo or "", category or ""
+        where = "geo = ? AND category = ? AND first_ts >= ? AND first_ts < ?"
+        args = [geo, category, start, end]
+        if cursor is not None:
+            ts, _, snapshot = cursor.partition(":")
+            ts, snapshot = float(ts), int(snapshot)
+            where += " AND (first_ts < ? OR (first_ts = ? AND id < ?))"
+            args += [ts, ts, snapshot]
+        # Página e termos em uma consulta só, na ordem do índice (geo, category, first_ts[, id])
+        rows = conn.execute(
+            f"WITH page AS (SELECT id, first_ts, last_ts, seen FROM snapshots WHERE {where} "
+            "ORDER BY first_ts DESC, id DESC LIMIT ?) "
+            "SELECT p.id, p.first_ts, p.last_ts, p.seen, t.term FROM page p "
+            "LEFT JOIN entries e ON e.snapshot_id = p.id "
+            "LEFT JOIN terms t ON t.id = e.term_id "
+            "ORDER BY p.first_ts DESC, p.id DESC, e.rank", (*args, limit + 1)).fetchall()
+        pages = {}
+        for snapshot, first_ts, last_ts, seen, term in rows:
+            item = pages.get(snapshot)
+            if item is None:
+                item = pages[snapshot] = {"first_seen": first_ts, "last_seen": last_ts,
+                                          "scrapes": seen, "trends": []}
+            if term is not None:
+                item["trends"].append(term)
+        ids, items = list(pages), list(pages.values())
+        next_cursor = None
+        if len(items) > limit:
+            next_cursor = f"{items[limit - 1]['first_seen']!r}:{ids[limit - 1]}"
+        return {"items": items[:limit], "next": next_cursor}
+
+    def term(self, term: str, geo: Optional[str] = None, category: Optional[str] = None,
+             start: float = 0.0, end: float = float("inf"),
+             limit: int = 50, cursor: Optional[str] = None) -> dict:
+        """
+        Snapshots em que o termo apareceu (sem diferenciar maiúsculas), com a
+        posição na lista e o resumo: primeira e última vez e total de snapshots.
+        `cursor` é o `next` da página anterior (id do snapshot).
+        """
+        conn = self._conn()
+        found = conn.execute("SELECT id, term FROM terms WHERE term = ?", (term.strip(),)).fetchone()
+        empty = {"term": term, "first_seen": None, "last_seen": None, "snapshots": 0,
+                 "items": [], "next": None}
+        if found is None:
+            return empty
+        term_id, spelling = found
+        where = "e.term_id = ? AND s.first_ts >= ? AND s.first_ts < ?"
+        args = [term_id, start, end]
+        if geo is not None:
+            where += " AND s.geo = ?"
+            args.append(geo)
+        if category is not None:
+            where += " AND s.category = ?"
+            args.append(category)
+        base = f"FROM entries e JOIN snapshots s ON s.id = e.snapshot_id WHERE {where}"
+        first, last, count = conn.execute(
+            f"SELECT MIN(s.first_ts), MAX(s.last_ts), COUNT(*) {base}", args).fetchone()
+
+        # Páginas seguem o índice (term_id, snapshot_id), do mais novo ao mais antigo
+        page = base + (" AND e.snapshot_id < ?" if cursor is not None else "")
+        page_args = args + ([int(cursor)] if cursor is not None else [])
+        rows = conn.execute(
+            f"SELECT e.snapshot_id, s.geo, s.category, s.first_ts, s.last_ts, e.rank {page} "
+            "ORDER BY e.snapshot_id DESC LIMIT ?", (*page_args, limit + 1)).fetchall()
+        items = [{"geo": g or None, "category": c or None,
+                  "first_seen": first_ts, "last_seen": last_ts, "rank": rank}
+                 for _, g, c, first_ts, last_ts, rank in rows[:limit]]
+        return {**empty, "term": spelling, "first_seen": first, "last_seen": last,
+                "snapshots": count, "items": items,
+                "next": rows[limit - 1][0] if len(rows) > limit else None}
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        snapshots, = conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()
+        terms, = conn.execute("SELECT COUNT(*) FROM terms").fetchone()
+        size = sum(os.path.getsize(p) for p in (self.path, self.path + "-wal")
+                   if os.path.exists(p))
+        return {"snapshots": snapshots, "terms": terms, "bytes": size, **self.counters}
+
+    def close(self):
+        """Fecha as conexões abertas por todas as threads"""
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+            # Uso depois do close abre conexões novas, em vez de reaproveitar fechadas
+            self._local = threading.local()
+        for conn in conns:
+            conn.close()
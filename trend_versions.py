@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Versões das listas de tendências por (geo, categoria) e deltas entre elas,
+para clientes que consultam com frequência baixarem só o que mudou
+"""
+
+import time
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional
+
+
+class Snapshot(NamedTuple):
+    version: int
+    trends: List[str]
+    digest: str
+    body: Any = None   # resposta já codificada, se houver `encode`
+
+
+def _digest(trends: List[str]) -> str:
+    return hashlib.sha1("\n".join(trends).encode("utf-8")).hexdigest()
+
+
+def diff(old: List[str], new: List[str]) -> dict:
+    """Termos adicionados (com posição), removidos e que mudaram de posição (1 = topo)"""
+    old_rank = {term: rank for rank, term in enumerate(old, 1)}
+    new_rank = {term: rank for rank, term in enumerate(new, 1)}
+    return {
+        "added": [{"term": t, "rank": r} for t, r in new_rank.items() if t not in old_rank],
+        "removed": [t for t in old_rank if t not in new_rank],
+        "moved": [{"term": t, "from": old_rank[t], "to": r}
+                  for t, r in new_rank.items() if t in old_rank and old_rank[t] != r],
+    }
+
+
+class TrendVersions:
+    """
+    Para cada chave, um anel com os últimos `ring_size` snapshots distintos.
+    A versão cresce a cada mudança de conteúdo e parte do relógio em ms,
+    então continua crescente depois de reiniciar o processo. Deltas já
+    calculados para a versão atual ficam guardados até a próxima mudança.
+    No máximo `max_keys` chaves (LRU).
+
+    `encode(version, trends)`, se dado, monta o corpo da resposta uma vez
+    por versão.
+    """
+
+    def __init__(self, ring_size: int = 16, max_keys: int = 256,
+                 encode: Optional[Callable[[int, List[str]], Any]] = None):
+        self.ring_size = max(1, ring_size)
+        self.max_keys = max(1, max_keys)
+        self.encode = encode
+        self._rings: "OrderedDict[Hashable, deque]" = OrderedDict()
+        self._deltas: Dict[Hashable, Dict[int, dict]] = {}
+        self._lock = threading.Lock()
+        self.counters = {"versions": 0, "deltas": 0, "unchanged": 0, "full": 0}
+
+    def update(self, key: Hashable, trends: List[str]) -> Snapshot:
+        """Registra a lista atual da chave; devolve o snapshot (novo ou o mesmo)"""
+        digest = _digest(trends)
+        with self._lock:
+            ring = self._rings.get(key)
+            if ring is None:
+                ring = self._rings[key] = deque(maxlen=self.ring_size)
+                while len(self._rings) > self.max_keys:
+                    evicted, _ = self._rings.popitem(last=False)
+                    self._deltas.pop(evicted, None)
+            else:
+                self._rings.move_to_end(key)
+            if ring and ring[-1].digest == digest:
+                return ring[-1]
+            version = int(time.time() * 1000)
+            if ring:
+                version = max(version, ring[-1].version + 1)
+            trends = list(trends)
+            body = self.encode(version, trends) if self.encode is not None else None
+            snapshot = Snapshot(version, trends, digest, body)
+            ring.append(snapshot)
+            self._deltas[key] = {}
+            self.counters["versions"] += 1
+            return snapshot
+
+    def delta(self, key: Hashable, since: int) -> Optional[dict]:
+        """
+        Mudanças desde a versão `since` até a atual. {} quando nada mudou;
+        None quando `since` já saiu do anel (ou nunca existiu) e o cliente
+        precisa da lista completa.
+        """
+        with self._lock:
+            ring = self._rings.get(key)
+            if not ring:
+                self.counters["full"] += 1
+                return None
+            current = ring[-1]
+            if since == current.version:
+                self.counters["unchanged"] += 1
+                return {}
+            cached = self._deltas[key].get(since)
+            if cached is not None:
+                self.counters["deltas"] += 1
+                return cached
+            old = next((s for s in ring if s.version == since), None)
+            if old is None:
+                self.counters["full"] += 1
+                return None
+            changes = self._deltas[key][since] = diff(old.trends, current.trends)
+            self.counters["deltas"] += 1
+            return changes
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"keys": len(self._rings), "ring_size": self.ring_size, **self.counters}
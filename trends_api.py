@@ -6,15 +6,17 @@ e adiciona endpoint para raspar Infogram.
 
 import os
 import time
-import json
+import asyncio
 import logging
 import tempfile
 from pathlib import Path
-from typing import List
-from collections import defaultdict, deque
-from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from urllib.parse import urlparse
 
-from fastapi import FastAPI, HTTPException, Query, Request, status
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response, status
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
@@ -22,11 +24,33 @@ from dotenv import load_dotenv
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import NoSuchElementException
 
-from security_config import is_ip_suspicious, is_path_blocked, is_user_agent_blocked
+from circuit_breaker import CircuitBreakers, CircuitOpen, RetryBudget, guarded_call
+from cookie_jar import CookieJar
+from driver_pool import DriverPool, PoolExhausted
+from extraction import extract_tables, extract_texts
+from hedging import HedgeCancelled, Hedger
+from http_cache import http_date, is_not_modified
+from log_pipeline import EventSampler, setup_logging
+from metrics import (
+    CONTENT_TYPE, circuit_events, driver_startup_seconds, hedge_events, registry,
+    scrape_stage_seconds, security_rejections,
+)
+from jobs import DONE, PRIORITIES, JobQueue, QueueFull
+from rate_limiter import RateLimiter, parse_rules
+from response_encoding import EncodedBody
+from readiness import NetworkTracker, ReadinessTarget, readiness_stats, wait_ready
+from resource_filter import apply_resource_filter, blocked_patterns, chrome_prefs, network_stats
+from result_cache import FALLBACK, HIT, MISS, CacheResult, ResultCache
+from scheduler import RefreshScheduler
+from singleflight import SingleFlight
+from trend_history import TrendHistory
+from trend_versions import TrendVersions
+from security_middleware import SecurityMiddleware
+from security_config import (
+    ip_blocklist, is_ip_suspicious, match_blocked_path, match_blocked_user_agent, security_rules
+)
 
 # --- Carrega .env ---
 load_dotenv()
@@ -34,11 +58,132 @@ API_HOST     = os.getenv("API_HOST", "0.0.0.0")
 API_PORT     = int(os.getenv("API_PORT", "8052"))
 TIMEOUT      = int(os.getenv("PAGE_TIMEOUT", "20"))
 LOG_LEVEL    = os.getenv("LOG_LEVEL", "INFO").upper()
-TRENDS_URL   = os.getenv("TRENDS_URL", "https://trends.google.com/trending?geo=BR")
+# Páginas de origem; apontáveis para o servidor de fixtures dos benchmarks
+TRENDS_BASE_URL = os.getenv("TRENDS_BASE_URL", "https://trends.google.com/trending")
+TRENDS_URL   = os.getenv("TRENDS_URL", f"{TRENDS_BASE_URL}?geo=BR")
+BITCOIN_URL  = os.getenv("BITCOIN_URL", "https://ullqyiyh.manus.space/")
+# Hosts do Infogram com circuito (e rótulo de métrica) próprio; os demais,
+# vindos de URLs dos clientes, dividem um só
+INFOGRAM_HOSTS = {"infogram.com", "e.infogram.com"}
 COOKIES_FILE = Path(__file__).parent / os.getenv("COOKIES_FILE", "cookies.json")
 
-logging.basicConfig(level=LOG_LEVEL,
-                    format="%(asctime)s %(levelname)s %(message)s")
+# Rate limiting: padrão por IP, limites por rota ("/rota=requests/janela") e
+# duração do bloqueio de quem excede o limite
+RATE_LIMIT_REQUESTS      = int(os.getenv("RATE_LIMIT_REQUESTS", "10"))
+RATE_LIMIT_WINDOW        = int(os.getenv("RATE_LIMIT_WINDOW", "60"))
+RATE_LIMIT_ROUTES        = os.getenv("RATE_LIMIT_ROUTES", "/categories=60/60,/jobs=60/60,/trends/history=60/60")
+RATE_LIMIT_BLOCK_SECONDS = int(os.getenv("RATE_LIMIT_BLOCK_SECONDS", "300"))
+RATE_LIMIT_MAX_KEYS      = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+# Blocklists de IP/CIDR extras (um por linha), recarregadas quando mudam
+SECURITY_IP_BLOCKLISTS      = [Path(__file__).parent / f.strip() for f in os.getenv("SECURITY_IP_BLOCKLISTS", "").split(",") if f.strip()]
+SECURITY_BLOCKLIST_INTERVAL = int(os.getenv("SECURITY_BLOCKLIST_INTERVAL", "30"))
+# Regras extras de paths/user agents bloqueados (JSON), recarregadas quando mudam
+SECURITY_RULES_FILE         = os.getenv("SECURITY_RULES_FILE", "")
+
+# Pool de drivers do Chrome
+DRIVER_POOL_SIZE       = int(os.getenv("DRIVER_POOL_SIZE", "2"))
+DRIVER_POOL_WARMUP     = int(os.getenv("DRIVER_POOL_WARMUP", "1"))
+DRIVER_MAX_NAVIGATIONS = int(os.getenv("DRIVER_MAX_NAVIGATIONS", "50"))
+DRIVER_MAX_AGE         = int(os.getenv("DRIVER_MAX_AGE", "1800"))
+
+# Cache de resultados (segundos)
+CACHE_MAX_ENTRIES     = int(os.getenv("CACHE_MAX_ENTRIES", "256"))
+CACHE_STALE_WINDOW    = int(os.getenv("CACHE_STALE_WINDOW", "3600"))
+CACHE_TTL_TRENDS      = int(os.getenv("CACHE_TTL_TRENDS", "300"))
+CACHE_TTL_INFOGRAM    = int(os.getenv("CACHE_TTL_INFOGRAM", "600"))
+CACHE_TTL_TOPOBITCOIN = int(os.getenv("CACHE_TTL_TOPOBITCOIN", "900"))
+
+# Cache-Control por endpoint, para clientes e proxies/CDNs na frente da API
+CACHE_CONTROL_TRENDS      = os.getenv("CACHE_CONTROL_TRENDS", "public, max-age=60, stale-while-revalidate=240")
+CACHE_CONTROL_INFOGRAM    = os.getenv("CACHE_CONTROL_INFOGRAM", "public, max-age=300, stale-while-revalidate=300")
+CACHE_CONTROL_TOPOBITCOIN = os.getenv("CACHE_CONTROL_TOPOBITCOIN", "public, max-age=300, stale-while-revalidate=600")
+CACHE_CONTROL_CATEGORIES  = os.getenv("CACHE_CONTROL_CATEGORIES", "public, max-age=86400")
+
+# Respostas servidas como bytes já codificados; gzip/brotli acima deste tamanho
+RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "true").lower() in ("1", "true", "yes")
+COMPRESS_MIN_BYTES   = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+
+# Agendador de atualização em background (segundos)
+SCHEDULER_ENABLED        = os.getenv("SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+SCHEDULER_BASE_INTERVAL  = int(os.getenv("SCHEDULER_BASE_INTERVAL", "300"))
+SCHEDULER_MIN_INTERVAL   = int(os.getenv("SCHEDULER_MIN_INTERVAL", "60"))
+SCHEDULER_MAX_INTERVAL   = int(os.getenv("SCHEDULER_MAX_INTERVAL", "3600"))
+SCHEDULER_MAX_CONCURRENT = int(os.getenv("SCHEDULER_MAX_CONCURRENT", "1"))
+SCHEDULER_JITTER         = float(os.getenv("SCHEDULER_JITTER", "0.1"))
+SCHEDULER_IDLE_AFTER     = int(os.getenv("SCHEDULER_IDLE_AFTER", "3600"))
+SCHEDULER_MAX_KEYS       = int(os.getenv("SCHEDULER_MAX_KEYS", "100"))
+# Pares geo:categoria raspados desde o startup (ex: BR:0,US:20)
+SCHEDULER_SEED           = [p.strip() for p in os.getenv("SCHEDULER_SEED", "").split(",") if p.strip()]
+
+# Fila de jobs de scraping
+JOB_WORKERS          = int(os.getenv("JOB_WORKERS", str(DRIVER_POOL_SIZE)))
+JOB_QUEUE_SIZE       = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+JOB_DEFAULT_DEADLINE = int(os.getenv("JOB_DEFAULT_DEADLINE", "60"))
+JOB_MAX_DEADLINE     = int(os.getenv("JOB_MAX_DEADLINE", "300"))
+JOB_RESULT_TTL       = int(os.getenv("JOB_RESULT_TTL", "600"))
+
+# Endpoint /trends/batch
+BATCH_MAX_ITEMS        = int(os.getenv("BATCH_MAX_ITEMS", "50"))
+BATCH_MAX_BROWSERS     = int(os.getenv("BATCH_MAX_BROWSERS", "2"))
+BATCH_TABS_PER_BROWSER = int(os.getenv("BATCH_TABS_PER_BROWSER", "4"))
+
+# Hedging: segunda tentativa quando a primeira passa do percentil recente
+HEDGE_ENDPOINTS   = {e.strip() for e in os.getenv("HEDGE_ENDPOINTS", "").split(",") if e.strip()}
+HEDGE_PERCENTILE  = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_BUDGET      = float(os.getenv("HEDGE_BUDGET", "0.1"))
+HEDGE_WINDOW      = int(os.getenv("HEDGE_WINDOW", "100"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_MIN_DELAY   = float(os.getenv("HEDGE_MIN_DELAY", "1.0"))
+
+# Circuit breaker por host de origem: abre com muitas falhas ou chamadas lentas
+CIRCUIT_WINDOW          = int(os.getenv("CIRCUIT_WINDOW", "20"))
+CIRCUIT_MIN_CALLS       = int(os.getenv("CIRCUIT_MIN_CALLS", "5"))
+CIRCUIT_FAILURE_RATE    = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))
+CIRCUIT_SLOW_CALL       = float(os.getenv("CIRCUIT_SLOW_CALL", str(TIMEOUT * 0.75)))
+CIRCUIT_SLOW_RATE       = float(os.getenv("CIRCUIT_SLOW_RATE", "0.8"))
+CIRCUIT_OPEN_SECONDS    = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+CIRCUIT_HALF_OPEN_CALLS = int(os.getenv("CIRCUIT_HALF_OPEN_CALLS", "1"))
+
+# Retentativas com backoff exponencial e jitter, dentro de um orçamento global
+RETRY_MAX          = int(os.getenv("RETRY_MAX", "1"))
+RETRY_BASE_DELAY   = float(os.getenv("RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY    = float(os.getenv("RETRY_MAX_DELAY", "5"))
+RETRY_BUDGET_RATIO = float(os.getenv("RETRY_BUDGET_RATIO", "0.1"))
+
+# Histórico de tendências (SQLite) consultado em /trends/history
+HISTORY_ENABLED          = os.getenv("HISTORY_ENABLED", "true").lower() in ("1", "true", "yes")
+HISTORY_DB               = Path(__file__).parent / os.getenv("HISTORY_DB", "data/trends_history.db")
+HISTORY_RETENTION_DAYS   = float(os.getenv("HISTORY_RETENTION_DAYS", "90"))
+HISTORY_COMPACT_INTERVAL = int(os.getenv("HISTORY_COMPACT_INTERVAL", "3600"))
+HISTORY_MAX_PAGE         = int(os.getenv("HISTORY_MAX_PAGE", "200"))
+# Versões recentes guardadas por (geo, categoria) para responder /trends?since=
+TRENDS_VERSION_RING      = int(os.getenv("TRENDS_VERSION_RING", "16"))
+
+# Espera de prontidão das páginas
+READY_STABLE_MS           = int(os.getenv("READY_STABLE_MS", "500"))
+READY_NETWORK_IDLE_MS     = int(os.getenv("READY_NETWORK_IDLE_MS", "500"))
+READY_TIMEOUT_TRENDS      = int(os.getenv("READY_TIMEOUT_TRENDS", str(TIMEOUT)))
+READY_TIMEOUT_INFOGRAM    = int(os.getenv("READY_TIMEOUT_INFOGRAM", str(TIMEOUT)))
+READY_TIMEOUT_TOPOBITCOIN = int(os.getenv("READY_TIMEOUT_TOPOBITCOIN", str(TIMEOUT)))
+
+# Bloqueio de recursos desnecessários durante o scraping
+RESOURCE_FILTER      = os.getenv("RESOURCE_FILTER", "true").lower() in ("1", "true", "yes")
+RESOURCE_BLOCK_TYPES = [t.strip() for t in os.getenv("RESOURCE_BLOCK_TYPES", "image,font,media").split(",") if t.strip()]
+RESOURCE_BLOCK_URLS  = [u.strip() for u in os.getenv("RESOURCE_BLOCK_URLS", "").split(",") if u.strip()]
+BLOCKED_URL_PATTERNS = blocked_patterns(RESOURCE_BLOCK_TYPES, RESOURCE_BLOCK_URLS) if RESOURCE_FILTER else []
+
+LOG_FORMAT          = os.getenv("LOG_FORMAT", "json").lower()
+# Janela (s) de agregação de bloqueios/rate limit no log; 0 desliga
+LOG_SAMPLE_WINDOW   = float(os.getenv("LOG_SAMPLE_WINDOW", "10"))
+# Eventos completos por (veredito, IP) em cada janela
+LOG_SAMPLE_PER_KEY  = int(os.getenv("LOG_SAMPLE_PER_KEY", "1"))
+
+# Endpoint /metrics (Prometheus), fora das verificações de segurança
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+setup_logging(LOG_LEVEL, LOG_FORMAT)
+security_log = EventSampler(window=LOG_SAMPLE_WINDOW, per_key=LOG_SAMPLE_PER_KEY)
 
 SUPPORTED_GEO_CODES = {
     "BR": "Brasil",
@@ -98,7 +243,63 @@ CATEGORIES = {
     "50": "Referência"
 }
 
-app = FastAPI(title="Google Trends & Infogram Scraper API")
+# Lista fixa: corpo e validadores calculados uma vez
+CATEGORIES_BODY = EncodedBody.of(CATEGORIES)
+CATEGORIES_ETAG = CATEGORIES_BODY.etag
+CATEGORIES_MODIFIED = time.time()
+
+CACHE_CONTROL = {
+    "trends": CACHE_CONTROL_TRENDS,
+    "infogram": CACHE_CONTROL_INFOGRAM,
+    "topobitcoin": CACHE_CONTROL_TOPOBITCOIN,
+    "categories": CACHE_CONTROL_CATEGORIES,
+}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global trend_history
+    if HISTORY_ENABLED:
+        trend_history = TrendHistory(
+            str(HISTORY_DB),
+            retention_days=HISTORY_RETENTION_DAYS,
+            compact_interval=HISTORY_COMPACT_INTERVAL,
+        )
+    security_log.start()
+    # Blocklists e regras recarregadas em background, fora do event loop
+    ip_blocklist.start()
+    security_rules.start()
+    driver_pool.start()
+    await job_queue.start()
+    if SCHEDULER_ENABLED:
+        for pair in SCHEDULER_SEED:
+            geo, _, category = pair.partition(":")
+            try:
+                params = normalize_trends_params(geo, category)
+            except HTTPException as e:
+                logging.warning("SCHEDULER_SEED: ignorando '%s': %s", pair, e.detail)
+                continue
+            refresh_scheduler.seed("trends", params, trends_fetcher(*params))
+        refresh_scheduler.start()
+    yield
+    ip_blocklist.stop()
+    security_rules.stop()
+    security_log.stop()
+    refresh_scheduler.stop()
+    await job_queue.stop()
+    hedger.close()
+    if trend_history is not None:
+        trend_history.close()
+        trend_history = None
+    driver_pool.close()
+
+ip_blocklist.check_interval = SECURITY_BLOCKLIST_INTERVAL
+if SECURITY_IP_BLOCKLISTS:
+    ip_blocklist.set_files(SECURITY_IP_BLOCKLISTS)
+security_rules.check_interval = SECURITY_BLOCKLIST_INTERVAL
+if SECURITY_RULES_FILE:
+    security_rules.set_file(Path(__file__).parent / SECURITY_RULES_FILE)
+
+app = FastAPI(title="Google Trends & Infogram Scraper API", lifespan=lifespan)
 
 # Configuração de CORS
 app.add_middleware(
@@ -109,92 +310,57 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Rate limiting simples em memória
-request_counts = defaultdict(lambda: deque())
-RATE_LIMIT_REQUESTS = 10  # máximo de requests
-RATE_LIMIT_WINDOW = 60    # por minuto
-BLOCKED_IPS = set()
+# Rate limiting por IP e rota (token bucket)
+rate_limiter = RateLimiter(
+    requests=RATE_LIMIT_REQUESTS,
+    window=RATE_LIMIT_WINDOW,
+    routes=parse_rules(RATE_LIMIT_ROUTES),
+    block_seconds=RATE_LIMIT_BLOCK_SECONDS,
+    max_keys=RATE_LIMIT_MAX_KEYS,
+)
 
-def is_suspicious_request(path: str, user_agent: str = "", client_ip: str = "") -> bool:
-    """Detecta requisições suspeitas"""
+def suspicious_reason(path: str, user_agent: str = "", client_ip: str = "") -> Optional[str]:
+    """Retorna a regra que tornou a requisição suspeita, ou None"""
     # Verifica IP suspeito
     if client_ip and is_ip_suspicious(client_ip):
-        return True
+        return "ip"
     
     # Verifica path bloqueado
-    if is_path_blocked(path):
-        return True
+    rule = match_blocked_path(path)
+    if rule:
+        return f"path:{rule}"
     
     # Verifica user agent bloqueado
-    if is_user_agent_blocked(user_agent):
-        return True
+    rule = match_blocked_user_agent(user_agent)
+    if rule:
+        return f"ua:{rule}"
     
     # Verifica tentativas de path traversal
     if '../' in path or '..\\' in path:
-        return True
+        return "path:traversal"
     
-    return False
+    return None
 
-def check_rate_limit(client_ip: str) -> bool:
-    """Verifica rate limiting por IP"""
-    if client_ip in BLOCKED_IPS:
-        return False
-    
-    now = datetime.now()
-    minute_ago = now - timedelta(seconds=RATE_LIMIT_WINDOW)
-    
-    # Remove requests antigos
-    while request_counts[client_ip] and request_counts[client_ip][0] < minute_ago:
-        request_counts[client_ip].popleft()
-    
-    # Verifica se excedeu o limite
-    if len(request_counts[client_ip]) >= RATE_LIMIT_REQUESTS:
-        BLOCKED_IPS.add(client_ip)
-        logging.warning(f"IP {client_ip} bloqueado por excesso de requests")
-        return False
-    
-    # Adiciona request atual
-    request_counts[client_ip].append(now)
-    return True
-
-@app.middleware("http")
-async def security_middleware(request: Request, call_next):
-    """Middleware de segurança"""
-    client_ip = request.client.host
-    path = request.url.path
-    user_agent = request.headers.get("user-agent", "")
-    
-    # Log de tentativas suspeitas
-    if is_suspicious_request(path, user_agent, client_ip):
-        logging.warning(f"🚨 BLOCKED: {client_ip} - {request.method} {path} - UA: {user_agent[:100]}")
-        return JSONResponse(
-            status_code=status.HTTP_404_NOT_FOUND,
-            content={"detail": "Not found"}
-        )
-    
-    # Rate limiting
-    if not check_rate_limit(client_ip):
-        logging.warning(f"🚫 RATE LIMITED: {client_ip}")
-        return JSONResponse(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            content={"detail": "Too many requests"}
-        )
-    
-    # Bloqueia métodos não permitidos
-    allowed_methods = ["GET", "OPTIONS"]
-    if request.method not in allowed_methods:
-        logging.warning(f"🚫 METHOD NOT ALLOWED: {client_ip} - {request.method} {path}")
-        return JSONResponse(
-            status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
-            content={"detail": "Method not allowed"}
-        )
-    
-    # Log de requests legítimos
-    if path in ["/trends", "/categories", "/infogram", "/topobitcoin"]:
-        logging.info(f"✅ ALLOWED: {client_ip} - {request.method} {path}")
-    
-    response = await call_next(request)
-    return response
+def is_suspicious_request(path: str, user_agent: str = "", client_ip: str = "") -> bool:
+    """Detecta requisições suspeitas"""
+    return suspicious_reason(path, user_agent, client_ip) is not None
+
+def check_rate_limit(client_ip: str, path: str = "/") -> bool:
+    """Verifica rate limiting por IP e rota"""
+    return rate_limiter.check(client_ip, path)
+
+app.add_middleware(
+    SecurityMiddleware,
+    suspicious_reason=suspicious_reason,
+    check_rate_limit=check_rate_limit,
+    allowed_methods=["GET", "OPTIONS"],
+    log_paths=["/trends", "/trends/batch", "/trends/history", "/categories", "/infogram", "/topobitcoin"],
+    sampler=security_log,
+    rejections=security_rejections,
+    rate_limit_rule=lambda path: rate_limiter.rule_for(path)[0],
+    retry_after=rate_limiter.retry_after,
+    exempt_paths=["/metrics"] if METRICS_ENABLED else [],
+)
 
 @app.get("/")
 async def root():
@@ -204,15 +370,32 @@ async def root():
         "version": "1.0.0",
         "endpoints": [
             "/trends - Google Trends data",
+            "/trends/batch - Many geo/category pairs in one call",
+            "/trends/history - Stored snapshots and term history",
             "/categories - Available categories",
             "/infogram - Infogram scraping",
             "/topobitcoin - Bitcoin top indicator",
+            "/stats - Pool, cache and coalescing counters",
+            "/scheduler - Background refresh status",
+            "/metrics - Prometheus metrics",
+            "/jobs/{id} - Result of a job submitted with mode=async",
             "/docs - API documentation"
         ]
     }
 
 class TrendsResponse(BaseModel):
     trends: List[str]
+    version: Optional[int] = None
+
+class BatchItem(BaseModel):
+    geo: Optional[str] = None
+    category: Optional[str] = None
+    trends: Optional[List[str]] = None
+    error: Optional[str] = None
+    cache: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    items: List[BatchItem]
 
 class InfogramResponse(BaseModel):
     carteira: List[List[str]]
@@ -236,9 +419,339 @@ def build_driver() -> webdriver.Chrome:
         "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
         "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36"
     )
-    return webdriver.Chrome(options=opts)
+    # Eventos CDP de rede, usados para detectar rede ociosa
+    opts.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    if RESOURCE_FILTER:
+        opts.add_experimental_option("prefs", chrome_prefs(RESOURCE_BLOCK_TYPES))
+    with driver_startup_seconds.time():
+        driver = webdriver.Chrome(options=opts)
+    try:
+        apply_resource_filter(driver, BLOCKED_URL_PATTERNS)
+    except Exception:
+        driver.quit()
+        raise
+    return driver
+
+driver_pool = DriverPool(
+    build_driver,
+    size=DRIVER_POOL_SIZE,
+    warmup=DRIVER_POOL_WARMUP,
+    max_navigations=DRIVER_MAX_NAVIGATIONS,
+    max_age=DRIVER_MAX_AGE,
+)
+
+result_cache = ResultCache(
+    ttls={
+        "trends": CACHE_TTL_TRENDS,
+        "infogram": CACHE_TTL_INFOGRAM,
+        "topobitcoin": CACHE_TTL_TOPOBITCOIN,
+    },
+    max_entries=CACHE_MAX_ENTRIES,
+    stale_window=CACHE_STALE_WINDOW,
+)
+
+scrape_flight = SingleFlight()
+
+trend_versions = TrendVersions(
+    ring_size=TRENDS_VERSION_RING,
+    max_keys=CACHE_MAX_ENTRIES,
+    encode=lambda version, trends: EncodedBody.of({"trends": trends, "version": version}),
+)
+
+def pool_has_capacity() -> bool:
+    """Há driver ocioso ou espaço para iniciar um novo"""
+    stats = driver_pool.stats()
+    used = stats["idle"] + stats["busy"] + stats["starting"] + stats["checking"]
+    return stats["idle"] > 0 or used < stats["size"]
+
+circuits = CircuitBreakers(
+    window=CIRCUIT_WINDOW,
+    min_calls=CIRCUIT_MIN_CALLS,
+    failure_rate=CIRCUIT_FAILURE_RATE,
+    slow_call=CIRCUIT_SLOW_CALL,
+    slow_rate=CIRCUIT_SLOW_RATE,
+    open_seconds=CIRCUIT_OPEN_SECONDS,
+    half_open_calls=CIRCUIT_HALF_OPEN_CALLS,
+    events=circuit_events,
+)
+retry_budget = RetryBudget(ratio=RETRY_BUDGET_RATIO)
+
+hedger = Hedger(
+    percentile=HEDGE_PERCENTILE,
+    window=HEDGE_WINDOW,
+    min_samples=HEDGE_MIN_SAMPLES,
+    budget=HEDGE_BUDGET,
+    min_delay=HEDGE_MIN_DELAY,
+    can_hedge=pool_has_capacity,
+    events=hedge_events,
+)
+# Cookies sem domínio valem para o Trends, como no add_cookie da página aberta
+cookie_jar = CookieJar(COOKIES_FILE, default_url=TRENDS_BASE_URL)
+
+# Aberto no lifespan: importar o módulo não cria o banco
+trend_history: Optional[TrendHistory] = None
+
+refresh_scheduler = RefreshScheduler(
+    store=result_cache.put,
+    base_interval=SCHEDULER_BASE_INTERVAL,
+    min_interval=SCHEDULER_MIN_INTERVAL,
+    max_interval=SCHEDULER_MAX_INTERVAL,
+    max_concurrent=SCHEDULER_MAX_CONCURRENT,
+    jitter=SCHEDULER_JITTER,
+    idle_after=SCHEDULER_IDLE_AFTER,
+    max_keys=SCHEDULER_MAX_KEYS,
+)
+
+job_queue = JobQueue(workers=JOB_WORKERS, max_size=JOB_QUEUE_SIZE,
+                     result_ttl=JOB_RESULT_TTL)
+
+# Gauges lidos só quando /metrics é coletado
+for _name, _help, _collect in (
+    ("driver_pool_size", "Tamanho máximo do pool de drivers", lambda: driver_pool.stats()["size"]),
+    ("driver_pool_idle", "Drivers ociosos no pool", lambda: driver_pool.stats()["idle"]),
+    ("driver_pool_busy", "Drivers em uso", lambda: driver_pool.stats()["busy"]),
+    ("driver_pool_starting", "Drivers sendo iniciados", lambda: driver_pool.stats()["starting"]),
+    ("driver_pool_checking", "Drivers em health check ou reset",
+     lambda: driver_pool.stats()["checking"]),
+    ("job_queue_queued", "Jobs aguardando na fila", lambda: job_queue.stats()["queued"]),
+    ("job_queue_running", "Jobs em execução", lambda: job_queue.stats()["running"]),
+    ("job_queue_max_size", "Capacidade da fila de jobs", lambda: job_queue.max_size),
+    ("cache_entries", "Entradas no cache de resultados", lambda: result_cache.stats()["entries"]),
+    ("singleflight_in_flight", "Scrapings em andamento com chamadores coalescidos",
+     lambda: scrape_flight.stats()["in_flight"]),
+):
+    registry.gauge(_name, _help, _collect)
+
+def upstream_host(endpoint: str, params: tuple) -> str:
+    """Host de origem do scraping, chave do circuit breaker"""
+    if endpoint == "infogram":
+        host = urlparse(params[0]).netloc.lower()
+        return host if host in INFOGRAM_HOSTS else "infogram"
+    elif endpoint == "topobitcoin":
+        url = BITCOIN_URL
+    else:
+        url = TRENDS_BASE_URL if params and params[0] else TRENDS_URL
+    return urlparse(url).netloc or url
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """Falhas que contam para o circuito e admitem retentativa"""
+    return not isinstance(error, (HTTPException, PoolExhausted, HedgeCancelled))
+
+def record_history(params: tuple, trends: List[str]) -> None:
+    """Guarda um scraping de tendências no histórico; falhas só vão para o log"""
+    if trend_history is None:
+        return
+    try:
+        trend_history.record(params[0], params[1], trends)
+    except Exception as e:
+        logging.warning("Falha ao gravar histórico de %s: %s", params, e)
+
+def _coalesced(endpoint: str, params: tuple, scrape, *args):
+    if endpoint in HEDGE_ENDPOINTS:
+        attempt = lambda: hedger.run(endpoint, lambda: scrape(*args))
+    else:
+        attempt = lambda: scrape(*args)
+    breaker = circuits.get(upstream_host(endpoint, params))
+
+    def run():
+        result = guarded_call(breaker, attempt, retry_budget, retries=RETRY_MAX,
+                              base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY,
+                              is_failure=is_upstream_failure)
+        if endpoint == "trends":
+            record_history(params, result)
+        return result
+
+    def fetch():
+        return scrape_flight.do((endpoint, params), run)
+    return fetch
+
+def circuit_fallback(endpoint: str, params: tuple, error: CircuitOpen) -> CacheResult:
+    """
+    Origem com circuito aberto: devolve a última cópia guardada, mesmo
+    vencida, marcada como FALLBACK; sem cópia, 503 imediato com Retry-After
+    """
+    cached = result_cache.peek(endpoint, params)
+    if cached is not None:
+        return cached._replace(status=FALLBACK)
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(error),
+        headers={"Retry-After": str(max(1, int(error.retry_after)))},
+    )
 
-def scrape_trends(geo: str = None, category: str = None) -> List[str]:
+def note_request(endpoint: str, params: tuple, fetch, cached: CacheResult) -> CacheResult:
+    """
+    Conta a requisição para o agendador, uma vez por requisição e só com
+    um resultado raspado com sucesso: parâmetros que nunca funcionaram
+    (URL inválida, página fora do ar) não entram na agenda
+    """
+    if SCHEDULER_ENABLED and cached.status != FALLBACK:
+        refresh_scheduler.note_request(endpoint, params, fetch)
+    return cached
+
+def cached_lookup(endpoint: str, params: tuple, scrape, *args) -> Optional[CacheResult]:
+    """
+    Consulta o cache sem bloquear; None quando é preciso raspar (a
+    requisição então segue por `cached_scrape`, que a conta para o agendador)
+    """
+    fetch = _coalesced(endpoint, params, scrape, *args)
+    cached = result_cache.lookup(endpoint, params, fetch)
+    if cached is None:
+        # Circuito aberto: responde já, sem ocupar a fila de scraping
+        host = upstream_host(endpoint, params)
+        retry_after = circuits.get(host).reject_if_open()
+        if retry_after > 0:
+            return circuit_fallback(endpoint, params, CircuitOpen(host, retry_after))
+        return None
+    return note_request(endpoint, params, fetch, cached)
+
+def cached_scrape(endpoint: str, params: tuple, scrape, *args) -> CacheResult:
+    """Busca no cache; em caso de miss, coalesce scrapings idênticos simultâneos"""
+    fetch = _coalesced(endpoint, params, scrape, *args)
+    try:
+        cached = result_cache.get_or_fetch(endpoint, params, fetch)
+    except CircuitOpen as e:
+        return circuit_fallback(endpoint, params, e)
+    return note_request(endpoint, params, fetch, cached)
+
+def trends_params_error(geo: Optional[str], category: Optional[str]) -> Optional[str]:
+    """Motivo da rejeição de (geo, category) já normalizados, ou None"""
+    if geo and geo not in SUPPORTED_GEO_CODES:
+        return f"Código de país '{geo}' não suportado. Use: {', '.join(SUPPORTED_GEO_CODES.keys())}"
+    if category and category not in CATEGORIES:
+        return f"Categoria '{category}' não suportada. Veja /categories"
+    return None
+
+def normalize_trends_params(geo: str = None, category: str = None,
+                            validate: bool = True) -> tuple:
+    """
+    Normaliza (geo, category) para uso como chave de cache/agenda. Valores
+    fora de SUPPORTED_GEO_CODES/CATEGORIES respondem 400 antes de chegar ao
+    cache, à fila ou ao agendador (com `validate=False`, quem chama trata).
+    """
+    geo = geo.strip().upper() if geo else None
+    category = category.strip() if category else None
+    if validate:
+        error = trends_params_error(geo, category)
+        if error is not None:
+            raise HTTPException(status_code=400, detail=error)
+    return geo, category
+
+def trends_fetcher(geo: str, category: str):
+    """Scraping de tendências coalescido e protegido pelo circuito, para o agendador"""
+    return _coalesced("trends", (geo, category), scrape_trends, geo, category)
+
+async def job_options(
+    priority: str = Query("normal", description="Prioridade na fila: high, normal ou low"),
+    deadline: float = Query(None, description="Prazo em segundos para obter o resultado"),
+    mode: str = Query("sync", description="sync aguarda o resultado; async devolve um job para /jobs/{id}"),
+) -> dict:
+    if priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"Prioridade inválida. Use: {', '.join(PRIORITIES)}")
+    if mode not in ("sync", "async"):
+        raise HTTPException(status_code=400, detail="Modo inválido. Use: sync ou async")
+    deadline = JOB_DEFAULT_DEADLINE if deadline is None else deadline
+    return {"priority": priority, "deadline": min(max(deadline, 1), JOB_MAX_DEADLINE), "mode": mode}
+
+def submit_job(name: str, fn, options: dict):
+    """Enfileira o scraping; fila cheia responde 503 com Retry-After"""
+    try:
+        return job_queue.submit(name, fn, options["priority"], options["deadline"])
+    except QueueFull as e:
+        logging.warning("Fila de scraping cheia; rejeitando %s", name)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado, tente novamente",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+async def wait_job(job):
+    """Aguarda o job até o prazo; prazo vencido responde 504"""
+    try:
+        return await asyncio.wait_for(asyncio.shield(job.future),
+                                      max(0.0, job.deadline - time.monotonic()))
+    except (asyncio.TimeoutError, TimeoutError):
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                            detail="Prazo da requisição excedido")
+
+def job_accepted(job) -> JSONResponse:
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED,
+                        content={**job.info(), "poll": f"/jobs/{job.id}"})
+
+def trends_delta(params: tuple, since: int, headers) -> Optional[Response]:
+    """
+    Resposta de /trends?since=: 304 sem corpo quando a versão não mudou, só
+    as diferenças quando `since` ainda está no anel, ou None (lista completa)
+    """
+    changes = trend_versions.delta(params, since)
+    if changes is None:
+        return None
+    keep = {k: v for k, v in headers.items()
+            if k.lower() in ("x-cache", "age", "warning", "x-trends-version", "cache-control")}
+    if not changes:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=keep)
+    version = int(headers["X-Trends-Version"])
+    return JSONResponse(content={"version": version, "since": since, **changes}, headers=keep)
+
+def set_cache_headers(response: Response, cached, endpoint: str, etag: str = None) -> None:
+    """
+    Informa ao cliente se a resposta veio do cache e a idade dos dados, e
+    define os validadores (ETag do conteúdo, Last-Modified do scraping) e o
+    Cache-Control do endpoint. Cópia de fallback não deve ser reaproveitada.
+    """
+    response.headers["X-Cache"] = cached.status
+    response.headers["Age"] = str(int(cached.age))
+    response.headers["ETag"] = etag or cached.etag
+    response.headers["Last-Modified"] = http_date(cached.stored_at)
+    if cached.status == FALLBACK:
+        response.headers["Warning"] = '110 - "Response is Stale"'
+        response.headers["Cache-Control"] = "no-cache"
+    else:
+        response.headers["Cache-Control"] = CACHE_CONTROL[endpoint]
+
+def negotiate_encoding(request: Request, response: Response,
+                       body: EncodedBody) -> Optional[str]:
+    """
+    Escolhe a variante do corpo pelo Accept-Encoding e ajusta os validadores:
+    Vary quando a resposta depende dele e a ETag própria da variante
+    """
+    if not RESPONSE_COMPRESSION or len(body.raw) < COMPRESS_MIN_BYTES:
+        return None
+    response.headers["Vary"] = "Accept-Encoding"
+    encoding = body.encoding_for(request.headers.get("accept-encoding"), COMPRESS_MIN_BYTES)
+    response.headers["ETag"] = body.etag_for(encoding)
+    return encoding
+
+def encoded_response(request: Request, response: Response, body: EncodedBody) -> Response:
+    """
+    Serve bytes já codificados, sem passar de novo pelo response_model nem
+    pelo encoder JSON; comprime conforme o Accept-Encoding (variante guardada)
+    """
+    encoding = negotiate_encoding(request, response, body)
+    headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body.encoded(encoding), media_type="application/json",
+                    headers=headers)
+
+NOT_MODIFIED_HEADERS = ("etag", "last-modified", "cache-control", "x-cache", "age",
+                        "warning", "x-trends-version", "vary")
+
+def not_modified(request: Request, response: Response, stored_at: float,
+                 body: EncodedBody) -> Optional[Response]:
+    """
+    304 sem corpo (e sem serializar nada) quando o cliente já tem esta
+    versão, em qualquer codificação; leva a ETag e o Vary que o 200 levaria
+    """
+    negotiate_encoding(request, response, body)
+    if not is_not_modified(request.headers, response.headers["ETag"], stored_at):
+        return None
+    headers = {k: v for k, v in response.headers.items() if k.lower() in NOT_MODIFIED_HEADERS}
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+TRENDS_TABLE_CSS = "#trend-table > div.enOdEe-wZVHld-zg7Cn-haAclf > table"
+
+def build_trends_url(geo: str = None, category: str = None) -> str:
     # Monta URL com base nos parâmetros ou usa fallback
     if geo:
         geo = geo.upper()
@@ -247,157 +760,456 @@ def scrape_trends(geo: str = None, category: str = None) -> List[str]:
                 status_code=400,
                 detail=f"Código de país '{geo}' não suportado. Use: {', '.join(SUPPORTED_GEO_CODES.keys())}"
             )
-        url = f"https://trends.google.com/trending?geo={geo}"
+        url = f"{TRENDS_BASE_URL}?geo={geo}"
         if category:
             url += f"&category={category}"
-    else:
-        url = TRENDS_URL
+        return url
+    return TRENDS_URL
 
-    driver = build_driver()
-    try:
-        logging.info(f"Abrindo Trends: {url}")
-        driver.get(url)
-
-        if COOKIES_FILE.exists():
-            logging.info("Injetando cookies…")
-            cookies = json.loads(COOKIES_FILE.read_text())
-            driver.delete_all_cookies()
-            for c in cookies:
-                driver.add_cookie(c)
-            driver.refresh()
-
-        table_css = "#trend-table > div.enOdEe-wZVHld-zg7Cn-haAclf > table"
-        WebDriverWait(driver, TIMEOUT).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, table_css))
-        )
+def extract_trends(driver, tracker: NetworkTracker = None,
+                   endpoint: str = "trends") -> List[str]:
+    """Espera a tabela de tendências da aba atual e extrai a segunda coluna"""
+    table_ready = ReadinessTarget("trends", selectors=[TRENDS_TABLE_CSS],
+                                  timeout=READY_TIMEOUT_TRENDS)
+    rows_ready = ReadinessTarget("trends_rows", rows=f"{TRENDS_TABLE_CSS} tbody tr",
+                                 stable_ms=READY_STABLE_MS,
+                                 network_idle_ms=READY_NETWORK_IDLE_MS,
+                                 timeout=READY_TIMEOUT_TRENDS)
+
+    with scrape_stage_seconds.time(endpoint, "wait"):
+        wait_ready(driver, table_ready)
         logging.info("Tabela carregada.")
 
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
-
-        rows = driver.find_elements(By.CSS_SELECTOR, f"{table_css} tbody tr")
-        logging.info(f"{len(rows)} linhas encontradas.")
-        trends = []
-        for row in rows:
-            cells = row.find_elements(By.TAG_NAME, "td")
-            if len(cells) >= 2:
-                text = cells[1].text.strip()
-                if text:
-                    trends.append(text)
+        wait_ready(driver, rows_ready, tracker)
 
-        return trends
+    with scrape_stage_seconds.time(endpoint, "extract"):
+        rows = extract_tables(driver, {"trends": TRENDS_TABLE_CSS})["trends"] or []
+    logging.info(f"{len(rows)} linhas encontradas.")
+    trends = []
+    for cells in rows:
+        if len(cells) >= 2:
+            text = cells[1]
+            if text:
+                trends.append(text)
+    return trends
 
-    finally:
-        driver.quit()
+def scrape_trends(geo: str = None, category: str = None) -> List[str]:
+    url = build_trends_url(geo, category)
 
-def scrape_infogram(url: str) -> dict:
-    driver = build_driver()
+    start = time.perf_counter()
+    with driver_pool.driver() as driver:
+        scrape_stage_seconds.observe(time.perf_counter() - start, "trends", "acquire")
+        tracker = NetworkTracker(driver)
+        tracker.reset()
+        # Cookies entram antes da navegação: uma única carga de página
+        with scrape_stage_seconds.time("trends", "cookies"):
+            if cookie_jar.install(driver):
+                logging.info("Cookies injetados.")
+        logging.info(f"Abrindo Trends: {url}")
+        with scrape_stage_seconds.time("trends", "navigate"):
+            driver.get(url)
+
+        trends = extract_trends(driver, tracker)
+        network_stats.record("trends", tracker)
+        return trends
+
+def _scrape_trends_tabs(pairs: List[tuple]) -> Dict[tuple, Tuple[dict, Optional[Exception]]]:
+    """
+    Raspa vários pares (geo, category) em um só navegador, carregando até
+    BATCH_TABS_PER_BROWSER abas em paralelo. Cada item traz o resultado e a
+    exceção (ou None); uma falha do navegador é a mesma exceção em todos os
+    itens que derrubou.
+    """
+    results = {}
     try:
-        logging.info(f"Abrindo Infogram: {url}")
-        driver.get(url)
-        time.sleep(6)
+        start = time.perf_counter()
+        with driver_pool.driver() as driver:
+            scrape_stage_seconds.observe(time.perf_counter() - start, "trends_batch", "acquire")
+            cookie_jar.install(driver)
+            main = driver.current_window_handle
+            driver_pool.note_navigations(driver, len(pairs) - 1)
+            for i in range(0, len(pairs), BATCH_TABS_PER_BROWSER):
+                group = pairs[i:i + BATCH_TABS_PER_BROWSER]
+                tabs = []
+                # Dispara todas as navegações sem esperar o carregamento
+                for pair in group:
+                    if tabs:
+                        driver.switch_to.new_window("tab")
+                        apply_resource_filter(driver, BLOCKED_URL_PATTERNS)
+                    url = build_trends_url(*pair)
+                    logging.info(f"Abrindo Trends (lote): {url}")
+                    driver.execute_script("window.location.href = arguments[0];", url)
+                    tabs.append((pair, driver.current_window_handle))
 
-        sel1 = "#tabpanel-chart-3 > div > div > div > table"
-        WebDriverWait(driver, TIMEOUT).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, sel1))
-        )
-        tbl1 = driver.find_element(By.CSS_SELECTOR, sel1)
-        rows1 = tbl1.find_elements(By.CSS_SELECTOR, "tbody tr")
-        carteira = [
-            [cell.text.strip() for cell in row.find_elements(By.TAG_NAME, "td")]
-            for row in rows1
-        ]
+                for pair, handle in tabs:
+                    driver.switch_to.window(handle)
+                    try:
+                        results[pair] = ({"trends": extract_trends(driver, endpoint="trends_batch")}, None)
+                    except Exception as e:
+                        logging.warning(f"Falha no item {pair} do lote: {e}")
+                        results[pair] = ({"error": str(e) or type(e).__name__}, e)
 
-        sel2 = "#tabpanel-chart-2 > div > div > div > table"
-        WebDriverWait(driver, TIMEOUT).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, sel2))
-        )
-        tbl2 = driver.find_element(By.CSS_SELECTOR, sel2)
-        rows2 = tbl2.find_elements(By.CSS_SELECTOR, "tbody tr")
-        movimentacao = [
-            [cell.text.strip() for cell in row.find_elements(By.TAG_NAME, "td")]
-            for row in rows2
-        ]
+                for _, handle in tabs:
+                    if handle != main:
+                        driver.switch_to.window(handle)
+                        driver.close()
+                driver.switch_to.window(main)
+    except Exception as e:
+        # Navegador indisponível ou caiu: os itens restantes falham juntos
+        logging.warning(f"Falha no navegador do lote: {e}")
+        for pair in pairs:
+            results.setdefault(pair, ({"error": str(e) or type(e).__name__}, e))
+    return results
 
-        return {"carteira": carteira, "movimentacao": movimentacao}
-    finally:
-        driver.quit()
+def scrape_trends_batch(pairs: List[tuple]) -> Dict[tuple, Tuple[dict, Optional[Exception]]]:
+    """Distribui os pares entre até BATCH_MAX_BROWSERS navegadores do pool"""
+    if not pairs:
+        return {}
+    browsers = max(1, min(BATCH_MAX_BROWSERS, len(pairs)))
+    chunks = [pairs[i::browsers] for i in range(browsers)]
+    results = {}
+    with ThreadPoolExecutor(max_workers=browsers) as executor:
+        for partial in executor.map(_scrape_trends_tabs, chunks):
+            results.update(partial)
+    return results
+
+def scrape_infogram(url: str) -> dict:
+    sel1 = "#tabpanel-chart-3 > div > div > div > table"
+    sel2 = "#tabpanel-chart-2 > div > div > div > table"
+    ready = ReadinessTarget("infogram", selectors=[sel1, sel2],
+                            rows=f"{sel1} tbody tr, {sel2} tbody tr",
+                            stable_ms=READY_STABLE_MS,
+                            network_idle_ms=READY_NETWORK_IDLE_MS,
+                            timeout=READY_TIMEOUT_INFOGRAM)
+
+    start = time.perf_counter()
+    with driver_pool.driver() as driver:
+        scrape_stage_seconds.observe(time.perf_counter() - start, "infogram", "acquire")
+        tracker = NetworkTracker(driver)
+        tracker.reset()
+        logging.info(f"Abrindo Infogram: {url}")
+        with scrape_stage_seconds.time("infogram", "navigate"):
+            driver.get(url)
+        with scrape_stage_seconds.time("infogram", "wait"):
+            wait_ready(driver, ready, tracker)
+
+        with scrape_stage_seconds.time("infogram", "extract"):
+            tables = extract_tables(driver, {"carteira": sel1, "movimentacao": sel2})
+        network_stats.record("infogram", tracker)
+        return {"carteira": tables["carteira"], "movimentacao": tables["movimentacao"]}
 
 def scrape_bitcoin_top() -> dict:
-    """Extrai informações do Bitcoin da página https://ullqyiyh.manus.space/"""
-    url = "https://ullqyiyh.manus.space/"
-    driver = build_driver()
-    try:
+    """Extrai informações do Bitcoin da página BITCOIN_URL (https://ullqyiyh.manus.space/)"""
+    url = BITCOIN_URL
+    # Seletor principal para o valor
+    valor_selector = "#root > div > main > section.text-center.mb-12 > div > div.text-center.mb-6 > div.text-6xl.font-bold.text-foreground.mb-2"
+    ready = ReadinessTarget("topobitcoin", selectors=[valor_selector],
+                            text=valor_selector,
+                            network_idle_ms=READY_NETWORK_IDLE_MS,
+                            timeout=READY_TIMEOUT_TOPOBITCOIN)
+
+    start = time.perf_counter()
+    with driver_pool.driver() as driver:
+        scrape_stage_seconds.observe(time.perf_counter() - start, "topobitcoin", "acquire")
+        tracker = NetworkTracker(driver)
+        tracker.reset()
         logging.info(f"Abrindo página Bitcoin: {url}")
-        driver.get(url)
-        time.sleep(5)
+        with scrape_stage_seconds.time("topobitcoin", "navigate"):
+            driver.get(url)
 
-        # Seletor principal para o valor
-        valor_selector = "#root > div > main > section.text-center.mb-12 > div > div.text-center.mb-6 > div.text-6xl.font-bold.text-foreground.mb-2"
+        # Aguarda o valor ser renderizado
+        with scrape_stage_seconds.time("topobitcoin", "wait"):
+            wait_ready(driver, ready, tracker)
         
-        # Aguarda o elemento carregar
-        WebDriverWait(driver, TIMEOUT).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, valor_selector))
-        )
-        
-        # Extrai o valor
-        valor_element = driver.find_element(By.CSS_SELECTOR, valor_selector)
-        valor = valor_element.text.strip()
-        
-        # Extrai a data (elemento seguinte)
+        # Data (elemento seguinte) e descrição (título da seção)
         data_selector = "#root > div > main > section.text-center.mb-12 > div > div.text-center.mb-6 > div.text-sm.text-muted-foreground"
-        try:
-            data_element = driver.find_element(By.CSS_SELECTOR, data_selector)
-            data = data_element.text.strip()
-        except:
-            data = "Data não disponível"
-        
-        # Extrai a descrição (título da seção)
         descricao_selector = "#root > div > main > section.text-center.mb-12 > div > div.text-center.mb-6 > h2.text-lg.font-medium.text-muted-foreground.mb-2"
-        try:
-            descricao_element = driver.find_element(By.CSS_SELECTOR, descricao_selector)
-            descricao = descricao_element.text.strip()
-        except:
-            descricao = "CONFIANÇA DE ESTAR NO TOPO"
+
+        # Extrai os três textos em uma única chamada
+        with scrape_stage_seconds.time("topobitcoin", "extract"):
+            texts = extract_texts(driver, {
+                "valor": valor_selector,
+                "data": data_selector,
+                "descricao": descricao_selector,
+            })
+        if texts["valor"] is None:
+            raise NoSuchElementException(f"Elemento não encontrado: {valor_selector}")
+        network_stats.record("topobitcoin", tracker)
         
         return {
-            "valor": valor,
-            "data": data,
-            "descricao": descricao
+            "valor": texts["valor"],
+            "data": texts["data"] if texts["data"] is not None else "Data não disponível",
+            "descricao": texts["descricao"] if texts["descricao"] is not None else "CONFIANÇA DE ESTAR NO TOPO"
         }
-        
-    finally:
-        driver.quit()
 
 @app.get("/trends", response_model=TrendsResponse)
-def get_trends(
+async def get_trends(
     request: Request,
+    response: Response,
     geo: str = Query(None, description="Código do país (ex: BR, US, UK, IN...)"),
-    category: str = Query(None, description="Código da categoria (ex: 20 para Esportes)")
+    category: str = Query(None, description="Código da categoria (ex: 20 para Esportes)"),
+    since: int = Query(None, description="Versão já recebida: responde só o que mudou (ou 304)"),
+    options: dict = Depends(job_options),
 ):
     """
     Retorna tendências por país (geo) e opcionalmente por categoria.
     Se nada for passado, usa a URL padrão do .env (TRENDS_URL).
+
+    Cada resposta traz `version` (também no header X-Trends-Version). Com
+    `since=<versão>`, a resposta é 304 se nada mudou, ou apenas `added`,
+    `removed` e `moved` em relação àquela versão; se ela for antiga demais,
+    volta a lista completa.
     """
     try:
-        logging.info(f"Trends request from {request.client.host}")
-        return {"trends": scrape_trends(geo, category)}
+        logging.info("Trends request from %s", request.client.host)
+        geo, category = normalize_trends_params(geo, category)
+        cached = cached_lookup("trends", (geo, category), scrape_trends, geo, category)
+        if cached is None:
+            job = submit_job("trends", lambda: cached_scrape(
+                "trends", (geo, category), scrape_trends, geo, category), options)
+            if options["mode"] == "async":
+                return job_accepted(job)
+            cached = await wait_job(job)
+        snapshot = trend_versions.update((geo, category), cached.value)
+        response.headers["X-Trends-Version"] = str(snapshot.version)
+        # A versão faz parte do corpo, então a ETag é a do corpo da versão
+        set_cache_headers(response, cached, "trends", etag=snapshot.body.etag)
+        if since is not None:
+            delta = trends_delta((geo, category), since, response.headers)
+            if delta is not None:
+                return delta
+        else:
+            unchanged = not_modified(request, response, cached.stored_at, snapshot.body)
+            if unchanged is not None:
+                return unchanged
+        return encoded_response(request, response, snapshot.body)
+    except HTTPException:
+        raise
     except Exception as e:
         logging.exception("Erro ao raspar tendências")
         raise HTTPException(status_code=500, detail=str(e))
 
+def run_trends_batch(requested: List[tuple]) -> dict:
+    """Serve do cache o que estiver fresco e raspa o resto em lote"""
+    items = {}
+    to_scrape = []
+    calls = {}  # par -> (breaker, token do before_call)
+    for geo, category in requested:
+        error = trends_params_error(geo, category)
+        if error is not None:
+            items[(geo, category)] = {"error": error}
+            continue
+        cached = result_cache.peek("trends", (geo, category))
+        if cached is not None and cached.status == HIT:
+            items[(geo, category)] = {"trends": cached.value, "cache": HIT}
+            continue
+        breaker = circuits.get(upstream_host("trends", (geo, category)))
+        try:
+            token = breaker.before_call()
+        except CircuitOpen as e:
+            # Circuito aberto: cópia vencida ou erro, sem abrir o navegador
+            if cached is not None:
+                items[(geo, category)] = {"trends": cached.value, "cache": FALLBACK}
+            else:
+                items[(geo, category)] = {"error": str(e)}
+            continue
+        calls[(geo, category)] = (breaker, token)
+        to_scrape.append((geo, category))
+
+    # Circuito contado por item, como o before_call: cada item que chegou à
+    # origem registra sucesso ou falha (um navegador que caiu conta uma
+    # falha por item derrubado); erros locais só devolvem a vaga
+    for pair, (result, error) in scrape_trends_batch(to_scrape).items():
+        breaker, token = calls[pair]
+        if error is None:
+            breaker.record(False, token=token)
+            result_cache.put("trends", pair, result["trends"])
+            record_history(pair, result["trends"])
+            result["cache"] = MISS
+        elif is_upstream_failure(error):
+            breaker.record(True, token=token)
+        else:
+            breaker.release(token)
+        items[pair] = result
+
+    return {"items": [
+        {"geo": geo, "category": category, **items[(geo, category)]}
+        for geo, category in requested
+    ]}
+
+@app.get("/trends/batch", response_model=BatchResponse)
+async def get_trends_batch(
+    request: Request,
+    pairs: List[str] = Query(..., description="Pares geo:categoria (ex: pairs=BR:20&pairs=US ou pairs=BR:20,US:0)"),
+    options: dict = Depends(job_options),
+):
+    """
+    Retorna tendências de vários pares (geo, categoria) em uma única chamada.
+    Itens frescos no cache são servidos direto; os demais são raspados em abas
+    paralelas de poucos navegadores. Falhas aparecem no campo `error` do item.
+    """
+    requested = []
+    for value in pairs:
+        for pair in value.split(","):
+            if pair.strip():
+                geo, _, category = pair.strip().partition(":")
+                # Pares inválidos viram `error` no item, sem derrubar o lote
+                requested.append(normalize_trends_params(geo, category, validate=False))
+    requested = list(dict.fromkeys(requested))
+    if not requested:
+        raise HTTPException(status_code=400, detail="Informe ao menos um par geo:categoria")
+    if len(requested) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Máximo de {BATCH_MAX_ITEMS} pares por lote"
+        )
+
+    logging.info("Trends batch request from %s: %d pares", request.client.host, len(requested))
+    job = submit_job("trends_batch", lambda: run_trends_batch(requested), options)
+    if options["mode"] == "async":
+        return job_accepted(job)
+    return await wait_job(job)
+
+def parse_time(value: Optional[str], name: str) -> Optional[float]:
+    """Epoch em segundos ou data ISO 8601 (sem fuso = UTC)"""
+    if value is None or not value.strip():
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        moment = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"'{name}' inválido: use epoch ou ISO 8601")
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+def iso_time(ts: Optional[float]) -> Optional[str]:
+    if ts is None:
+        return None
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="seconds")
+
+@app.get("/trends/history")
+def get_trends_history(
+    request: Request,
+    geo: str = Query(None, description="Código do país (ex: BR); sem geo = URL padrão"),
+    category: str = Query(None, description="Código da categoria"),
+    term: str = Query(None, description="Termo buscado (sem diferenciar maiúsculas)"),
+    start: str = Query(None, description="Início do intervalo (epoch ou ISO 8601)"),
+    end: str = Query(None, description="Fim do intervalo, exclusivo (epoch ou ISO 8601)"),
+    limit: int = Query(50, ge=1, description="Itens por página"),
+    cursor: str = Query(None, description="Valor de `next` da página anterior"),
+):
+    """
+    Consulta o histórico gravado a cada scraping, sem raspar nada.
+    Sem `term`, lista os snapshots de (geo, categoria) do mais recente ao mais
+    antigo; com `term`, onde e quando o termo apareceu (primeira e última
+    vez, posição). Páginas seguem com `cursor=<next>`.
+    """
+    if trend_history is None:
+        raise HTTPException(status_code=404, detail="Histórico desativado (HISTORY_ENABLED)")
+    logging.info("Trends history request from %s", request.client.host)
+    geo, category = normalize_trends_params(geo, category)
+    # Epoch 0 é um limite válido: só a ausência do parâmetro abre o intervalo
+    start_ts = parse_time(start, "start")
+    end_ts = parse_time(end, "end")
+    window = {
+        "start": 0.0 if start_ts is None else start_ts,
+        "end": float("inf") if end_ts is None else end_ts,
+        "limit": min(limit, HISTORY_MAX_PAGE),
+        "cursor": cursor,
+    }
+    try:
+        if term and term.strip():
+            result = trend_history.term(term, geo, category, **window)
+            result["first_seen"] = iso_time(result["first_seen"])
+            result["last_seen"] = iso_time(result["last_seen"])
+        else:
+            result = {"geo": geo, "category": category,
+                      **trend_history.snapshots(geo, category, **window)}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="'cursor' inválido: use o `next` da página anterior")
+    for item in result["items"]:
+        item["first_seen"] = iso_time(item["first_seen"])
+        item["last_seen"] = iso_time(item["last_seen"])
+    return result
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Consulta um job enviado com mode=async. Quando concluído, traz o resultado
+    no mesmo formato do endpoint de origem.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    body = job.info()
+    if job.status == DONE:
+        result = job.result
+        if isinstance(result, CacheResult):
+            result = {"trends": result.value} if job.name == "trends" else result.value
+        body["result"] = result
+    return body
+
 @app.get("/categories")
-def get_categories(request: Request):
+def get_categories(request: Request, response: Response):
     """
     Retorna a lista de categorias disponíveis no Google Trends.
     """
-    logging.info(f"Categories request from {request.client.host}")
-    return JSONResponse(content=CATEGORIES)
+    logging.info("Categories request from %s", request.client.host)
+    response.headers["ETag"] = CATEGORIES_ETAG
+    response.headers["Last-Modified"] = http_date(CATEGORIES_MODIFIED)
+    response.headers["Cache-Control"] = CACHE_CONTROL_CATEGORIES
+    return (not_modified(request, response, CATEGORIES_MODIFIED, CATEGORIES_BODY)
+            or encoded_response(request, response, CATEGORIES_BODY))
+
+@app.get("/stats")
+def get_stats():
+    """
+    Retorna contadores internos: pool de drivers, cache, scrapings coalescidos
+    e hedging (disparos e vitórias da segunda tentativa por endpoint).
+    """
+    return {
+        "driver_pool": driver_pool.stats(),
+        "cache": result_cache.stats(),
+        "singleflight": scrape_flight.stats(),
+        "readiness": readiness_stats.snapshot(),
+        "network": network_stats.snapshot(),
+        "jobs": job_queue.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "hedging": hedger.stats(),
+        "circuits": circuits.stats(),
+        "retry_budget": retry_budget.stats(),
+        "history": trend_history.stats() if trend_history is not None else None,
+        "trend_versions": trend_versions.stats(),
+    }
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """
+    Métricas no formato texto do Prometheus: histogramas por etapa do
+    scraping, rejeições do middleware e gauges do pool e da fila.
+    """
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not found")
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+@app.get("/scheduler")
+def get_scheduler():
+    """
+    Retorna o estado do agendador: última e próxima atualização e falhas por chave.
+    """
+    return refresh_scheduler.status()
 
 @app.get("/infogram", response_model=InfogramResponse)
-def get_infogram(
+async def get_infogram(
     request: Request,
-    url: str = Query(..., description="URL da página do Infogram (ex: https://infogram.com/...)")
+    response: Response,
+    url: str = Query(..., description="URL da página do Infogram (ex: https://infogram.com/...)"),
+    options: dict = Depends(job_options),
 ):
     """
     Recebe a URL de um Infogram e retorna as duas tabelas:
@@ -405,14 +1217,27 @@ def get_infogram(
       - tabela2: selector '#tabpanel-chart-2 > div > div > div > table'
     """
     try:
-        logging.info(f"Infogram request from {request.client.host}")
-        return scrape_infogram(url)
+        logging.info("Infogram request from %s", request.client.host)
+        url = url.strip()
+        cached = cached_lookup("infogram", (url,), scrape_infogram, url)
+        if cached is None:
+            job = submit_job("infogram", lambda: cached_scrape(
+                "infogram", (url,), scrape_infogram, url), options)
+            if options["mode"] == "async":
+                return job_accepted(job)
+            cached = await wait_job(job)
+        set_cache_headers(response, cached, "infogram")
+        return (not_modified(request, response, cached.stored_at, cached.body)
+                or encoded_response(request, response, cached.body))
+    except HTTPException:
+        raise
     except Exception as e:
         logging.exception("Erro ao raspar Infogram")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/topobitcoin", response_model=BitcoinTopResponse)
-def get_topo_bitcoin(request: Request):
+async def get_topo_bitcoin(request: Request, response: Response,
+                           options: dict = Depends(job_options)):
     """
     Extrai informações do indicador CBBI (Confiança de Estar no Topo) do Bitcoin
     da página https://ullqyiyh.manus.space/
@@ -423,8 +1248,19 @@ def get_topo_bitcoin(request: Request):
     - descricao: Descrição do indicador
     """
     try:
-        logging.info(f"Bitcoin request from {request.client.host}")
-        return scrape_bitcoin_top()
+        logging.info("Bitcoin request from %s", request.client.host)
+        cached = cached_lookup("topobitcoin", (), scrape_bitcoin_top)
+        if cached is None:
+            job = submit_job("topobitcoin", lambda: cached_scrape(
+                "topobitcoin", (), scrape_bitcoin_top), options)
+            if options["mode"] == "async":
+                return job_accepted(job)
+            cached = await wait_job(job)
+        set_cache_headers(response, cached, "topobitcoin")
+        return (not_modified(request, response, cached.stored_at, cached.body)
+                or encoded_response(request, response, cached.body))
+    except HTTPException:
+        raise
     except Exception as e:
         logging.exception("Erro ao raspar dados do Bitcoin")
         raise HTTPException(status_code=500, detail=str(e))